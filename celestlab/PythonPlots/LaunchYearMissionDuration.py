@@ -6,15 +6,23 @@ from PlotFunctions import *
 target_folder = "LaunchYearMissionDuration"
 data_path = get_plot_path(target_folder)
 
-cjd = np.array(open_csv(data_path, "cjd_stela.csv")).transpose()
-cjd0 = np.array(open_csv(data_path, "cjd0.csv")).transpose()
-ecc = np.array(open_csv(data_path, "ecc.csv")).transpose()
-inc = np.array(open_csv(data_path, "inc.csv")).transpose()
-mltan = np.array(open_csv(data_path, "mltan.csv")).transpose()
-pom = np.array(open_csv(data_path, "pom.csv")).transpose()
-RAAN = np.array(open_csv(data_path, "RAAN.csv")).transpose()
-sma = np.array(open_csv(data_path, "sma.csv")).transpose()
-years = np.array(open_csv(data_path, "years.csv")).transpose()
+sweep_file = data_path + "/launch_year_mission_duration.npz"
+if os.path.isfile(sweep_file):
+    # Written by python/long_term/launch_year_mission_duration.py, arrays are already indexed [time, launch year]
+    with np.load(sweep_file) as data:
+        cjd, cjd0, ecc, inc = data["cjd"], data["cjd0"], data["ecc"], data["inc"]
+        mltan, pom, RAAN, sma = data["mltan"], data["pom"], data["RAAN"], data["sma"]
+        years = data["years"]
+else:
+    cjd = np.array(open_csv(data_path, "cjd_stela.csv")).transpose()
+    cjd0 = np.array(open_csv(data_path, "cjd0.csv")).transpose()
+    ecc = np.array(open_csv(data_path, "ecc.csv")).transpose()
+    inc = np.array(open_csv(data_path, "inc.csv")).transpose()
+    mltan = np.array(open_csv(data_path, "mltan.csv")).transpose()
+    pom = np.array(open_csv(data_path, "pom.csv")).transpose()
+    RAAN = np.array(open_csv(data_path, "RAAN.csv")).transpose()
+    sma = np.array(open_csv(data_path, "sma.csv")).transpose()
+    years = np.array(open_csv(data_path, "years.csv")).transpose()
 earthRadius = 6.3781e6
 
 # colors = np.array([(0, 135, 108), (61, 154, 112), (100, 173, 115), (137, 191, 119), (175, 209, 124), (214, 225, 132),
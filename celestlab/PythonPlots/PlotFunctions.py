@@ -15,22 +15,31 @@ def get_plot_path(target_folder):
 
 
 # Function to open csv file and convert data to float array
+# Numeric tables are parsed at once and cached in a .npz file next to the csv file, with the modification time (in
+# nanoseconds) and the size of the csv file. The cache is used as long as they are unchanged.
 def open_csv(path, target_file, is_string=False):
-    tmp = []
-    with open(path + "\\" + target_file, 'r') as file:
-        reader = csv.reader(file)
-        for row in reader:
-            if is_string:
-                tmp.append(','.join(row))
-            else:
-                if len(row) == 1:
-                    tmp.append(float(row[0]))
-                else:
-                    tmp.append([float(ii) for ii in row])
+    file_path = os.path.join(path, target_file)
     if is_string:
-        return tmp
-    else:
-        return np.array(tmp)
+        with open(file_path, 'r') as file:
+            return [','.join(row) for row in csv.reader(file)]
+
+    cache_path = file_path + '.npz'
+    file_status = os.stat(file_path)
+    key = np.array([file_status.st_mtime_ns, file_status.st_size], dtype=np.int64)
+    if os.path.isfile(cache_path):
+        with np.load(cache_path) as cache:
+            if np.array_equal(cache['key'], key):
+                return cache['data']
+    data = np.loadtxt(file_path, delimiter=',', ndmin=2)
+    if data.shape[1] == 1:
+        data = data[:, 0]
+    try:
+        with open(cache_path + '.tmp', 'wb') as file:
+            np.savez(file, data=data, key=key)
+        os.replace(cache_path + '.tmp', cache_path)
+    except OSError:
+        pass
+    return data
 
 
 # Functions for figures
@@ -0,0 +1,256 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+from attitude.sun_pointing_rotation import compute_attitude_matrices, compute_pointing_matrices
+
+# Attitude laws by name, see register_attitude_law
+attitude_laws = {}
+
+# Computed attitudes by (law, epoch grid, trajectory, sun directions, targets) key: (matrices, quaternions)
+attitude_cache = {}
+attitude_cache_size = 8
+
+
+def register_attitude_law(name):
+    """
+    Register an attitude law under a name, to be used as a decorator.
+
+    An attitude law is a function law(epochs, states, sun_directions, target_positions) returning the direction cosine
+    matrices from the body frame to the EME2000 frame, of shape (N, 3, 3), whose columns are the X, Y and Z axes of the
+    body frame in EME2000 frame. The inputs that a law does not use may be None.
+
+    Parameters
+    ----------
+    name : str
+        Name of the attitude law
+    """
+
+    def decorator(law):
+        attitude_laws[name] = law
+        return law
+
+    return decorator
+
+
+def _require(value, input_name, law_name):
+    if value is None:
+        raise ValueError(f"The {law_name} attitude law needs {input_name}")
+    return np.asarray(value, dtype=float)
+
+
+@register_attitude_law("sun_pointing")
+def sun_pointing_law(epochs, states, sun_directions, target_positions):
+    """
+    Z axis towards the Sun, spinning around it at the angular velocity of TOLOSAT.
+    """
+    sun_directions = _require(sun_directions, "sun_directions", "sun_pointing")
+    return compute_attitude_matrices(epochs, sun_directions)
+
+
+@register_attitude_law("nadir")
+def nadir_law(epochs, states, sun_directions, target_positions):
+    """
+    Z axis towards the center of the Earth, smallest rotation from the EME2000 frame.
+    """
+    states = _require(states, "states", "nadir")
+    return compute_pointing_matrices(-states[:, :3])
+
+
+@register_attitude_law("inertial")
+def inertial_law(epochs, states, sun_directions, target_positions):
+    """
+    Body axes aligned with the EME2000 axes.
+    """
+    return np.broadcast_to(np.eye(3), (len(epochs), 3, 3)).copy()
+
+
+@register_attitude_law("lvlh")
+def lvlh_law(epochs, states, sun_directions, target_positions):
+    """
+    Local vertical local horizontal frame: Z towards the center of the Earth, Y opposite to the orbital angular
+    momentum and X completing the frame (along the velocity for a circular orbit).
+    """
+    states = _require(states, "states", "lvlh")
+    z_axis = -states[:, :3] / np.linalg.norm(states[:, :3], axis=1, keepdims=True)
+    momentum = np.cross(states[:, :3], states[:, 3:])
+    y_axis = -momentum / np.linalg.norm(momentum, axis=1, keepdims=True)
+    matrices = np.empty((len(z_axis), 3, 3))
+    matrices[:, :, 0] = np.cross(y_axis, z_axis)
+    matrices[:, :, 1] = y_axis
+    matrices[:, :, 2] = z_axis
+    return matrices
+
+
+@register_attitude_law("target_tracking")
+def target_tracking_law(epochs, states, sun_directions, target_positions):
+    """
+    Z axis towards a target, smallest rotation from the EME2000 frame. The target positions are in EME2000 frame, either
+    one position of shape (3,) or one position per epoch of shape (N, 3).
+    """
+    states = _require(states, "states", "target_tracking")
+    target_positions = _require(target_positions, "target_positions", "target_tracking")
+    return compute_pointing_matrices(target_positions - states[:, :3])
+
+
+def get_attitude_law(name):
+    """
+    Get a registered attitude law by name.
+    """
+    if name not in attitude_laws:
+        raise ValueError(
+            f"Unknown attitude law {name}, available laws are {', '.join(attitude_laws)}"
+        )
+    return attitude_laws[name]
+
+
+def matrices_to_quaternions(matrices):
+    """
+    Convert direction cosine matrices from the body frame to the EME2000 frame to quaternions, with the method of
+    Shepperd. The signs are chosen so that the series is continuous, starting with a non-negative scalar part.
+
+    Parameters
+    ----------
+    matrices : np.ndarray
+        Direction cosine matrices, shape (N, 3, 3)
+
+    Returns
+    -------
+    quaternions : np.ndarray
+        Quaternions (QX, QY, QZ, QW), scalar last like scipy, shape (N, 4)
+    """
+    m = matrices
+    trace = m[:, 0, 0] + m[:, 1, 1] + m[:, 2, 2]
+    # Largest of 4 qw^2, 4 qx^2, 4 qy^2 and 4 qz^2 (up to a factor), to avoid dividing by a small number
+    pivot = np.argmax(
+        np.stack([trace, m[:, 0, 0], m[:, 1, 1], m[:, 2, 2]], axis=1), axis=1
+    )
+    quaternions = np.empty((len(m), 4))
+
+    rows = pivot == 0
+    s = 2 * np.sqrt(1 + trace[rows])
+    quaternions[rows, 0] = (m[rows, 2, 1] - m[rows, 1, 2]) / s
+    quaternions[rows, 1] = (m[rows, 0, 2] - m[rows, 2, 0]) / s
+    quaternions[rows, 2] = (m[rows, 1, 0] - m[rows, 0, 1]) / s
+    quaternions[rows, 3] = s / 4
+
+    for axis in range(3):
+        rows = pivot == axis + 1
+        other_1, other_2 = (axis + 1) % 3, (axis + 2) % 3
+        s = 2 * np.sqrt(
+            1 + m[rows, axis, axis] - m[rows, other_1, other_1] - m[rows, other_2, other_2]
+        )
+        quaternions[rows, axis] = s / 4
+        quaternions[rows, other_1] = (m[rows, other_1, axis] + m[rows, axis, other_1]) / s
+        quaternions[rows, other_2] = (m[rows, other_2, axis] + m[rows, axis, other_2]) / s
+        quaternions[rows, 3] = (m[rows, other_2, other_1] - m[rows, other_1, other_2]) / s
+
+    quaternions /= np.linalg.norm(quaternions, axis=1, keepdims=True)
+    signs = np.ones(len(m))
+    if len(m):
+        signs[0] = 1 if quaternions[0, 3] >= 0 else -1
+        signs[1:] = np.where(np.sum(quaternions[1:] * quaternions[:-1], axis=1) < 0, -1, 1)
+    return quaternions * np.cumprod(signs)[:, None]
+
+
+def _array_key(array):
+    """
+    Key of an input array in the attitude cache: shape and digest of its content.
+    """
+    if array is None:
+        return None
+    array = np.ascontiguousarray(array, dtype=float)
+    return array.shape, hashlib.blake2b(array.data, digest_size=16).digest()
+
+
+def compute_attitude(
+    law,
+    epochs,
+    states=None,
+    sun_directions=None,
+    target_positions=None,
+    use_cache=True,
+):
+    """
+    Compute the attitude of a spacecraft with a registered attitude law.
+
+    The results are cached by law, epoch grid, trajectory, sun directions and target positions, so that the analyses
+    of the same trajectory (Doppler, CIC export, power) share one computation. The last attitude_cache_size results are
+    kept.
+
+    Parameters
+    ----------
+    law : str
+        Name of the attitude law: "sun_pointing", "nadir", "inertial", "lvlh", "target_tracking" or a law added with
+        register_attitude_law
+    epochs : np.ndarray
+        Array of epochs in seconds since J2000. Shape (N,)
+    states : np.ndarray, optional
+        States of the spacecraft in EME2000 frame in meters and meters per second. Shape (N, 6)
+    sun_directions : np.ndarray, optional
+        Sun directions in EME2000 frame from the spacecraft. Shape (N, 3)
+    target_positions : np.ndarray, optional
+        Positions of the target in EME2000 frame in meters. Shape (3,) or (N, 3)
+    use_cache : bool, optional
+        If False, the attitude is computed again and not cached, by default True
+
+    Returns
+    -------
+    matrices : np.ndarray
+        Direction cosine matrices from the body frame to the EME2000 frame, shape (N, 3, 3). The columns are the X, Y
+        and Z axes of the body frame in EME2000 frame. Must not be modified, as it is shared through the cache.
+    quaternions : np.ndarray
+        Corresponding quaternions (QX, QY, QZ, QW), scalar last like scipy, shape (N, 4)
+    """
+    attitude_law = get_attitude_law(law)
+    epochs = np.asarray(epochs, dtype=float)
+    if use_cache:
+        key = (
+            law,
+            _array_key(epochs),
+            _array_key(states),
+            _array_key(sun_directions),
+            _array_key(target_positions),
+        )
+        if key in attitude_cache:
+            return attitude_cache[key]
+
+    matrices = attitude_law(epochs, states, sun_directions, target_positions)
+    attitude = (matrices, matrices_to_quaternions(matrices))
+    if use_cache:
+        attitude_cache[key] = attitude
+        while len(attitude_cache) > attitude_cache_size:
+            del attitude_cache[next(iter(attitude_cache))]
+    return attitude
+
+
+def compute_attitude_quaternions(law, epochs, states=None, sun_directions=None, target_positions=None):
+    """
+    Compute the quaternions from the EME2000 frame to the body frame with a registered attitude law, see
+    compute_attitude.
+
+    Returns
+    -------
+    quaternions_df : pd.DataFrame
+        Quaternions with columns QX, QY, QZ and QW
+    """
+    _, quaternions = compute_attitude(law, epochs, states, sun_directions, target_positions)
+    return pd.DataFrame(quaternions, columns=["QX", "QY", "QZ", "QW"])
+
+
+def compute_body_vectors(law, epochs, states=None, sun_directions=None, target_positions=None):
+    """
+    Compute the body axes in EME2000 frame with a registered attitude law, see compute_attitude.
+
+    Returns
+    -------
+    pX_vector : np.ndarray
+        Vector of the X axis of the body frame in EME2000 frame
+    pY_vector : np.ndarray
+        Vector of the Y axis of the body frame in EME2000 frame
+    pZ_vector : np.ndarray
+        Vector of the Z axis of the body frame in EME2000 frame
+    """
+    matrices, _ = compute_attitude(law, epochs, states, sun_directions, target_positions)
+    return matrices[:, :, 0], matrices[:, :, 1], matrices[:, :, 2]
@@ -10,6 +10,108 @@ angular_velocity = get_spacecraft("Tolosat")["angular_velocity"]
 # Longitudinal axis of cubesat is Z axis
 
 
+def compute_pointing_matrices(directions):
+    """
+    Compute the smallest rotations bringing the +Z axis onto each direction, built directly from the direction
+    instead of composing rotation vectors. When the direction is along -Z, the rotation is a half turn around X.
+
+    Parameters
+    ----------
+    directions : np.ndarray
+        Array of directions in EME2000 frame, normalized by the function. Shape (N, 3)
+
+    Returns
+    -------
+    matrices : np.ndarray
+        Rotation matrices, shape (N, 3, 3). The columns are the rotated X, Y and Z axes in EME2000 frame.
+    """
+    directions = directions / np.linalg.norm(directions, axis=1, keepdims=True)
+    sx, sy, sz = directions.T
+    anti_aligned = sz <= -1 + 1e-12
+    factor = 1 / np.where(anti_aligned, 1, 1 + sz)
+
+    matrices = np.empty((len(sz), 3, 3))
+    matrices[:, 0, 0] = 1 - sx ** 2 * factor
+    matrices[:, 1, 0] = -sx * sy * factor
+    matrices[:, 2, 0] = -sx
+    matrices[:, 0, 1] = -sx * sy * factor
+    matrices[:, 1, 1] = 1 - sy ** 2 * factor
+    matrices[:, 2, 1] = -sy
+    matrices[anti_aligned, :, 0] = [1, 0, 0]
+    matrices[anti_aligned, :, 1] = [0, -1, 0]
+    matrices[:, :, 2] = directions
+    return matrices
+
+
+def compute_attitude_matrices(epochs, sun_directions):
+    """
+    Compute the direction cosine matrices from the TOLOSAT frame to the EME2000 frame at each epoch.
+
+    The Z axis points to the Sun and the satellite spins around it at the angular velocity of TOLOSAT. The pointing
+    part is the smallest rotation bringing +Z onto the Sun direction, see compute_pointing_matrices.
+
+    Parameters
+    ----------
+    epochs : np.ndarray
+        Array of epochs in seconds since J2000
+    sun_directions : np.ndarray
+        Array of sun directions in EME2000 frame from TOLOSAT
+
+    Returns
+    -------
+    matrices : np.ndarray
+        Direction cosine matrices, shape (N, 3, 3). The columns are the X, Y and Z axes of TOLOSAT in EME2000 frame.
+    """
+    matrices = compute_pointing_matrices(sun_directions)
+    rotated_x = matrices[:, :, 0].copy()
+    rotated_y = matrices[:, :, 1].copy()
+
+    spin_angle = np.deg2rad(angular_velocity * (epochs - epochs[0]))
+    cos_spin, sin_spin = np.cos(spin_angle)[:, None], np.sin(spin_angle)[:, None]
+    matrices[:, :, 0] = cos_spin * rotated_x + sin_spin * rotated_y
+    matrices[:, :, 1] = cos_spin * rotated_y - sin_spin * rotated_x
+    return matrices
+
+
+def compute_attitude_quaternion_array(epochs, sun_directions):
+    """
+    Compute the quaternions of the rotation from the EME2000 frame to the TOLOSAT frame at each epoch, in the same
+    convention as compute_attitude_matrices.
+
+    Parameters
+    ----------
+    epochs : np.ndarray
+        Array of epochs in seconds since J2000
+    sun_directions : np.ndarray
+        Array of sun directions in EME2000 frame from TOLOSAT
+
+    Returns
+    -------
+    quaternions : np.ndarray
+        Quaternions (QX, QY, QZ, QW), scalar last like scipy, shape (N, 4)
+    """
+    sun_directions = sun_directions / np.linalg.norm(sun_directions, axis=1, keepdims=True)
+    sx, sy, sz = sun_directions.T
+    anti_aligned = sz <= -1 + 1e-12
+
+    # Quaternion of the pointing rotation, (Z x s, 1 + s.Z) normalized
+    norm = np.sqrt(2 * np.maximum(1 + sz, 0))
+    norm[anti_aligned] = 1
+    pointing_x = np.where(anti_aligned, 1, -sy / norm)
+    pointing_y = np.where(anti_aligned, 0, sx / norm)
+    pointing_w = np.where(anti_aligned, 0, norm / 2)
+
+    # Composition with the spin around Z
+    half_spin_angle = np.deg2rad(angular_velocity * (epochs - epochs[0])) / 2
+    cos_spin, sin_spin = np.cos(half_spin_angle), np.sin(half_spin_angle)
+    quaternions = np.empty((len(sz), 4))
+    quaternions[:, 0] = pointing_x * cos_spin + pointing_y * sin_spin
+    quaternions[:, 1] = pointing_y * cos_spin - pointing_x * sin_spin
+    quaternions[:, 2] = pointing_w * sin_spin
+    quaternions[:, 3] = pointing_w * cos_spin
+    return quaternions
+
+
 def compute_attitude_rotation(epochs, sun_directions):
     """
     Compute the rotation from the EME2000 frame to the TOLOSAT frame at each epoch.
@@ -26,26 +128,7 @@ def compute_attitude_rotation(epochs, sun_directions):
     full_rotation : scipy.spatial.transform.rotation.Rotation
         Rotations from EME2000 to TOLOSAT frame
     """
-    sun_pointing_rotation_axis = np.cross(np.array([0, 0, 1]), sun_directions)
-    sun_pointing_rotation_axis = sun_pointing_rotation_axis / np.linalg.norm(
-        sun_pointing_rotation_axis, axis=1, keepdims=True
-    )
-
-    sun_pointing_rotation_angle = np.arccos(sun_directions[:, 2])
-    sun_pointing_rotation_vector = (
-        sun_pointing_rotation_axis * sun_pointing_rotation_angle[:, None]
-    )
-    sun_pointing_rotation = R.from_rotvec(sun_pointing_rotation_vector)
-
-    elapsed_seconds = epochs - epochs[0]
-    satellite_axis_rotation_angle = np.deg2rad(angular_velocity * elapsed_seconds)
-    satellite_axis_rotation_Z_vector = (
-        np.array([0, 0, 1]) * satellite_axis_rotation_angle[:, None]
-    )
-    satellite_axis_rotation_Z = R.from_rotvec(satellite_axis_rotation_Z_vector)
-
-    full_rotation = sun_pointing_rotation * satellite_axis_rotation_Z
-    return full_rotation
+    return R.from_quat(compute_attitude_quaternion_array(epochs, sun_directions))
 
 
 def compute_attitude_quaternions(epochs, sun_directions):
@@ -64,8 +147,7 @@ def compute_attitude_quaternions(epochs, sun_directions):
     quaternions_df : pd.DataFrame
         Quaternions from EME2000 to TOLOSAT frame
     """
-    full_rotation = compute_attitude_rotation(epochs, sun_directions)
-    quaternions = full_rotation.as_quat()
+    quaternions = compute_attitude_quaternion_array(epochs, sun_directions)
     quaternions_df = pd.DataFrame(quaternions, columns=["QX", "QY", "QZ", "QW"])
     return quaternions_df
 
@@ -90,8 +172,5 @@ def compute_body_vectors(epochs, sun_directions):
     pZ_vector : np.ndarray
         Vector of the Z axis of TOLOSAT in EME2000 frame
     """
-    full_rotation = compute_attitude_rotation(epochs, sun_directions)
-    pX_vector = full_rotation.apply(np.array([1, 0, 0]))
-    pY_vector = full_rotation.apply(np.array([0, 1, 0]))
-    pZ_vector = full_rotation.apply(np.array([0, 0, 1]))
-    return pX_vector, pY_vector, pZ_vector
+    matrices = compute_attitude_matrices(epochs, sun_directions)
+    return matrices[:, :, 0], matrices[:, :, 1], matrices[:, :, 2]
@@ -1,11 +1,14 @@
 import pandas as pd
 from os import listdir
 
+from useful_functions.profiling import stage
+
 
 def get_list_of_contents(path):
     return [file.split(".")[0] for file in listdir(path)]
 
 
+@stage("get_results_dict")
 def get_results_dict(path):
     files = get_list_of_contents(path)
     results_dict = {}
@@ -2,11 +2,14 @@ import numpy as np
 import pandas as pd
 from tqdm import tqdm
 
-from attitude.sun_pointing_rotation import compute_body_vectors
+from attitude.attitude_laws import compute_body_vectors
 from results_processing import get_list_of_contents, get_results_dict
 from useful_functions import date_transformations as dt
 from useful_functions import get_spacecraft
-from useful_functions.constants import SPEED_OF_LIGHT
+from useful_functions.antenna import AntennaPattern, compute_link_margin
+from useful_functions.doppler import compute_doppler, compute_two_body_acceleration
+from useful_functions.profiling import stage
+from useful_functions.link_budget import LinkBudgetStream, LinkParameters
 
 Tolosat = get_spacecraft("Tolosat")
 galileo = get_spacecraft("Galileo")
@@ -20,6 +23,16 @@ semi_angle_limit_tolosat = Tolosat[
 ]  # deg semi-angle visibility
 semi_angle_limit_galileo = galileo["antenna_half_angle"]  # deg semi-angle visibility
 galileo_antennas_location = "pmX"  # "pmX" or "pmY"
+attitude_law = "sun_pointing"  # name of a law of attitude.attitude_laws
+tolosat_antenna_pattern = None  # gain table of input_data/antennas, None for the cone of semi_angle_limit_tolosat
+minimum_antenna_gain = 0  # dBi, gain needed to close the link with a gain table
+# LinkParameters of the Galileo to TOLOSAT link, e.g. LinkParameters(frequency=f0, transmitter_eirp=..., system_noise_temperature=...),
+# None to skip the link budget
+link_budget_parameters = None
+# Gain table of tolosat_antenna_pattern, loaded once for all the chunks
+tolosat_antenna = (
+    None if tolosat_antenna_pattern is None else AntennaPattern.from_file(tolosat_antenna_pattern)
+)
 
 selected_galileo = "GSAT0101 (PRN E11)"
 
@@ -29,18 +42,63 @@ selected_galileo_nospace = selected_galileo.replace(" ", "_")
 # pointage zenith // pointage soleil ??
 
 
+@stage("doppler")
 def compute_doppler_visibility(results_dict):
     sun_directions = results_dict["sun_direction"].to_numpy()
     epochs = results_dict["epochs"].to_numpy()
-    pX_vector, pY_vector, _ = compute_body_vectors(epochs, sun_directions)
+    states = results_dict["Tolosat"][["x", "y", "z", "vx", "vy", "vz"]].to_numpy()
+    pX_vector, pY_vector, _ = compute_body_vectors(
+        attitude_law, epochs, states, sun_directions
+    )
     if galileo_antennas_location == "pmX":
         galileo_antenna_1_vector = pX_vector
         galileo_antenna_2_vector = -pX_vector
+        antenna_reference_vector = pY_vector
     elif galileo_antennas_location == "pmY":
         galileo_antenna_1_vector = pY_vector
         galileo_antenna_2_vector = -pY_vector
+        antenna_reference_vector = pX_vector
     else:
         raise ValueError("galileo_antennas_location must be pmX or pmY")
+    # Doppler shift and rate of all the satellites at once, from the range rate and the relative acceleration
+    sat_names = [sat for sat in results_dict if "GSAT" in sat]
+    tolosat_positions = results_dict["Tolosat"][["x", "y", "z"]].to_numpy()
+    tolosat_velocities = results_dict["Tolosat"][["vx", "vy", "vz"]].to_numpy()
+    sat_positions = np.stack(
+        [results_dict[sat][["x", "y", "z"]].to_numpy() for sat in sat_names]
+    )
+    sat_velocities = np.stack(
+        [results_dict[sat][["vx", "vy", "vz"]].to_numpy() for sat in sat_names]
+    )
+    doppler_shifts, doppler_rates = compute_doppler(
+        sat_positions - tolosat_positions,
+        sat_velocities - tolosat_velocities,
+        f0,
+        compute_two_body_acceleration(sat_positions)
+        - compute_two_body_acceleration(tolosat_positions),
+    )
+    doppler_shifts = dict(zip(sat_names, doppler_shifts))
+    doppler_rates = dict(zip(sat_names, doppler_rates))
+    if tolosat_antenna_pattern is not None:
+        # Gain margin of the best TOLOSAT antenna for all the satellites and epochs at once
+        relative_positions = sat_positions - tolosat_positions
+        margins = np.maximum(
+            compute_link_margin(
+                tolosat_antenna,
+                relative_positions,
+                galileo_antenna_1_vector,
+                antenna_reference_vector,
+                minimum_antenna_gain,
+            )[1],
+            compute_link_margin(
+                tolosat_antenna,
+                relative_positions,
+                galileo_antenna_2_vector,
+                antenna_reference_vector,
+                minimum_antenna_gain,
+            )[1],
+        )
+        tolosat_margins = dict(zip(sat_names, margins))
     visibility = [results_dict["epochs"].copy().rename("epochs")]
     sat_results = [results_dict["epochs"].copy().rename("epochs")]
     for sat in tqdm(
@@ -68,23 +126,8 @@ def compute_doppler_visibility(results_dict):
             dv = np.sqrt(dv_x**2 + dv_y**2 + dv_z**2)
             results_dict[sat]["dv"] = dv
 
-            theta_r = np.arccos(
-                np.sum(relative_position * relative_velocity, axis=1)
-                / (
-                    np.linalg.norm(relative_position, axis=1)
-                    * np.linalg.norm(relative_velocity, axis=1)
-                )
-            )
-            results_dict[sat]["theta_r_deg"] = np.deg2rad(theta_r)
-            beta = dv / SPEED_OF_LIGHT
-            gamma = 1 / np.sqrt(1 - beta**2)
-
-            results_dict[sat]["doppler_shift"] = f0 * (
-                1 / (gamma * (1 + beta * np.cos(theta_r))) - 1
-            )
-            results_dict[sat]["doppler_rate"] = np.gradient(
-                results_dict[sat]["doppler_shift"], results_dict["epochs"]
-            )
+            results_dict[sat]["doppler_shift"] = doppler_shifts[sat]
+            results_dict[sat]["doppler_rate"] = doppler_rates[sat]
 
             tolosat_angle_1 = np.arccos(
                 np.sum(relative_position * galileo_antenna_1_vector, axis=1)
@@ -118,15 +161,20 @@ def compute_doppler_visibility(results_dict):
             results_dict[sat]["doppler_rate_OK"] = (
                 np.abs(results_dict[sat]["doppler_rate"]) <= delta_f_dot_limit
             )
-            results_dict[sat]["tolosat_visibility_OK"] = (
-                results_dict[sat]["tolosat_angle_1"] <= semi_angle_limit_tolosat
-            ) | (results_dict[sat]["tolosat_angle_2"] <= semi_angle_limit_tolosat)
+            if tolosat_antenna_pattern is None:
+                results_dict[sat]["tolosat_visibility_OK"] = (
+                    results_dict[sat]["tolosat_angle_1"] <= semi_angle_limit_tolosat
+                ) | (results_dict[sat]["tolosat_angle_2"] <= semi_angle_limit_tolosat)
+            else:
+                results_dict[sat]["tolosat_antenna_margin"] = tolosat_margins[sat]
+                results_dict[sat]["tolosat_visibility_OK"] = tolosat_margins[sat] >= 0
 
             results_dict[sat]["galileo_visibility_OK"] = (
                 results_dict[sat]["galileo_angle"] <= semi_angle_limit_galileo
             )
 
             dist = np.sqrt(dx ** 2 + dy ** 2 + dz ** 2)
+            results_dict[sat]["distance"] = dist
             results_dict[sat]["distance_OK"] = (
                     dist <= max_distance  # Maximum distance to establish communication
             )
@@ -188,9 +236,30 @@ folders = [int(x) for x in folders]
 folders.sort()
 
 print(f"Starting Doppler processing of {len(folders)} datasets...")
+link_budget_stream = None
 for folder in tqdm(folders, ncols=80, desc="Datasets", position=0, leave=True):
     results = get_results_dict(f"galileo_states/{folder}")
     tmp_visibility, tmp_windows, tmp_sat_results = compute_doppler_visibility(results)
+    if link_budget_parameters is not None:
+        sat_names = [sat for sat in results if "GSAT" in sat]
+        if link_budget_stream is None:
+            link_budget_stream = LinkBudgetStream(
+                "results/galileo_link_budget.col", sat_names, link_budget_parameters
+            )
+        link_budget_stream.append(
+            results["epochs"].to_numpy(),
+            np.stack([results[sat]["distance"].to_numpy() for sat in sat_names]),
+            None
+            if tolosat_antenna_pattern is None
+            else np.stack(
+                [
+                    results[sat]["tolosat_antenna_margin"].to_numpy()
+                    + minimum_antenna_gain
+                    for sat in sat_names
+                ]
+            ),
+            np.stack([results[sat]["all_OK"].to_numpy() for sat in sat_names]),
+        )
     galileo_visibility = pd.concat([galileo_visibility, tmp_visibility], ignore_index=True)
     galileo_windows = pd.concat([galileo_windows, tmp_windows], ignore_index=True)
     galileo_sat_results = pd.concat([galileo_sat_results, tmp_sat_results], ignore_index=True)
@@ -216,4 +285,8 @@ print(
 galileo_visibility.to_csv("results/galileo_visibility.csv")
 galileo_windows.to_csv("results/galileo_windows.csv")
 
+if link_budget_stream is not None:
+    link_budget_stream.close()
+    link_budget_stream.summary().to_csv("results/galileo_link_budget_summary.csv")
+
 print("Done")
@@ -0,0 +1,38 @@
+# Import statements
+from useful_functions import *
+
+# Initial settings
+orbit_name = "SSO6"
+spacecraft_name = "Tolosat"
+dates_name = "10years_10sec_iter"
+number_of_samples = 5000
+mission_duration = 3300 * 86400  # s, worst case duration of the CelestLab script
+output_path = "insertion_errors_monte_carlo.csv"
+
+# Standard deviations of the insertion errors, the maximum errors of the CelestLab script being 3 sigma
+standard_deviations = {
+    "sma": 35e3 / 3,
+    "ecc": 1.2e-3 / 3,
+    "inc": np.radians(0.2) / 3,
+    "RAAN": np.radians(0.2) / 3,
+}
+
+if __name__ == "__main__":
+    start_epoch = datetime_to_epoch(get_dates(dates_name)["start_date"])
+    nominal_elements = get_orbit_mean_elements(get_orbit(orbit_name), start_epoch)
+    spacecraft = get_spacecraft(spacecraft_name)
+    ballistic_coefficient = (
+        spacecraft["drag_coefficient"] * spacecraft["drag_area"] / spacecraft["mass"]
+    )
+
+    metrics = run_insertion_campaign(
+        nominal_elements,
+        start_epoch,
+        mission_duration,
+        ballistic_coefficient,
+        standard_deviations,
+        number_of_samples,
+        output_path,
+        seed=0,
+    )
+    print(metrics.describe().transpose()[["mean", "std", "min", "max"]])
@@ -8,7 +8,8 @@ from useful_functions import *
 iridium_url = (
     "https://celestrak.org/NORAD/elements/gp.php?GROUP=iridium-NEXT&FORMAT=tle"
 )
-TLEs_text = get(iridium_url).text
+with stage("tle_download"):
+    TLEs_text = get(iridium_url).text
 with open("TLEs.txt", "w", newline="") as f:
     f.write(TLEs_text)
 TLEs_lines = TLEs_text.splitlines()
@@ -38,24 +39,25 @@ target_epoch = datetime_to_epoch(target_datetime)
 
 # Sync Iridium satellites
 iridium_states_synced = []
-for i in tqdm(range(len(TLEs)), desc="Syncing TLEs", ncols=80, total=len(TLEs)):
-    tle_l1 = TLEs_lines[i * 3 + 1]
-    tle_l2 = TLEs_lines[i * 3 + 2]
-    sat = Satrec.twoline2rv(tle_l1, tle_l2)
-    _, teme_r, teme_v = sat.sgp4(target_jd, target_fr)
-    teme_state = np.concatenate((teme_r, teme_v)) * 1e3
-    final_state = teme_to_j2000(teme_state, target_epoch)
-    iridium_states_synced.append(
-        dict(
-            name=TLEs.iloc[i].loc["name"],
-            x=final_state[0],
-            y=final_state[1],
-            z=final_state[2],
-            vx=final_state[3],
-            vy=final_state[4],
-            vz=final_state[5],
-            epoch=target_epoch,
+with stage("tle_sync"):
+    for i in tqdm(range(len(TLEs)), desc="Syncing TLEs", ncols=80, total=len(TLEs)):
+        tle_l1 = TLEs_lines[i * 3 + 1]
+        tle_l2 = TLEs_lines[i * 3 + 2]
+        sat = Satrec.twoline2rv(tle_l1, tle_l2)
+        _, teme_r, teme_v = sat.sgp4(target_jd, target_fr)
+        teme_state = np.concatenate((teme_r, teme_v)) * 1e3
+        final_state = teme_to_j2000(teme_state, target_epoch)
+        iridium_states_synced.append(
+            dict(
+                name=TLEs.iloc[i].loc["name"],
+                x=final_state[0],
+                y=final_state[1],
+                z=final_state[2],
+                vx=final_state[3],
+                vy=final_state[4],
+                vz=final_state[5],
+                epoch=target_epoch,
+            )
         )
-    )
 iridium_states_synced = pd.DataFrame(iridium_states_synced)
 iridium_names = iridium_states_synced["name"].to_list()
@@ -1,7 +1,5 @@
 from iridium_doppler import (
-    IRIDIUM_visibility,
-    IRIDIUM_windows,
-    IRIDIUM_sat_results,
+    process_doppler_results,
     selected_iridium,
     selected_iridium_nospace,
 )
@@ -9,6 +7,8 @@ from iridium_doppler import (
 from useful_functions import plot_functions as pf
 import numpy as np
 
+IRIDIUM_visibility, IRIDIUM_windows, IRIDIUM_sat_results = process_doppler_results()
+
 max_seconds = IRIDIUM_visibility["seconds"].max()
 
 fig, axes = pf.dark_figure()
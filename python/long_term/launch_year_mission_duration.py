@@ -0,0 +1,38 @@
+# Import statements
+from pathlib import Path
+
+from useful_functions import *
+
+# After the star import, which exports the datetime module
+from datetime import datetime, timezone
+
+# Initial settings
+orbit_name = "SSO6"
+spacecraft_name = "Tolosat"
+launch_years = np.arange(2024, 2037)
+mission_duration = 3000 * 86400  # s, same as the CelestLab script
+output_path = str(
+    Path(__file__).parents[2]
+    / "celestlab"
+    / "LaunchYearMissionDuration"
+    / "launch_year_mission_duration.npz"
+)
+
+if __name__ == "__main__":
+    # Launch on January 2nd at noon of every year, as in the CelestLab script
+    launch_dates = [datetime(year, 1, 2, 12, tzinfo=timezone.utc) for year in launch_years]
+    spacecraft = get_spacecraft(spacecraft_name)
+    ballistic_coefficient = (
+        spacecraft["drag_coefficient"] * spacecraft["drag_area"] / spacecraft["mass"]
+    )
+
+    # Propagate every launch date in parallel, the results are read by celestlab/PythonPlots/LaunchYearMissionDuration.py
+    results = run_launch_date_sweep(
+        get_orbit(orbit_name),
+        launch_dates,
+        mission_duration,
+        ballistic_coefficient,
+        output_path=output_path,
+    )
+    for year, lifetime in zip(results["years"], results["lifetime"]):
+        print(f"Launch in {year}: lifetime of {lifetime / 86400 / 365.25:.2f} years")
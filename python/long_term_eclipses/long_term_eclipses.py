@@ -1,21 +1,17 @@
 # Import statements
-from tudatpy.kernel import numerical_simulation
-from tudatpy.kernel.astro import element_conversion
-from tudatpy.kernel.interface import spice
-from tudatpy.kernel.numerical_simulation import environment_setup, propagation_setup
-from tudatpy.util import result2array
+import pickle
 
+from attitude.attitude_laws import compute_attitude
 from useful_functions import *
 from useful_functions import plot_functions as pf
+from useful_functions.constants import EARTH_EQUATORIAL_RADIUS
 
 # Initial settings (independent of tudat)
 orbit_name = "SSO6"
 dates_name = "10years_10sec_iter"
 spacecraft_name = "Tolosat"
 groundstation_name = "toulouse"
-
-# Load spice kernels
-spice.load_standard_kernels([])
+attitude_law = "sun_pointing"  # name of a law of attitude.attitude_laws, for the environment fluxes of the faces
 
 # Set simulation start and end epochs (in seconds since J2000 = January 1, 2000 at 00:00:00)
 dates = get_dates(dates_name)
@@ -23,186 +19,110 @@ simulation_start_date = dates["start_date"]
 simulation_end_date = dates["end_date"]
 propagation_duration = dates["propagation_days"]
 
-# Create default body settings and bodies system
-bodies_to_create = [
-    "Earth",
-    "Sun",
-    "Moon",
-    "Jupiter",
-]
-global_frame_origin = "Earth"
-global_frame_orientation = "J2000"
-body_settings = environment_setup.get_default_body_settings(
-    bodies_to_create, global_frame_origin, global_frame_orientation
-)
-bodies = environment_setup.create_system_of_bodies(body_settings)
-
-# Add vehicle object to system of bodies
-bodies.create_empty_body("Spacecraft")
-bodies.get("Spacecraft").mass = get_spacecraft(spacecraft_name)["mass"]
-
-# Create aerodynamic coefficient interface settings, and add to vehicle
-reference_area = get_spacecraft(spacecraft_name)["drag_area"]
-drag_coefficient = get_spacecraft(spacecraft_name)["drag_coefficient"]
-aero_coefficient_settings = environment_setup.aerodynamic_coefficients.constant(
-    reference_area, [drag_coefficient, 0, 0]
-)
-environment_setup.add_aerodynamic_coefficient_interface(
-    bodies, "Spacecraft", aero_coefficient_settings
+# Create the environment and the acceleration models once for all the chunks
+simulation = MissionSimulation(
+    bodies_to_create=["Earth", "Sun", "Moon", "Jupiter"],
+    fixed_step_size=dates["step_size"].total_seconds(),
 )
-
-# Create radiation pressure settings, and add to vehicle
-reference_area_radiation = get_spacecraft(spacecraft_name)["srp_area"]
-radiation_pressure_coefficient = get_spacecraft(spacecraft_name)[
-    "reflectivity_coefficient"
-]
-occulting_bodies = ["Earth"]
-radiation_pressure_settings = environment_setup.radiation_pressure.cannonball(
-    "Sun", reference_area_radiation, radiation_pressure_coefficient, occulting_bodies
-)
-environment_setup.add_radiation_pressure_interface(
-    bodies, "Spacecraft", radiation_pressure_settings
-)
-
-# Define bodies that are propagated and their respective central bodies
-bodies_to_propagate = ["Spacecraft"]
-central_bodies = ["Earth"]
-
-# Define accelerations acting on the spacecraft
-acceleration_settings_spacecraft = dict(
-    Sun=[
-        propagation_setup.acceleration.cannonball_radiation_pressure(),
-        propagation_setup.acceleration.point_mass_gravity(),
-    ],
-    Earth=[
-        propagation_setup.acceleration.spherical_harmonic_gravity(10, 10),
-        propagation_setup.acceleration.aerodynamic(),
-    ],
-    Moon=[propagation_setup.acceleration.point_mass_gravity()],
-)
-
-acceleration_settings = {"Spacecraft": acceleration_settings_spacecraft}
-
-# Create acceleration models
-acceleration_models = propagation_setup.create_acceleration_models(
-    bodies, acceleration_settings, bodies_to_propagate, central_bodies
+simulation.add_spacecraft(
+    "Spacecraft",
+    get_spacecraft_acceleration_settings(10, 10, third_bodies=["Moon"]),
+    spacecraft=get_spacecraft(spacecraft_name),
 )
 
 # Set initial conditions for the satellite
-earth_gravitational_parameter = bodies.get("Earth").gravitational_parameter
-orbit = get_orbit(orbit_name)
-initial_state = element_conversion.keplerian_to_cartesian_elementwise(
-    gravitational_parameter=earth_gravitational_parameter,
-    semi_major_axis=orbit["semi_major_axis"],
-    eccentricity=orbit["eccentricity"],
-    inclination=np.deg2rad(orbit["inclination"]),
-    argument_of_periapsis=np.deg2rad(orbit["argument_of_periapsis"]),
-    longitude_of_ascending_node=get_sso_raan(
-        orbit["mean_local_time"], datetime_to_epoch(simulation_start_date)
-    ),
-    true_anomaly=np.deg2rad(orbit["true_anomaly"]),
-)
-
-# Setup dependent variables to be save
-sun_position_dep_var = propagation_setup.dependent_variable.relative_position(
-    "Sun", "Earth"
+initial_state = simulation.get_initial_state(
+    get_orbit(orbit_name), datetime_to_epoch(simulation_start_date)
 )
+sun_radius = simulation.bodies.get("Sun").shape_model.average_radius
+earth_radius = simulation.bodies.get("Earth").shape_model.average_radius
 
-# Set fixed step size
-fixed_step_size = dates["step_size"].total_seconds()
+# Folder where the eclipses of each chunk are saved, so that an interrupted run can be resumed
+chunks_folder = "eclipses_chunks"
+checkpoint_path = f"{chunks_folder}_checkpoint.json"
+chunk_outputs = ["eclipses", "completed_orbits", "eclipse_statistics", "mean_elements"]
 
-# First iteration
-propagation_start_date = simulation_start_date
-propagation_end_date = propagation_start_date + propagation_duration
+# Per-orbit statistics accumulated chunk by chunk, resumed from the last chunk skipped by run_chunked_propagation
+eclipse_statistics = EclipseStatistics()
+completed_chunks = get_completed_chunks(checkpoint_path, chunks_folder, chunk_outputs)
+if completed_chunks:
+    with open(f"{chunks_folder}/{completed_chunks[-1]}/eclipse_statistics.pkl", "rb") as file:
+        eclipse_statistics = pickle.load(file)
 
-# Initialize eclipses DataFrame
-all_eclipses = pd.DataFrame(columns=["start", "end", "duration", "partial"])
 
-for propagation_number in tqdm(
-    range(
-        int((simulation_end_date - simulation_start_date) / propagation_duration) + 1
-    ),
-    desc="Propagation",
-    ncols=80,
+def propagate_chunk(
+    propagation_number, propagation_start_date, propagation_end_date, initial_state
 ):
-    # Convert to epochs
-    propagation_start_epoch = datetime_to_epoch(propagation_start_date)
-    propagation_end_epoch = datetime_to_epoch(propagation_end_date)
-
-    # Create termination settings
-    termination_time = propagation_setup.propagator.time_termination(
-        propagation_end_epoch
-    )
-    termination_altitude = propagation_setup.propagator.dependent_variable_termination(
-        dependent_variable_settings=propagation_setup.dependent_variable.altitude(
-            "Spacecraft", "Earth"
-        ),
-        limit_value=100.0e3,
-        use_as_lower_limit=True,
-        terminate_exactly_on_final_condition=False,
-    )
-    termination_settings = propagation_setup.propagator.hybrid_termination(
-        [termination_time, termination_altitude], fulfill_single_condition=True
-    )
-
-    # Create propagation settings
-    propagator_settings = propagation_setup.propagator.translational(
-        central_bodies,
-        acceleration_models,
-        bodies_to_propagate,
+    # Propagate the dynamics over the chunk
+    states_array, _ = simulation.propagate(
+        datetime_to_epoch(propagation_start_date),
+        datetime_to_epoch(propagation_end_date),
         initial_state,
-        termination_settings,
-        output_variables=[sun_position_dep_var],
-    )
-
-    # Create numerical integrator settings
-
-    integrator_settings = propagation_setup.integrator.runge_kutta_4(
-        propagation_start_epoch, fixed_step_size
-    )
-
-    # Create simulation object and propagate the dynamics
-    dynamics_simulator = numerical_simulation.SingleArcSimulator(
-        bodies,
-        integrator_settings,
-        propagator_settings,
-        print_state_data=False,
-        print_dependent_variable_data=False,
     )
 
-    # Extract the resulting state history and convert it to a ndarray
-    states = dynamics_simulator.state_history
-    states_array = result2array(states)
-    dependent_variables_history = dynamics_simulator.dependent_variable_history
-    dependent_variables_history_array = result2array(dependent_variables_history)
-
-    sun_radius = bodies.get("Sun").shape_model.average_radius
-    earth_radius = bodies.get("Earth").shape_model.average_radius
     satellite_position = states_array[:, 1:4]
-    sun_position = dependent_variables_history_array[:, 1:4]
     epochs = states_array[:, 0]
+    # Analytic ephemeris interpolated on an hourly grid instead of a dependent variable at every step
+    sun_position = get_body_position("Sun", epochs)
 
-    # Store the eclipses results
+    # Store the eclipses results of the chunk
+    shadow = compute_shadow_vector(satellite_position, sun_position, sun_radius, earth_radius)
     eclipses = compute_eclipses(
         satellite_position,
         sun_position,
         sun_radius,
         earth_radius,
-        epoch_to_datetime(epochs),
+        epochs,
         eclipse_type="Umbra",
+        shadow_vector=shadow,
     )
-    if all_eclipses.empty:
-        if not eclipses.empty:
-            all_eclipses = eclipses
-    elif not all_eclipses.empty and not eclipses.empty:
-        all_eclipses = pd.concat([all_eclipses, eclipses], ignore_index=True)
-
-    # Update initial conditions
-    initial_state = states_array[-1, 1:7]
-
-    # Update propagation dates
-    propagation_start_date = propagation_end_date
-    propagation_end_date = propagation_start_date + propagation_duration
+    eclipse_statistics.append(epochs, states_array[:, 1:7], sun_position, eclipses)
+    makedirs(f"{chunks_folder}/{propagation_number}", exist_ok=True)
+    eclipses.to_pickle(f"{chunks_folder}/{propagation_number}/eclipses.pkl")
+    # The orbits completed in the chunk, and the small state of the accumulator to resume from it
+    with open(f"{chunks_folder}/{propagation_number}/completed_orbits.pkl", "wb") as file:
+        pickle.dump(eclipse_statistics.pop_completed_orbits(), file)
+    with open(f"{chunks_folder}/{propagation_number}/eclipse_statistics.pkl", "wb") as file:
+        pickle.dump(eclipse_statistics, file)
+    # Mean elements of each complete orbit, for the long term evolution of the orbit
+    pd.DataFrame(compute_mean_elements(epochs, states_array[:, 1:7])).to_pickle(
+        f"{chunks_folder}/{propagation_number}/mean_elements.pkl"
+    )
+
+    # Solar, albedo and Earth infrared fluxes of the faces, for the power and thermal analyses (read_environment_flux)
+    matrices, _ = compute_attitude(
+        attitude_law,
+        epochs,
+        states_array[:, 1:7],
+        get_sun_direction(epochs, satellite_position),
+        use_cache=False,
+    )
+    with EnvironmentFluxStream(
+        f"{chunks_folder}/{propagation_number}/environment_flux.col", earth_radius=earth_radius
+    ) as environment_flux:
+        environment_flux.append(epochs, satellite_position, sun_position, matrices, shadow)
+
+    # Final state is the initial state of the next chunk
+    return states_array[-1, 1:7]
+
+
+# Propagate chunk by chunk, resuming from the last completed chunk if the run was interrupted
+run_chunked_propagation(
+    propagate_chunk,
+    initial_state,
+    simulation_start_date,
+    simulation_end_date,
+    propagation_duration,
+    checkpoint_path,
+    output_folder=chunks_folder,
+    output_names=chunk_outputs,
+)
+
+# Gather the eclipses of the chunks of this run, as recorded in the checkpoint
+completed_chunks = get_completed_chunks(checkpoint_path, chunks_folder, chunk_outputs)
+all_eclipses = [pd.read_pickle(f"{chunks_folder}/{chunk}/eclipses.pkl") for chunk in completed_chunks]
+all_eclipses = [eclipses for eclipses in all_eclipses if not eclipses.empty]
+all_eclipses = pd.concat(all_eclipses, ignore_index=True)
 all_eclipses["partial"] = all_eclipses["partial"].astype("boolean")
 print("Done!")
 
@@ -213,6 +133,17 @@ all_eclipses["seconds"] = all_eclipses["timedelta"].dt.total_seconds()
 
 all_eclipses.to_csv("all_eclipses.csv", index=False)
 
+# Per-orbit and seasonal statistics
+completed_orbits = []
+for chunk in completed_chunks:
+    with open(f"{chunks_folder}/{chunk}/completed_orbits.pkl", "rb") as file:
+        completed_orbits.append(pickle.load(file))
+orbit_statistics = eclipse_statistics.orbit_statistics(completed_orbits)
+orbit_statistics.to_csv("orbit_eclipse_statistics.csv", index=False)
+seasonal_statistics = compute_seasonal_statistics(orbit_statistics)
+seasonal_statistics.to_csv("seasonal_eclipse_statistics.csv")
+print(seasonal_statistics)
+
 # To import results and plot again
 # all_eclipses = pd.read_csv("all_eclipses.csv", parse_dates=["start", "end"], infer_datetime_format=True)
 # all_eclipses['timedelta'] = pd.to_timedelta(all_eclipses['timedelta'])
@@ -221,12 +152,12 @@ fig, axes = pf.dark_figure()
 axes[0].vlines(
     all_eclipses["seconds"] / 86400 / 365.25,
     0,
-    all_eclipses["duration"].dt.total_seconds() / 60,
+    all_eclipses["duration"] / 60,
 )
 axes[0].set_title("Evolution of the eclipse duration over the entire mission")
 axes[0].set_xlabel("Time since launch [years]")
 axes[0].set_ylabel("Eclipse duration [mins]")
-axes[0].set_ylim(0, all_eclipses["duration"].max().total_seconds() / 60)
+axes[0].set_ylim(0, all_eclipses["duration"].max() / 60)
 axes[0].set_xlim(0, all_eclipses["seconds"].max() / 86400 / 365.25)
 pf.finish_dark_figure(fig, "all_eclipses_dark.png", show=True, force_y_int=True)
 
@@ -234,11 +165,47 @@ fig, axes = pf.light_figure()
 axes[0].vlines(
     all_eclipses["seconds"] / 86400 / 365.25,
     0,
-    all_eclipses["duration"].dt.total_seconds() / 60,
+    all_eclipses["duration"] / 60,
 )
 axes[0].set_title("Evolution of the eclipse duration over the entire mission")
 axes[0].set_xlabel("Time since launch [years]")
 axes[0].set_ylabel("Eclipse duration [mins]")
-axes[0].set_ylim(0, all_eclipses["duration"].max().total_seconds() / 60)
+axes[0].set_ylim(0, all_eclipses["duration"].max() / 60)
 axes[0].set_xlim(0, all_eclipses["seconds"].max() / 86400 / 365.25)
 pf.finish_light_figure(fig, "all_eclipses_light.png", show=True, force_y_int=True)
+
+complete_orbits = orbit_statistics[~orbit_statistics["partial"]]
+orbit_years = (complete_orbits["start_epoch"] - datetime_to_epoch(simulation_start_date)) / 86400 / 365.25
+fig, axes = pf.light_figure(subplots=(2, 1))
+axes[0].plot(orbit_years, complete_orbits["eclipse_fraction"] * 100)
+axes[0].set_title("Eclipse fraction of each orbit")
+axes[0].set_ylabel("Eclipse fraction [%]")
+axes[1].plot(orbit_years, np.degrees(complete_orbits["beta"]))
+axes[1].set_title("Mean beta angle of each orbit")
+axes[1].set_xlabel("Time since launch [years]")
+axes[1].set_ylabel("Beta angle [deg]")
+pf.finish_light_figure(fig, "orbit_eclipse_statistics_light.png", show=True)
+
+# Long term evolution of the mean elements, as plotted from STELA in celestlab/PythonPlots
+mean_elements = pd.concat(
+    [pd.read_pickle(f"{chunks_folder}/{chunk}/mean_elements.pkl") for chunk in completed_chunks],
+    ignore_index=True,
+)
+mean_elements.to_csv("mean_elements.csv", index=False)
+element_years = (mean_elements["epochs"] - datetime_to_epoch(simulation_start_date)) / 86400 / 365.25
+fig, axes = pf.light_figure(subplots=(2, 3), figsize=(10, 6.5))
+axes[0].plot(element_years, (mean_elements["sma"] - EARTH_EQUATORIAL_RADIUS) / 1e3)
+axes[0].set_ylabel("Altitude [km]")
+axes[1].plot(element_years, np.degrees(mean_elements["inc"]))
+axes[1].set_ylabel("Inclination [deg]")
+axes[2].plot(element_years, mean_elements["ecc"])
+axes[2].set_ylabel("Eccentricity [-]")
+axes[3].plot(element_years, np.degrees(mean_elements["pom"]))
+axes[3].set_ylabel("Argument of perigee [deg]")
+axes[4].plot(element_years, np.degrees(mean_elements["RAAN"]))
+axes[4].set_ylabel("RAAN [deg]")
+axes[5].plot(element_years, mean_elements["mltan"])
+axes[5].set_ylabel("MLTAN [hours]")
+for ax in axes:
+    ax.set_xlabel("Time since launch [years]")
+pf.finish_light_figure(fig, "mean_elements_light.png", show=True)
@@ -0,0 +1,312 @@
+# Benchmark of the hot paths of the analysis scripts on synthetic trajectories, without tudat propagation nor SPICE
+#
+# Each case is timed on consecutive chunks of 1-second data covering 1 day, 1 year or 10 years. A case that exceeds its
+# time budget is stopped and its total time is extrapolated from the chunks that were measured. The results are
+# written to a JSON file that can be compared with the file of another commit:
+#
+#     python test/benchmark_hot_paths.py --sizes 1day 1year --output baseline.json
+#     python test/benchmark_hot_paths.py --sizes 1day 1year --compare baseline.json
+import argparse
+import contextlib
+import io
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from os import makedirs, path
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+python_folder = Path(__file__).parents[1]
+sys.path.insert(0, str(python_folder))
+sys.path.insert(0, str(python_folder.joinpath("iridium")))
+
+from useful_functions.ephemeris import get_sun_position  # noqa: E402
+from useful_functions.synthetic_trajectory import (  # noqa: E402
+    get_walker_elements,
+    propagate_keplerian_j2,
+)
+
+sizes = {"1day": 86400, "1year": 365 * 86400, "10years": 3652 * 86400}
+start_epoch = 757382400.0  # 2024-01-01 00:00:00
+earth_rotation_rate = 7.292115e-5  # rad/s
+sun_radius = 696000e3  # m
+earth_radius = 6378136.3  # m
+
+
+def generate_chunk(chunk_start, chunk_duration, number_of_satellites):
+    """
+    Synthetic data of one chunk: TOLOSAT on a 500 km sun-synchronous orbit and an Iridium-like constellation, with the
+    J2 drift since the start of the benchmark.
+    """
+    epochs = chunk_start + np.arange(chunk_duration, dtype=float)
+    tolosat = propagate_keplerian_j2(
+        [6878136.3, 0.0, np.deg2rad(97.4), 0.0, 0.0, 0.0], epochs - start_epoch
+    )[0]
+    constellation = propagate_keplerian_j2(
+        get_walker_elements(
+            7158136.3,
+            np.deg2rad(86.4),
+            6,
+            int(np.ceil(number_of_satellites / 6)),
+            raan_spread=np.pi,
+        )[:number_of_satellites],
+        epochs - start_epoch,
+    )
+    sun_position = get_sun_position(epochs)
+    sun_direction = sun_position - tolosat[:, :3]
+    sun_direction /= np.linalg.norm(sun_direction, axis=1, keepdims=True)
+    angle = earth_rotation_rate * (epochs - start_epoch)
+    position_ecf = np.column_stack(
+        [
+            np.cos(angle) * tolosat[:, 0] + np.sin(angle) * tolosat[:, 1],
+            -np.sin(angle) * tolosat[:, 0] + np.cos(angle) * tolosat[:, 1],
+            tolosat[:, 2],
+        ]
+    )
+    return {
+        "epochs": epochs,
+        "tolosat": tolosat,
+        "constellation": constellation,
+        "sun_position": sun_position,
+        "sun_direction": sun_direction,
+        "position_ecf": position_ecf,
+    }
+
+
+def results_dict_of(chunk):
+    """
+    Chunk in the layout of the pickles of the propagation scripts, as returned by get_results_dict.
+    """
+    columns = ["x", "y", "z", "vx", "vy", "vz"]
+    results_dict = {
+        "epochs": pd.Series(chunk["epochs"]),
+        "sun_direction": pd.DataFrame(chunk["sun_direction"]),
+        "Tolosat": pd.DataFrame(chunk["tolosat"], columns=columns),
+    }
+    for ii, states in enumerate(chunk["constellation"]):
+        results_dict[f"IRIDIUM {100 + ii}"] = pd.DataFrame(states, columns=columns)
+    return results_dict
+
+
+def case_shadow_vector(chunk, folder):
+    from useful_functions.eclipses import compute_shadow_vector
+
+    return lambda: compute_shadow_vector(
+        chunk["tolosat"][:, :3], chunk["sun_position"], sun_radius, earth_radius
+    )
+
+
+def case_eclipses(chunk, folder):
+    from useful_functions.eclipses import compute_eclipses
+
+    return lambda: compute_eclipses(
+        chunk["tolosat"][:, :3],
+        chunk["sun_position"],
+        sun_radius,
+        earth_radius,
+        chunk["epochs"],
+    )
+
+
+def case_communication_windows(chunk, folder):
+    from useful_functions.communication_windows import compute_communication_windows
+
+    return lambda: compute_communication_windows(
+        chunk["position_ecf"], "toulouse", chunk["epochs"]
+    )
+
+
+def case_epoch_to_datetime(chunk, folder):
+    from useful_functions.date_transformations import epoch_to_datetime
+
+    return lambda: epoch_to_datetime(chunk["epochs"])
+
+
+def case_datetime_to_epoch(chunk, folder):
+    from useful_functions.date_transformations import datetime_to_epoch, epoch_to_datetime
+
+    datetimes = epoch_to_datetime(chunk["epochs"])
+    return lambda: datetime_to_epoch(datetimes)
+
+
+def case_body_vectors(chunk, folder):
+    from attitude.attitude_laws import compute_body_vectors
+
+    return lambda: compute_body_vectors(
+        "sun_pointing", chunk["epochs"], chunk["tolosat"], chunk["sun_direction"]
+    )
+
+
+def case_doppler_visibility(chunk, folder):
+    from iridium_doppler import compute_doppler_visibility
+
+    results_dict = results_dict_of(chunk)
+    return lambda: compute_doppler_visibility(results_dict)
+
+
+def case_cic_export(chunk, folder):
+    from visualization.cic_ccsds import generate_cic_files
+
+    return lambda: generate_cic_files(
+        chunk["epochs"],
+        chunk["tolosat"],
+        chunk["sun_direction"],
+        path=f"{folder}/",
+        mute=True,
+    )
+
+
+def case_pickle_loading(chunk, folder):
+    from results_processing import get_results_dict
+
+    pickle_folder = f"{folder}/states"
+    makedirs(pickle_folder, exist_ok=True)
+    for name, data in results_dict_of(chunk).items():
+        data.to_pickle(f"{pickle_folder}/{name}.pkl")
+    return lambda: get_results_dict(pickle_folder)
+
+
+cases = {
+    "compute_shadow_vector": case_shadow_vector,
+    "compute_eclipses": case_eclipses,
+    "compute_communication_windows": case_communication_windows,
+    "epoch_to_datetime": case_epoch_to_datetime,
+    "datetime_to_epoch": case_datetime_to_epoch,
+    "compute_body_vectors": case_body_vectors,
+    "compute_doppler_visibility": case_doppler_visibility,
+    "generate_cic_files": case_cic_export,
+    "get_results_dict": case_pickle_loading,
+}
+
+
+def run_case(case, duration, chunk_duration, number_of_satellites, time_budget):
+    """
+    Time a case on consecutive chunks until the duration is covered or the time budget is exceeded.
+    """
+    number_of_chunks = int(np.ceil(duration / chunk_duration))
+    measured = 0.0
+    chunks_done = 0
+    case_start = time.perf_counter()
+    with tempfile.TemporaryDirectory() as folder:
+        for chunk_number in range(number_of_chunks):
+            chunk_start = start_epoch + chunk_number * chunk_duration
+            chunk = generate_chunk(
+                chunk_start,
+                min(chunk_duration, duration - chunk_number * chunk_duration),
+                number_of_satellites,
+            )
+            try:
+                function = cases[case](chunk, folder)
+            except ImportError as error:
+                return {"skipped": str(error)}
+            with contextlib.redirect_stdout(io.StringIO()):
+                tic = time.perf_counter()
+                function()
+                measured += time.perf_counter() - tic
+            chunks_done += 1
+            if time.perf_counter() - case_start > time_budget:
+                break
+    return {
+        "seconds": measured * number_of_chunks / chunks_done,
+        "chunks_measured": chunks_done,
+        "chunks_total": number_of_chunks,
+        "extrapolated": chunks_done < number_of_chunks,
+    }
+
+
+def get_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=python_folder,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results, baseline, threshold):
+    """
+    Print the ratio of each timing to the baseline and return the cases slower than threshold times the baseline.
+    """
+    regressions = []
+    print(f"\nComparison with {baseline['commit']} ({baseline['date']})")
+    for case, timings in results["results"].items():
+        for size, timing in timings.items():
+            reference = baseline["results"].get(case, {}).get(size, {})
+            if "seconds" not in timing or "seconds" not in reference:
+                continue
+            ratio = timing["seconds"] / reference["seconds"]
+            flag = "  REGRESSION" if ratio > threshold else ""
+            print(f"{case:32s}{size:>9s}{ratio:9.2f}x{flag}")
+            if ratio > threshold:
+                regressions.append((case, size, ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark of the hot paths on synthetic trajectories")
+    parser.add_argument("--sizes", nargs="+", default=["1day"], choices=list(sizes))
+    parser.add_argument("--cases", nargs="+", default=list(cases), choices=list(cases))
+    parser.add_argument("--chunk-duration", type=int, default=6 * 3600, help="seconds of 1-second data per chunk")
+    parser.add_argument("--satellites", type=int, default=66, help="satellites of the synthetic constellation")
+    parser.add_argument("--time-budget", type=float, default=30.0, help="seconds per case and size before extrapolating")
+    parser.add_argument("--output", help="JSON file of the results, by default test/results/benchmark_<commit>.json")
+    parser.add_argument("--compare", help="JSON file of a baseline to compare with")
+    parser.add_argument("--threshold", type=float, default=1.2, help="ratio to the baseline reported as a regression")
+    arguments = parser.parse_args()
+
+    commit = get_commit()
+    results = {
+        "commit": commit,
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "chunk_duration": arguments.chunk_duration,
+        "satellites": arguments.satellites,
+        "results": {},
+    }
+    for case in arguments.cases:
+        results["results"][case] = {}
+        for size in arguments.sizes:
+            timing = run_case(
+                case,
+                sizes[size],
+                arguments.chunk_duration,
+                arguments.satellites,
+                arguments.time_budget,
+            )
+            results["results"][case][size] = timing
+            if "skipped" in timing:
+                print(f"{case:32s}{size:>9s}  skipped: {timing['skipped']}")
+            else:
+                extrapolated = " (extrapolated)" if timing["extrapolated"] else ""
+                print(f"{case:32s}{size:>9s}{timing['seconds']:12.3f} s{extrapolated}")
+
+    output = arguments.output or str(
+        python_folder.joinpath("test", "results", f"benchmark_{commit}.json")
+    )
+    if path.dirname(output):
+        makedirs(path.dirname(output), exist_ok=True)
+    with open(output, "w") as file:
+        json.dump(results, file, indent=2)
+    print(f"Results written to {output}")
+
+    if arguments.compare:
+        with open(arguments.compare) as file:
+            baseline = json.load(file)
+        if compare(results, baseline, arguments.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
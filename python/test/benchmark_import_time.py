@@ -0,0 +1,34 @@
+# Import time of the useful_functions package, each statement being run in a fresh interpreter
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+
+python_folder = str(Path(__file__).parents[1])
+number_of_runs = 5
+statements = [
+    "import useful_functions",
+    "from useful_functions import get_orbit, get_spacecraft, get_dates",
+    "from useful_functions import propagate_mean_elements",
+    "from useful_functions import *",
+]
+
+for statement in statements:
+    code = (
+        "import time; start = time.perf_counter(); "
+        f"{statement}; print(time.perf_counter() - start)"
+    )
+    durations = [
+        float(
+            subprocess.run(
+                [sys.executable, "-c", code],
+                cwd=python_folder,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.split()[-1]
+        )
+        for _ in range(number_of_runs)
+    ]
+    print(f"{np.median(durations) * 1e3:8.1f} ms  {statement}")
@@ -0,0 +1,95 @@
+# Resume test of run_chunked_propagation, with a propagate_chunk that accumulates results from one chunk to the next
+# like the eclipse statistics of long_term_eclipses.py
+#
+# A full run is compared with a run whose checkpoint is complete but whose middle chunk outputs were deleted: the
+# accumulator is reloaded from the last chunk returned by get_completed_chunks, and all the following chunks must be
+# propagated again so that the final accumulator is the same. Run with pytest or as a script.
+import pickle
+import shutil
+import sys
+import tempfile
+from datetime import datetime, timedelta, timezone
+from os import remove
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parents[1]))
+
+from useful_functions.checkpoint import (  # noqa: E402
+    get_completed_chunks,
+    run_chunked_propagation,
+)
+
+start_date = datetime(2024, 1, 1, tzinfo=timezone.utc)
+end_date = datetime(2024, 1, 5, 12, tzinfo=timezone.utc)
+propagation_duration = timedelta(days=1)
+initial_state = np.array([7000e3, 0.0, 0.0, 0.0, 7.5e3, 0.0])
+
+
+def run(folder):
+    """
+    Run the chunked propagation in folder, resuming from its checkpoint, and return the chunks that were propagated
+    and the final accumulator.
+    """
+    chunks_folder = f"{folder}/chunks"
+    checkpoint_path = f"{chunks_folder}_checkpoint.json"
+    accumulator = {"sum": 0.0, "chunks": []}
+    completed_chunks = get_completed_chunks(checkpoint_path, chunks_folder, ["accumulator"])
+    if completed_chunks:
+        with open(f"{chunks_folder}/{completed_chunks[-1]}/accumulator.pkl", "rb") as file:
+            accumulator = pickle.load(file)
+    propagated = []
+
+    def propagate_chunk(propagation_number, propagation_start_date, propagation_end_date, state):
+        propagated.append(propagation_number)
+        state = state + 1.0
+        accumulator["sum"] += state[0]
+        accumulator["chunks"].append(propagation_number)
+        Path(f"{chunks_folder}/{propagation_number}").mkdir(parents=True, exist_ok=True)
+        with open(f"{chunks_folder}/{propagation_number}/accumulator.pkl", "wb") as file:
+            pickle.dump(accumulator, file)
+        return state
+
+    final_state = run_chunked_propagation(
+        propagate_chunk,
+        initial_state,
+        start_date,
+        end_date,
+        propagation_duration,
+        checkpoint_path,
+        output_folder=chunks_folder,
+        output_names=["accumulator"],
+    )
+    return propagated, accumulator, final_state
+
+
+def test_resume_after_missing_middle_chunk(tmp_path):
+    reference, reference_accumulator, reference_state = run(tmp_path / "reference")
+    assert reference == [0, 1, 2, 3, 4]
+
+    # Complete run, then the outputs of a middle chunk are lost
+    run(tmp_path / "resumed")
+    remove(tmp_path / "resumed" / "chunks" / "2" / "accumulator.pkl")
+    assert get_completed_chunks(
+        f"{tmp_path}/resumed/chunks_checkpoint.json", f"{tmp_path}/resumed/chunks", ["accumulator"]
+    ) == [0, 1]
+
+    propagated, accumulator, final_state = run(tmp_path / "resumed")
+    assert propagated == [2, 3, 4]
+    assert accumulator == reference_accumulator
+    np.testing.assert_array_equal(final_state, reference_state)
+
+    # Nothing left to propagate
+    propagated, accumulator, final_state = run(tmp_path / "resumed")
+    assert propagated == []
+    np.testing.assert_array_equal(final_state, reference_state)
+
+
+if __name__ == "__main__":
+    folder = Path(tempfile.mkdtemp())
+    try:
+        test_resume_after_missing_middle_chunk(folder)
+    finally:
+        shutil.rmtree(folder)
+    print("Resume after a missing middle chunk: OK")
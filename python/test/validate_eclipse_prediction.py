@@ -0,0 +1,69 @@
+# Validation of the beta angle eclipse predictor (predict_eclipses) against compute_eclipses
+#
+# The eclipses of sun-synchronous orbits are computed with compute_eclipses on 1-second synthetic J2 trajectories over
+# a few days spread over one year, and compared with the durations predicted from the mean elements at the middle of
+# each eclipse. compute_eclipses measures the duration from the first to the last epoch in eclipse, so it is one step
+# shorter than the predicted one on average.
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parents[1]))
+
+from useful_functions.beta_angle import predict_eclipses  # noqa: E402
+from useful_functions.eclipses import compute_eclipses  # noqa: E402
+from useful_functions.ephemeris import get_body_position  # noqa: E402
+from useful_functions.sun_synchronous import get_sso_raan  # noqa: E402
+from useful_functions.synthetic_trajectory import (  # noqa: E402
+    get_j2_secular_rates,
+    propagate_keplerian_j2,
+)
+
+start_epoch = 757382400.0  # 2024-01-01 00:00:00
+sun_radius = 696000e3  # m
+earth_radius = 6371008.0  # m, average radius used by tudat
+orbits = {
+    "SSO 500 km 10h30": (6878136.3, 10.5),
+    "SSO 500 km 6h30": (6878136.3, 6.5),
+    "SSO 1000 km 13h00": (7378136.3, 13.0),
+}
+
+for name, (semi_major_axis, mean_local_time) in orbits.items():
+    inclination = np.radians(97.4)
+    initial_raan = get_sso_raan(mean_local_time, start_epoch)
+    raan_rate, _, _ = get_j2_secular_rates(semi_major_axis, 0.0, inclination)
+    errors = []
+    for day in range(0, 365, 15):
+        epochs = start_epoch + day * 86400 + np.arange(0, 6 * 3600, 1.0)
+        positions = propagate_keplerian_j2(
+            [semi_major_axis, 0.0, inclination, 0.0, initial_raan, 0.0],
+            epochs - start_epoch,
+        )[0, :, :3]
+        eclipses = compute_eclipses(
+            positions,
+            get_body_position("Sun", epochs),
+            sun_radius,
+            earth_radius,
+            epochs,
+        )
+        eclipses = eclipses[~eclipses["partial"]]
+        if eclipses.empty:
+            continue
+        middle = (eclipses["start_epoch"] + eclipses["end_epoch"]).to_numpy() / 2
+        prediction = predict_eclipses(
+            semi_major_axis,
+            inclination,
+            initial_raan + raan_rate * (middle - start_epoch),
+            middle,
+            earth_radius=earth_radius,
+        )
+        errors.append(prediction["eclipse_duration"] - eclipses["duration"].to_numpy())
+    if not errors:
+        print(f"{name:20s} no eclipse")
+        continue
+    errors = np.concatenate(errors)
+    print(
+        f"{name:20s} {len(errors):4d} eclipses, error mean {errors.mean():6.2f} s, "
+        f"max {np.abs(errors).max():6.2f} s"
+    )
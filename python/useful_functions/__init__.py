@@ -1,9 +1,118 @@
-from .eclipses import *
-from .communication_windows import *
-from .frame_transformations import *
-from .get_input_data import *
-from .plot_functions import *
-from .read_write import *
-from .date_transformations import *
-from .sun_synchronous import *
-from tqdm import tqdm
+"""
+Useful functions for the mission analysis scripts.
+
+The submodules are imported lazily: `import useful_functions` or `from useful_functions import get_orbit` only import
+the submodules that are actually used, so that scripts that do not need tudatpy, astropy or plotly do not pay for
+their import. `from useful_functions import *` still imports every submodule and exports the same names as before,
+including the names imported by the former star imported submodules (np, pd, makedirs, datetime, ...). The other
+submodules only export their public names, so that their own imports do not shadow these.
+
+The public names of each submodule are the ones of its __all__ list, which is read from the source file on the first
+lookup so that a name is mapped to its submodule without importing the others.
+"""
+import ast
+import importlib
+import pkgutil
+import re
+from os import path
+
+# Submodules that were star imported, in the order of the former star imports (a name exported by several
+# submodules resolves to the last one). They also export the names that they import.
+_star_import_modules = (
+    "eclipses",
+    "communication_windows",
+    "frame_transformations",
+    "get_input_data",
+    "plot_functions",
+    "read_write",
+    "date_transformations",
+    "sun_synchronous",
+)
+# Public names of each submodule, read from its __all__ without importing it
+_submodule_names = None
+_lazy_names = None
+_star_names = None
+
+
+def _import_submodule(module_name):
+    return importlib.import_module(f".{module_name}", __name__)
+
+
+def _get_submodule_names():
+    """
+    Read the __all__ list of every submodule from its source file, so that a name can be mapped to its submodule
+    without importing all of them. Submodules without __all__ (constants) are not exported.
+    """
+    global _submodule_names, _lazy_names
+    if _submodule_names is None:
+        module_names = list(_star_import_modules) + sorted(
+            module.name
+            for module in pkgutil.iter_modules(__path__)
+            if module.name not in _star_import_modules
+        )
+        _submodule_names = {}
+        for module_name in module_names:
+            with open(path.join(__path__[0], f"{module_name}.py"), encoding="utf-8") as file:
+                names = re.search(r"^__all__ = (\[.*?\])", file.read(), re.DOTALL | re.MULTILINE)
+            if names is not None:
+                _submodule_names[module_name] = ast.literal_eval(names.group(1))
+        _lazy_names = {
+            name: module_name
+            for module_name, names in _submodule_names.items()
+            for name in names
+        }
+    return _submodule_names
+
+
+def _import_all():
+    """
+    Import every submodule and add all their public names to the package, as the former star imports did.
+    """
+    global _star_names
+    if _star_names is None:
+        namespace = {}
+        for module_name in _get_submodule_names():
+            module = _import_submodule(module_name)
+            if module_name in _star_import_modules:
+                namespace.update(
+                    (name, value)
+                    for name, value in vars(module).items()
+                    if not name.startswith("_")
+                )
+            else:
+                namespace.update((name, getattr(module, name)) for name in module.__all__)
+        from tqdm import tqdm
+
+        namespace["tqdm"] = tqdm
+        globals().update(namespace)
+        # The imported submodules are attributes of the package, and were exported as well
+        _star_names = [
+            name
+            for name in globals()
+            if not name.startswith("_") and name not in ("ast", "importlib", "pkgutil", "re")
+        ]
+    return _star_names
+
+
+def __getattr__(name):
+    if name == "__all__":
+        return _import_all()
+    if name.startswith("__"):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    _get_submodule_names()
+    if name in _lazy_names:
+        value = getattr(_import_submodule(_lazy_names[name]), name)
+    elif name in _submodule_names or name == "constants":
+        value = _import_submodule(name)
+    else:
+        _import_all()
+        if name not in globals():
+            raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+        value = globals()[name]
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    _get_submodule_names()
+    return sorted(set(globals()) | set(_lazy_names) | set(_submodule_names))
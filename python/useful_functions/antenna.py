@@ -0,0 +1,200 @@
+import numpy as np
+
+from useful_functions.get_input_data import input_data_path
+
+__all__ = [
+    "antenna_pattern_path",
+    "read_antenna_pattern",
+    "AntennaPattern",
+    "compute_antenna_angles",
+    "compute_link_margin",
+]
+
+antenna_pattern_path = f"{input_data_path}/antennas"
+
+
+def read_antenna_pattern(file_name):
+    """
+    Read a gain table of input_data/antennas.
+
+    The first row contains the azimuth angles (in degrees, from 0 to less than 360) after a label cell, and each of the
+    following rows contains an off-boresight angle (in degrees, from 0 to 180) followed by the gains at each azimuth
+    (in dBi). A table with a single azimuth column describes an axisymmetric antenna. Rows starting with "#" are
+    comments.
+
+    Parameters
+    ----------
+    file_name : str
+        Name of the file, without extension
+
+    Returns
+    -------
+    off_boresight_angles : np.ndarray
+        Off-boresight angles of the table in degrees, shape (M,)
+    azimuth_angles : np.ndarray
+        Azimuth angles of the table in degrees, shape (P,)
+    gains : np.ndarray
+        Gains in dBi, shape (M, P)
+    """
+    table = np.genfromtxt(
+        f"{antenna_pattern_path}/{file_name}.csv", delimiter=",", comments="#"
+    )
+    return table[1:, 0], table[0, 1:], table[1:, 1:]
+
+
+class AntennaPattern:
+    """
+    Gain pattern of an antenna, resampled once on a regular grid of off-boresight and azimuth angles so that the gain of
+    any number of directions is a single array lookup.
+
+    Parameters
+    ----------
+    off_boresight_angles : np.ndarray
+        Off-boresight angles of the table in degrees, increasing, shape (M,)
+    azimuth_angles : np.ndarray
+        Azimuth angles of the table in degrees, increasing in [0, 360), shape (P,)
+    gains : np.ndarray
+        Gains in dBi, shape (M, P). Directions outside the table are given the gain of the nearest angle. A gain of
+        -inf marks the directions in which the link cannot be established.
+    resolution : float, optional
+        Step of the lookup grid in degrees, by default 0.5. The largest off-boresight angle with a finite gain is kept
+        exactly, so that the lookup never makes a direction beyond it visible.
+    """
+
+    def __init__(self, off_boresight_angles, azimuth_angles, gains, resolution=0.5):
+        off_boresight_angles = np.asarray(off_boresight_angles, dtype=float)
+        azimuth_angles = np.atleast_1d(np.asarray(azimuth_angles, dtype=float))
+        gains = np.asarray(gains, dtype=float).reshape(len(off_boresight_angles), -1)
+        self.resolution = resolution
+        finite_rows = np.isfinite(gains).any(axis=1)
+        self.maximum_off_boresight = (
+            off_boresight_angles[finite_rows].max() if finite_rows.any() else -np.inf
+        )
+        if finite_rows[-1]:
+            self.maximum_off_boresight = 180.0
+
+        # Bilinear interpolation of the table on the grid, one axis after the other
+        grid_off_boresight = np.arange(0, 180 + resolution / 2, resolution)
+        columns = np.array(
+            [np.interp(grid_off_boresight, off_boresight_angles, column) for column in gains.T]
+        ).T
+        if len(azimuth_angles) == 1:
+            self.grid = columns
+        else:
+            grid_azimuth = np.arange(0, 360, resolution)
+            self.grid = np.array(
+                [
+                    np.interp(grid_azimuth, azimuth_angles, row, period=360)
+                    for row in columns
+                ]
+            )
+
+    @classmethod
+    def from_file(cls, file_name, resolution=0.5):
+        """
+        Create the pattern of a gain table of input_data/antennas, see read_antenna_pattern.
+        """
+        return cls(*read_antenna_pattern(file_name), resolution=resolution)
+
+    @classmethod
+    def from_half_angle(cls, half_angle, peak_gain=0.0, resolution=0.5):
+        """
+        Create the pattern equivalent to a visibility cone: peak_gain up to the half angle (in degrees) and no gain
+        (-inf dBi) beyond.
+        """
+        edge = np.nextafter(half_angle, 180)
+        return cls(
+            [0, half_angle, edge, 180],
+            [0],
+            [[peak_gain], [peak_gain], [-np.inf], [-np.inf]],
+            resolution=resolution,
+        )
+
+    def gain(self, off_boresight, azimuth=None):
+        """
+        Gain of the antenna in given directions.
+
+        Parameters
+        ----------
+        off_boresight : np.ndarray
+            Off-boresight angles in degrees, any shape
+        azimuth : np.ndarray, optional
+            Azimuth angles in degrees, same shape, not needed for an axisymmetric pattern
+
+        Returns
+        -------
+        gain : np.ndarray
+            Gains in dBi, same shape as off_boresight
+        """
+        off_boresight = np.clip(off_boresight, 0, 180)
+        # Nearest cell of the grid, without rounding up past the last visible angle
+        row = np.rint(off_boresight / self.resolution).astype(int)
+        if np.isfinite(self.maximum_off_boresight):
+            row = np.minimum(row, int(np.floor(self.maximum_off_boresight / self.resolution)))
+        if self.grid.shape[1] == 1 or azimuth is None:
+            gain = self.grid[row, 0]
+        else:
+            column = np.rint(np.mod(azimuth, 360) / self.resolution).astype(int)
+            gain = self.grid[row, column % self.grid.shape[1]]
+        # Visibility is tested on the exact angle, the rounding only applies to the gain
+        return np.where(off_boresight > self.maximum_off_boresight, -np.inf, gain)
+
+
+def compute_antenna_angles(directions, boresights, references):
+    """
+    Compute the off-boresight and azimuth angles of directions in the frame of an antenna.
+
+    Parameters
+    ----------
+    directions : np.ndarray
+        Directions to the other end of the link, not necessarily normalized, shape (..., N, 3)
+    boresights : np.ndarray
+        Unit boresight vectors of the antenna, shape (N, 3)
+    references : np.ndarray
+        Unit vectors orthogonal to the boresight, from which the azimuth is measured, shape (N, 3)
+
+    Returns
+    -------
+    off_boresight : np.ndarray
+        Off-boresight angles in degrees, shape (..., N)
+    azimuth : np.ndarray
+        Azimuth angles in degrees, in [0, 360), shape (..., N)
+    """
+    distances = np.sqrt(np.einsum("...i,...i->...", directions, directions))
+    along_boresight = np.einsum("...i,...i->...", directions, boresights) / distances
+    along_reference = np.einsum("...i,...i->...", directions, references)
+    along_third_axis = np.einsum(
+        "...i,...i->...", directions, np.cross(boresights, references)
+    )
+    off_boresight = np.rad2deg(np.arccos(np.clip(along_boresight, -1, 1)))
+    azimuth = np.mod(np.rad2deg(np.arctan2(along_third_axis, along_reference)), 360)
+    return off_boresight, azimuth
+
+
+def compute_link_margin(pattern, directions, boresights, references, minimum_gain):
+    """
+    Compute the gain and the gain margin of an antenna towards the other end of links, for all links and epochs at once.
+
+    Parameters
+    ----------
+    pattern : AntennaPattern
+        Gain pattern of the antenna
+    directions : np.ndarray
+        Directions to the other end of the links, shape (..., N, 3), typically (number of satellites, N, 3)
+    boresights : np.ndarray
+        Unit boresight vectors of the antenna, shape (N, 3)
+    references : np.ndarray
+        Unit vectors orthogonal to the boresight, from which the azimuth of the pattern is measured, shape (N, 3)
+    minimum_gain : float
+        Gain needed to close the link in dBi
+
+    Returns
+    -------
+    gain : np.ndarray
+        Gains in dBi, shape (..., N)
+    margin : np.ndarray
+        Gain minus the minimum gain in dB, the link being visible where it is non-negative, shape (..., N)
+    """
+    off_boresight, azimuth = compute_antenna_angles(directions, boresights, references)
+    gain = pattern.gain(off_boresight, azimuth)
+    return gain, gain - minimum_gain
@@ -0,0 +1,134 @@
+from pathlib import Path
+
+import numpy as np
+
+from useful_functions.constants import CNES_JULIAN_DAY_J2000
+
+__all__ = [
+    "solar_activity_path",
+    "SOLAR_CYCLE_DURATION",
+    "read_solar_activity",
+    "SolarActivity",
+    "get_atmospheric_density",
+]
+
+solar_activity_path = Path(__file__).parents[2] / "celestlab" / "Data"
+SOLAR_CYCLE_DURATION = 11 * 365.25 * 86400  # s
+
+
+def read_solar_activity(file_name="acsol2022_2030.txt"):
+    """
+    Read a STELA solar activity file (daily solar flux and 3-hourly Ap indices).
+
+    Parameters
+    ----------
+    file_name : str, optional
+        Name of the file in the celestlab/Data folder, or path to the file, by default "acsol2022_2030.txt"
+
+    Returns
+    -------
+    epochs : np.ndarray
+        Epochs in seconds since J2000
+    solar_flux : np.ndarray
+        Daily F10.7 solar flux (in solar flux units)
+    geomagnetic_index : np.ndarray
+        Daily mean of the 3-hourly Ap indices
+    """
+    file_path = Path(file_name)
+    if not file_path.is_file():
+        file_path = solar_activity_path / file_name
+    data = np.loadtxt(file_path, comments="#")
+    epochs = (data[:, 0] - CNES_JULIAN_DAY_J2000) * 86400 + data[:, 1]
+    return epochs, data[:, 2], np.mean(data[:, 3:], axis=1)
+
+
+class SolarActivity:
+    """
+    Solar activity model, interpolating a STELA solar activity file at any epoch.
+
+    Outside of the file, the solar activity is repeated with the period of the solar cycle (11 years), and held at the
+    closest value of the file if no full cycle is available. A constant solar activity can also be used instead of a
+    file.
+
+    Parameters
+    ----------
+    file_name : str, optional
+        Name of the STELA solar activity file in the celestlab/Data folder, by default "acsol2022_2030.txt"
+    solar_flux : float, optional
+        Constant F10.7 solar flux, overrides the file if given along with geomagnetic_index
+    geomagnetic_index : float, optional
+        Constant Ap index, overrides the file if given along with solar_flux
+    """
+
+    def __init__(self, file_name="acsol2022_2030.txt", solar_flux=None, geomagnetic_index=None):
+        if solar_flux is not None and geomagnetic_index is not None:
+            self.epochs = None
+            self.solar_flux = float(solar_flux)
+            self.geomagnetic_index = float(geomagnetic_index)
+        else:
+            self.epochs, self.solar_flux, self.geomagnetic_index = read_solar_activity(file_name)
+
+    def __call__(self, epochs):
+        """
+        Get the solar activity at the requested epochs.
+
+        Parameters
+        ----------
+        epochs : float or np.ndarray
+            Epochs in seconds since J2000
+
+        Returns
+        -------
+        solar_flux : np.ndarray
+            F10.7 solar flux (in solar flux units)
+        geomagnetic_index : np.ndarray
+            Ap index
+        """
+        epochs = np.asarray(epochs, dtype=float)
+        if self.epochs is None:
+            return (
+                np.full(epochs.shape, self.solar_flux),
+                np.full(epochs.shape, self.geomagnetic_index),
+            )
+        # Shift the epochs outside of the file by whole solar cycles, as long as they stay inside the file
+        number_of_cycles = np.where(
+            epochs > self.epochs[-1],
+            np.floor((epochs - self.epochs[0]) / SOLAR_CYCLE_DURATION),
+            np.where(
+                epochs < self.epochs[0],
+                -np.floor((self.epochs[-1] - epochs) / SOLAR_CYCLE_DURATION),
+                0,
+            ),
+        )
+        shifted_epochs = epochs - number_of_cycles * SOLAR_CYCLE_DURATION
+        return (
+            np.interp(shifted_epochs, self.epochs, self.solar_flux),
+            np.interp(shifted_epochs, self.epochs, self.geomagnetic_index),
+        )
+
+
+def get_atmospheric_density(altitude, solar_flux, geomagnetic_index):
+    """
+    Get the atmospheric density with a simple exponential model driven by the solar activity. The exospheric
+    temperature is a linear function of the solar flux and Ap index, from which the scale height is derived.
+    Valid between about 150 and 1000 km, vectorized over all the inputs.
+
+    Parameters
+    ----------
+    altitude : float or np.ndarray
+        Altitude (in meters)
+    solar_flux : float or np.ndarray
+        F10.7 solar flux (in solar flux units)
+    geomagnetic_index : float or np.ndarray
+        Ap index
+
+    Returns
+    -------
+    density : float or np.ndarray
+        Atmospheric density (in kg/m^3)
+    """
+    altitude = np.asarray(altitude) / 1e3
+    temperature = 900 + 2.5 * (np.asarray(solar_flux) - 70) + 1.5 * np.asarray(geomagnetic_index)
+    molecular_mass = 27 - 0.012 * (np.clip(altitude, 180, 1000) - 200)
+    scale_height = temperature / molecular_mass
+    return 6e-10 * np.exp(-(altitude - 175) / scale_height)
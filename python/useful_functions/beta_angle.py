@@ -0,0 +1,203 @@
+import numpy as np
+
+from useful_functions.constants import EARTH_EQUATORIAL_RADIUS, SUN_RADIUS
+from useful_functions.ephemeris import get_body_position
+from useful_functions.semi_analytical import get_orbit_mean_elements
+from useful_functions.synthetic_trajectory import get_j2_secular_rates
+
+__all__ = ["get_orbit_normal", "get_beta_angle", "get_eclipse_fraction", "predict_eclipses", "compute_eclipse_map"]
+
+
+def get_orbit_normal(inclination, right_ascension):
+    """
+    Get the unit vector normal to the orbital plane, vectorized over orbits.
+
+    Parameters
+    ----------
+    inclination : float or np.ndarray
+        Inclination (in radians)
+    right_ascension : float or np.ndarray
+        Right ascension of the ascending node (in radians)
+
+    Returns
+    -------
+    normal : np.ndarray
+        Unit vector along the angular momentum in the inertial frame, shape (..., 3)
+    """
+    sin_inc = np.sin(inclination)
+    return np.stack(
+        (
+            sin_inc * np.sin(right_ascension),
+            -sin_inc * np.cos(right_ascension),
+            np.cos(inclination) * np.ones_like(sin_inc * right_ascension),
+        ),
+        axis=-1,
+    )
+
+
+def get_beta_angle(inclination, right_ascension, sun_position):
+    """
+    Get the beta angle, i.e. the angle between the orbital plane and the direction of the Sun.
+
+    Parameters
+    ----------
+    inclination : float or np.ndarray
+        Inclination (in radians)
+    right_ascension : float or np.ndarray
+        Right ascension of the ascending node (in radians)
+    sun_position : np.ndarray
+        Position of the Sun in the same inertial frame, shape (..., 3)
+
+    Returns
+    -------
+    beta : float or np.ndarray
+        Beta angle (in radians), positive when the Sun is on the side of the angular momentum
+    """
+    sun_position = np.asarray(sun_position)
+    sun_direction = sun_position / np.linalg.norm(sun_position, axis=-1, keepdims=True)
+    normal = get_orbit_normal(inclination, right_ascension)
+    return np.arcsin(np.clip(np.sum(normal * sun_direction, axis=-1), -1, 1))
+
+
+def get_eclipse_fraction(semi_major_axis, beta, earth_radius=EARTH_EQUATORIAL_RADIUS):
+    """
+    Get the fraction of a circular orbit spent in the Earth's shadow, with a cylindrical shadow model.
+
+    Parameters
+    ----------
+    semi_major_axis : float or np.ndarray
+        Semi-major axis (in meters)
+    beta : float or np.ndarray
+        Beta angle (in radians)
+    earth_radius : float, optional
+        Earth radius (in meters), by default the equatorial radius
+
+    Returns
+    -------
+    fraction : float or np.ndarray
+        Fraction of the orbital period in eclipse, between 0 and 0.5
+    """
+    semi_major_axis = np.asarray(semi_major_axis)
+    cos_angle = np.sqrt(np.maximum(semi_major_axis ** 2 - earth_radius ** 2, 0)) / (
+        semi_major_axis * np.cos(beta)
+    )
+    return np.arccos(np.minimum(cos_angle, 1)) / np.pi
+
+
+def predict_eclipses(
+    semi_major_axis,
+    inclination,
+    right_ascension,
+    epochs,
+    sun_position=None,
+    earth_radius=EARTH_EQUATORIAL_RADIUS,
+    eclipse_type="Umbra",
+):
+    """
+    Predict the eclipses of near circular orbits from their mean elements, without propagating the trajectory: the
+    eclipse duration of each revolution only depends on the beta angle and the altitude. All the inputs are broadcast
+    together, so the histories of propagate_mean_elements or run_launch_date_sweep can be given directly.
+
+    The conical shadow is approximated by a cylinder whose radius is the one of the cone where the orbit enters it.
+    Compared to compute_eclipses on a 500 km sun-synchronous orbit sampled every second with the same Earth radius,
+    the durations agree within about a second.
+
+    Parameters
+    ----------
+    semi_major_axis : float or np.ndarray
+        Mean semi-major axis (in meters)
+    inclination : float or np.ndarray
+        Mean inclination (in radians)
+    right_ascension : float or np.ndarray
+        Mean right ascension of the ascending node (in radians)
+    epochs : float or np.ndarray
+        Epochs (in seconds since J2000)
+    sun_position : np.ndarray, optional
+        Position of the Sun, shape (..., 3), by default from the interpolated analytic ephemeris
+    earth_radius : float, optional
+        Earth radius (in meters), by default the equatorial radius
+    eclipse_type : string, optional
+        Umbra, Penumbra or Cylindrical (the shadow of get_eclipse_fraction), by default Umbra
+
+    Returns
+    -------
+    prediction : dict of np.ndarray
+        "beta" (radians), "eclipse_fraction", "eclipse_duration" (seconds per revolution) and "period" (nodal period
+        in seconds)
+    """
+    epochs = np.asarray(epochs, dtype=float)
+    if sun_position is None:
+        sun_position = get_body_position("Sun", epochs.ravel()).reshape(epochs.shape + (3,))
+    beta = get_beta_angle(inclination, right_ascension, sun_position)
+    semi_major_axis = np.asarray(semi_major_axis, dtype=float)
+
+    # Radius of the shadow cone at the distance behind the Earth where the orbit crosses it
+    sun_distance = np.linalg.norm(sun_position, axis=-1)
+    depth = np.sqrt(np.maximum(semi_major_axis ** 2 - earth_radius ** 2, 0))
+    if eclipse_type == "Umbra":
+        shadow_radius = earth_radius - depth * (SUN_RADIUS - earth_radius) / sun_distance
+    elif eclipse_type == "Penumbra":
+        shadow_radius = earth_radius + depth * (SUN_RADIUS + earth_radius) / sun_distance
+    elif eclipse_type == "Cylindrical":
+        shadow_radius = earth_radius
+    else:
+        raise ValueError("Type must be Umbra, Penumbra or Cylindrical")
+    eclipse_fraction = get_eclipse_fraction(semi_major_axis, beta, shadow_radius)
+    # Nodal period, the argument of latitude drifting with J2
+    _, pom_rate, mean_anomaly_rate = get_j2_secular_rates(semi_major_axis, 0.0, inclination)
+    period = 2 * np.pi / (pom_rate + mean_anomaly_rate)
+    return {
+        "beta": beta,
+        "eclipse_fraction": eclipse_fraction,
+        "eclipse_duration": eclipse_fraction * period,
+        "period": period * np.ones_like(eclipse_fraction),
+    }
+
+
+def compute_eclipse_map(
+    orbit,
+    launch_epochs,
+    duration,
+    step_size=86400.0,
+    earth_radius=EARTH_EQUATORIAL_RADIUS,
+    eclipse_type="Umbra",
+):
+    """
+    Predict the eclipse durations of an orbit for many launch dates, the RAAN drifting with the secular J2 rate from
+    its value at each launch date. Decades of launch dates take seconds, as there is no propagation.
+
+    Parameters
+    ----------
+    orbit : dict
+        Orbit as returned by get_orbit, the RAAN being computed at each launch date if it has a mean local time
+    launch_epochs : np.ndarray
+        Launch epochs (in seconds since J2000)
+    duration : float
+        Duration after each launch (in seconds)
+    step_size : float, optional
+        Step of the map (in seconds), by default one day
+    earth_radius : float, optional
+        Earth radius (in meters), by default the equatorial radius
+    eclipse_type : string, optional
+        Umbra, Penumbra or Cylindrical, by default Umbra
+
+    Returns
+    -------
+    eclipse_map : dict of np.ndarray
+        "epochs" (seconds since J2000), "RAAN" (radians) and the outputs of predict_eclipses, of shape
+        (number of steps, number of launch dates)
+    """
+    launch_epochs = np.atleast_1d(np.asarray(launch_epochs, dtype=float))
+    elements = np.array([get_orbit_mean_elements(orbit, epoch) for epoch in launch_epochs])
+    sma, ecc, inc, _, initial_raan = elements.T
+    raan_rate, _, _ = get_j2_secular_rates(sma, ecc, inc)
+
+    times = np.arange(0, duration + step_size / 2, step_size)[:, None]
+    epochs = launch_epochs + times
+    raan = np.mod(initial_raan + raan_rate * times, 2 * np.pi)
+    eclipse_map = predict_eclipses(
+        sma, inc, raan, epochs, earth_radius=earth_radius, eclipse_type=eclipse_type
+    )
+    eclipse_map["epochs"] = epochs
+    eclipse_map["RAAN"] = raan
+    return eclipse_map
@@ -0,0 +1,204 @@
+import json
+from os import makedirs, path, replace
+
+import numpy as np
+from tqdm import tqdm
+
+from useful_functions.profiling import stage
+
+__all__ = [
+    "load_checkpoint",
+    "save_checkpoint",
+    "get_completed_chunks",
+    "chunk_outputs_exist",
+    "run_chunked_propagation",
+]
+
+
+def load_checkpoint(checkpoint_path):
+    """
+    Load the checkpoint of a chunked propagation.
+
+    Parameters
+    ----------
+    checkpoint_path : str
+        Path to the JSON checkpoint file
+
+    Returns
+    -------
+    checkpoint : dict or None
+        Content of the checkpoint file, or None if no checkpoint exists yet
+    """
+    if not path.isfile(checkpoint_path):
+        return None
+    with open(checkpoint_path, "r") as f:
+        return json.load(f)
+
+
+def save_checkpoint(checkpoint_path, checkpoint):
+    """
+    Save the checkpoint of a chunked propagation. The file is first written to a temporary file and then renamed, so
+    that a crash during the write never leaves a corrupted checkpoint behind.
+
+    Parameters
+    ----------
+    checkpoint_path : str
+        Path to the JSON checkpoint file
+    checkpoint : dict
+        Content of the checkpoint file
+    """
+    folder = path.dirname(checkpoint_path)
+    if folder:
+        makedirs(folder, exist_ok=True)
+    with open(checkpoint_path + ".tmp", "w") as f:
+        json.dump(checkpoint, f)
+    replace(checkpoint_path + ".tmp", checkpoint_path)
+
+
+def chunk_outputs_exist(output_folder, propagation_number, output_names):
+    """
+    Check whether all the output files of a propagation chunk exist.
+
+    Parameters
+    ----------
+    output_folder : str
+        Folder containing one sub-folder per propagation chunk
+    propagation_number : int
+        Index of the propagation chunk
+    output_names : list of str
+        Names of the pickle files (without extension) written for each chunk
+
+    Returns
+    -------
+    exist : bool
+        True if all the output files of the chunk exist
+    """
+    return all(
+        path.isfile(f"{output_folder}/{propagation_number}/{name}.pkl")
+        for name in output_names
+    )
+
+
+def get_completed_chunks(checkpoint_path, output_folder=None, output_names=None):
+    """
+    Get the chunks of a chunked propagation that are already completed, as recorded in its checkpoint. Folders of
+    other runs left in the output folder are therefore ignored.
+
+    Parameters
+    ----------
+    checkpoint_path : str
+        Path to the JSON checkpoint file
+    output_folder : str, optional
+        Folder containing one sub-folder per chunk, used to check that the outputs of a completed chunk still exist
+    output_names : list of str, optional
+        Names of the pickle files (without extension) written for each chunk
+
+    Returns
+    -------
+    completed_chunks : list of int
+        Indices of the completed chunks, from the first chunk up to the first one that is missing
+    """
+    checkpoint = load_checkpoint(checkpoint_path)
+    if checkpoint is None:
+        return []
+    completed_chunks = []
+    while str(len(completed_chunks)) in checkpoint["final_states"] and (
+        output_folder is None
+        or chunk_outputs_exist(output_folder, len(completed_chunks), output_names or [])
+    ):
+        completed_chunks.append(len(completed_chunks))
+    return completed_chunks
+
+
+def run_chunked_propagation(
+    propagate_chunk,
+    initial_state,
+    simulation_start_date,
+    simulation_end_date,
+    propagation_duration,
+    checkpoint_path,
+    output_folder=None,
+    output_names=None,
+):
+    """
+    Run a propagation chunk by chunk, saving a checkpoint after each chunk so that an interrupted run can be resumed
+    from the last completed chunk.
+
+    The checkpoint stores the final state of every completed chunk. When the run is restarted, the chunks returned by
+    get_completed_chunks are skipped, and the propagation resumes from the final state of the last skipped chunk. All
+    the chunks after it are propagated again, even if they are recorded in the checkpoint.
+
+    Parameters
+    ----------
+    propagate_chunk : callable
+        Function called as propagate_chunk(propagation_number, propagation_start_date, propagation_end_date,
+        initial_state). It must propagate the chunk, export its outputs and return the final state of the chunk.
+    initial_state : list or np.ndarray
+        Initial state of the first chunk
+    simulation_start_date : datetime.datetime
+        Start date of the whole simulation
+    simulation_end_date : datetime.datetime
+        End date of the whole simulation
+    propagation_duration : datetime.timedelta
+        Duration of each chunk
+    checkpoint_path : str
+        Path to the JSON checkpoint file
+    output_folder : str, optional
+        Folder containing one sub-folder per chunk, used to check that the outputs of a completed chunk still exist
+    output_names : list of str, optional
+        Names of the pickle files (without extension) written for each chunk
+
+    Returns
+    -------
+    final_state : np.ndarray
+        Final state of the last chunk
+    """
+    run_settings = {
+        "start_date": simulation_start_date.isoformat(),
+        "end_date": simulation_end_date.isoformat(),
+        "propagation_seconds": propagation_duration.total_seconds(),
+        "initial_state": np.asarray(initial_state, dtype=float).tolist(),
+    }
+    checkpoint = load_checkpoint(checkpoint_path)
+    if checkpoint is None:
+        checkpoint = dict(run_settings, final_states={})
+    elif any(checkpoint[key] != value for key, value in run_settings.items()):
+        raise ValueError(
+            f"Checkpoint {checkpoint_path} was created for a different propagation, delete it to start over"
+        )
+
+    number_of_chunks = (
+        int((simulation_end_date - simulation_start_date) / propagation_duration) + 1
+    )
+    # Chunks after the first incomplete one are propagated again, since propagate_chunk may accumulate results
+    # (statistics, streams) from one chunk to the next
+    number_of_completed_chunks = len(get_completed_chunks(checkpoint_path, output_folder, output_names))
+    checkpoint["final_states"] = {
+        key: value for key, value in checkpoint["final_states"].items() if int(key) < number_of_completed_chunks
+    }
+    state = np.asarray(initial_state, dtype=float)
+    for propagation_number in tqdm(
+        range(number_of_chunks),
+        desc="Propagation",
+        ncols=80,
+    ):
+        propagation_start_date = (
+            simulation_start_date + propagation_number * propagation_duration
+        )
+        propagation_end_date = propagation_start_date + propagation_duration
+
+        if propagation_number < number_of_completed_chunks:
+            state = np.array(checkpoint["final_states"][str(propagation_number)])
+            continue
+
+        with stage("propagation_chunk"):
+            state = np.asarray(
+                propagate_chunk(
+                    propagation_number, propagation_start_date, propagation_end_date, state
+                ),
+                dtype=float,
+            )
+        checkpoint["final_states"][str(propagation_number)] = state.tolist()
+        checkpoint["last_chunk"] = propagation_number
+        save_checkpoint(checkpoint_path, checkpoint)
+    return state
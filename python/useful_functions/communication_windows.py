@@ -4,6 +4,8 @@ from pyproj import Transformer
 from useful_functions.get_input_data import get_station
 from useful_functions.date_transformations import epoch_to_datetime
 
+__all__ = ["compute_visibility_vector", "compute_communication_windows"]
+
 
 def compute_visibility_vector(
     pos_ecf: np.ndarray, groundstation_name: str
@@ -1 +1,14 @@
 SPEED_OF_LIGHT = 299792458.0  # m/s
+EARTH_GRAVITATIONAL_PARAMETER = 3.986004418e14  # m^3/s^2
+EARTH_EQUATORIAL_RADIUS = 6378136.3  # m
+EARTH_J2 = 1.0826266835531513e-3  # unitless
+EARTH_J3 = -2.5326564853322355e-6  # unitless
+EARTH_J4 = -1.6196215913670001e-6  # unitless
+SUN_GRAVITATIONAL_PARAMETER = 1.32712440018e20  # m^3/s^2
+MOON_GRAVITATIONAL_PARAMETER = 4.9028e12  # m^3/s^2
+OBLIQUITY_J2000 = 0.40909280422232897  # rad, 23.43929111 deg
+CNES_JULIAN_DAY_J2000 = 18262.5  # days since 1950-01-01 00:00:00
+BOLTZMANN_CONSTANT = 1.380649e-23  # J/K
+ASTRONOMICAL_UNIT = 149597870700.0  # m
+SOLAR_FLUX = 1361.0  # W/m^2, total solar irradiance at 1 astronomical unit
+SUN_RADIUS = 696000e3  # m, average radius of the SPICE kernels used by tudat
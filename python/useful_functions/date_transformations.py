@@ -3,6 +3,18 @@ import datetime
 import numpy as np
 from astropy.time import Time, TimeDelta
 
+__all__ = [
+    "J2000",
+    "datetime_to_epoch_raw",
+    "datetime_to_epoch",
+    "epoch_to_datetime_raw",
+    "epoch_to_datetime",
+    "epoch_to_astrotime_raw",
+    "epoch_to_astrotime",
+    "astrotime_to_epoch_raw",
+    "astrotime_to_epoch",
+]
+
 J2000 = Time("J2000.0", format="jyear_str", scale="utc")
 
 
@@ -0,0 +1,94 @@
+import numpy as np
+
+__all__ = ["DenseTrajectory"]
+
+
+class DenseTrajectory:
+    """
+    Dense output of a propagation, interpolating the history of a variable-step integrator at any epoch.
+
+    The interpolation uses Lagrange polynomials over a sliding window of consecutive nodes, like the default
+    interpolator of tudat, and is vectorized over all the requested epochs.
+
+    Parameters
+    ----------
+    history_array : np.ndarray
+        History as returned by result2array: first column is the epoch in seconds since J2000, the other columns are
+        the interpolated variables
+    number_of_points : int, optional
+        Number of nodes of each interpolation polynomial, by default 8
+    """
+
+    def __init__(self, history_array, number_of_points=8):
+        self.epochs = history_array[:, 0]
+        self.values = history_array[:, 1:]
+        self.number_of_points = min(number_of_points, len(self.epochs))
+
+    @property
+    def start_epoch(self):
+        return self.epochs[0]
+
+    @property
+    def end_epoch(self):
+        return self.epochs[-1]
+
+    def __call__(self, epochs):
+        """
+        Interpolate the variables at the requested epochs.
+
+        Parameters
+        ----------
+        epochs : float or np.ndarray
+            Epochs in seconds since J2000, within the propagated interval
+
+        Returns
+        -------
+        values : np.ndarray
+            Interpolated variables, shape (len(epochs), number of variables)
+        """
+        epochs = np.atleast_1d(np.asarray(epochs, dtype=float))
+        if np.any(epochs < self.start_epoch) or np.any(epochs > self.end_epoch):
+            raise ValueError("Epochs must be within the propagated interval")
+
+        # First node of the window centred on each epoch
+        first_node = np.searchsorted(self.epochs, epochs) - self.number_of_points // 2
+        first_node = np.clip(first_node, 0, len(self.epochs) - self.number_of_points)
+
+        values = np.zeros((len(epochs), self.values.shape[1]))
+        for jj in range(self.number_of_points):
+            node_epochs = self.epochs[first_node + jj]
+            weight = np.ones(len(epochs))
+            for mm in range(self.number_of_points):
+                if mm != jj:
+                    other_epochs = self.epochs[first_node + mm]
+                    weight *= (epochs - other_epochs) / (node_epochs - other_epochs)
+            values += weight[:, None] * self.values[first_node + jj]
+        return values
+
+    def sample(self, step_size, start_epoch=None, end_epoch=None):
+        """
+        Sample the variables on a regular grid of epochs.
+
+        Parameters
+        ----------
+        step_size : float
+            Step of the grid in seconds
+        start_epoch : float, optional
+            First epoch of the grid, by default the start of the propagation
+        end_epoch : float, optional
+            Last epoch of the grid, by default the end of the propagation. It is always included, as a shorter last
+            step if it is not on the grid.
+
+        Returns
+        -------
+        history_array : np.ndarray
+            Sampled history in the result2array layout: first column is the epoch in seconds since J2000
+        """
+        start_epoch = self.start_epoch if start_epoch is None else start_epoch
+        end_epoch = self.end_epoch if end_epoch is None else end_epoch
+        number_of_epochs = int(np.floor((end_epoch - start_epoch) / step_size)) + 1
+        epochs = start_epoch + step_size * np.arange(number_of_epochs)
+        epochs = np.minimum(epochs, end_epoch)
+        if end_epoch - epochs[-1] > 1e-9 * step_size:
+            epochs = np.append(epochs, end_epoch)
+        return np.column_stack((epochs, self(epochs)))
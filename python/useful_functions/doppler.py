@@ -0,0 +1,109 @@
+import numpy as np
+
+from useful_functions.constants import EARTH_GRAVITATIONAL_PARAMETER, SPEED_OF_LIGHT
+
+__all__ = ["compute_two_body_acceleration", "compute_range_rate", "compute_doppler"]
+
+
+def _dot(a, b):
+    return np.einsum("...i,...i->...", a, b)
+
+
+def compute_two_body_acceleration(positions):
+    """
+    Compute the point mass gravitational acceleration of the Earth.
+
+    Parameters
+    ----------
+    positions : np.ndarray
+        Positions in an Earth centered inertial frame in meters, shape (..., 3)
+
+    Returns
+    -------
+    accelerations : np.ndarray
+        Accelerations in meters per second squared, shape (..., 3)
+    """
+    radius = np.sqrt(_dot(positions, positions))[..., None]
+    return -EARTH_GRAVITATIONAL_PARAMETER * positions / radius**3
+
+
+def compute_range_rate(relative_positions, relative_velocities, relative_accelerations=None):
+    """
+    Compute the range, range rate and range acceleration between two objects.
+
+    Parameters
+    ----------
+    relative_positions : np.ndarray
+        Position of the transmitter relative to the receiver in meters, shape (..., 3)
+    relative_velocities : np.ndarray
+        Velocity of the transmitter relative to the receiver in meters per second, shape (..., 3)
+    relative_accelerations : np.ndarray, optional
+        Acceleration of the transmitter relative to the receiver in meters per second squared, shape (..., 3)
+
+    Returns
+    -------
+    distance : np.ndarray
+        Range in meters, shape (...)
+    range_rate : np.ndarray
+        Range rate in meters per second, shape (...)
+    range_acceleration : np.ndarray or None
+        Second derivative of the range in meters per second squared, shape (...), None without accelerations
+    """
+    distance = np.sqrt(_dot(relative_positions, relative_positions))
+    range_rate = _dot(relative_positions, relative_velocities) / distance
+    if relative_accelerations is None:
+        return distance, range_rate, None
+    range_acceleration = (
+        _dot(relative_velocities, relative_velocities)
+        + _dot(relative_positions, relative_accelerations)
+        - range_rate**2
+    ) / distance
+    return distance, range_rate, range_acceleration
+
+
+def compute_doppler(
+    relative_positions,
+    relative_velocities,
+    frequency,
+    relative_accelerations=None,
+):
+    """
+    Compute the Doppler shift and Doppler rate of a link from the range rate, for any number of links and epochs at
+    once.
+
+    The shift is the relativistic one, f / (gamma (1 + range_rate / c)) - f, and the rate is its analytic time
+    derivative, computed from the relative acceleration. Without relative accelerations, only the shift is computed.
+
+    Parameters
+    ----------
+    relative_positions : np.ndarray
+        Position of the transmitter relative to the receiver in meters, shape (..., 3)
+    relative_velocities : np.ndarray
+        Velocity of the transmitter relative to the receiver in meters per second, shape (..., 3)
+    frequency : float
+        Transmitted frequency in Hz
+    relative_accelerations : np.ndarray, optional
+        Acceleration of the transmitter relative to the receiver in meters per second squared, shape (..., 3), for
+        instance the difference of the compute_two_body_acceleration of both objects
+
+    Returns
+    -------
+    doppler_shift : np.ndarray
+        Received minus transmitted frequency in Hz, shape (...)
+    doppler_rate : np.ndarray or None
+        Time derivative of the Doppler shift in Hz/s, shape (...), None without accelerations
+    """
+    _, range_rate, range_acceleration = compute_range_rate(
+        relative_positions, relative_velocities, relative_accelerations
+    )
+    speed_squared = _dot(relative_velocities, relative_velocities)
+    gamma = 1 / np.sqrt(1 - speed_squared / SPEED_OF_LIGHT**2)
+    denominator = gamma * (1 + range_rate / SPEED_OF_LIGHT)
+    doppler_shift = frequency * (1 / denominator - 1)
+    if relative_accelerations is None:
+        return doppler_shift, None
+
+    gamma_rate = gamma**3 * _dot(relative_velocities, relative_accelerations) / SPEED_OF_LIGHT**2
+    denominator_rate = gamma_rate * (1 + range_rate / SPEED_OF_LIGHT) + gamma * range_acceleration / SPEED_OF_LIGHT
+    doppler_rate = -frequency * denominator_rate / denominator**2
+    return doppler_shift, doppler_rate
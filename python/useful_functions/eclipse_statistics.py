@@ -0,0 +1,286 @@
+import numpy as np
+import pandas as pd
+
+from useful_functions.constants import ASTRONOMICAL_UNIT, SOLAR_FLUX
+
+__all__ = [
+    "orbit_statistics_columns",
+    "season_names",
+    "EclipseStatistics",
+    "get_seasons",
+    "compute_seasonal_statistics",
+]
+
+orbit_statistics_columns = [
+    "orbit",
+    "start_epoch",
+    "end_epoch",
+    "duration",
+    "eclipse_duration",
+    "eclipse_fraction",
+    "eclipses",
+    "beta",
+    "sunlight_energy",
+    "cumulative_sunlight_energy",
+    "partial",
+]
+season_names = np.array(["DJF", "MAM", "JJA", "SON"])
+
+# Sums accumulated over the samples of each orbit
+_sum_names = ["samples", "beta", "solar_flux", "eclipse_duration", "eclipses"]
+
+
+def _group_sums(
+    groups, number_of_groups, beta, solar_flux, eclipse_groups, eclipse_durations, eclipse_counts
+):
+    """
+    Sums of _sum_names over the samples and eclipses of each group, shape (number_of_groups, len(_sum_names)).
+    """
+    return np.column_stack(
+        [
+            np.bincount(groups, minlength=number_of_groups),
+            np.bincount(groups, weights=beta, minlength=number_of_groups),
+            np.bincount(groups, weights=solar_flux, minlength=number_of_groups),
+            np.bincount(eclipse_groups, weights=eclipse_durations, minlength=number_of_groups),
+            np.bincount(eclipse_groups, weights=eclipse_counts, minlength=number_of_groups),
+        ]
+    ).astype(float)
+
+
+class EclipseStatistics:
+    """
+    Eclipse statistics of a spacecraft for each orbit, accumulated chunk by chunk so that a 10-year propagation can be
+    processed without keeping its states in memory.
+
+    An orbit starts at an ascending node, and an eclipse is counted in the orbit in which it starts. The chunks must be
+    appended in chronological order; the epochs that were already processed (such as the first epoch of a chunk, which
+    is the last epoch of the previous one) are ignored, and an eclipse that continues from the previous chunk adds its
+    duration without being counted again. The object can be pickled after each chunk to resume a run; to keep these
+    pickles small, pop_completed_orbits removes the rows of the orbits completed so far, which are then given back to
+    orbit_statistics.
+    """
+
+    def __init__(self):
+        self.last_epoch = None
+        self.last_z = None
+        self.orbit_number = 0
+        self.orbit_start = None
+        self.current_sums = np.zeros(len(_sum_names))
+        self.completed = []
+
+    def append(self, epochs, states, sun_positions, eclipses):
+        """
+        Process a chunk.
+
+        Parameters
+        ----------
+        epochs : np.ndarray
+            Epochs of the chunk in seconds since J2000, shape (N,)
+        states : np.ndarray
+            Cartesian states of the spacecraft in an Earth centered inertial frame, shape (N, 6)
+        sun_positions : np.ndarray
+            Positions of the Sun in the same frame, shape (N, 3)
+        eclipses : pd.DataFrame
+            Eclipses of the chunk as returned by compute_eclipses, with the columns start_epoch and duration
+        """
+        epochs = np.asarray(epochs, dtype=float)
+        states = np.asarray(states, dtype=float)
+        sun_positions = np.asarray(sun_positions, dtype=float)
+        eclipse_starts = eclipses["start_epoch"].to_numpy(dtype=float)
+        # An eclipse starting at an epoch already processed is the end of an eclipse of the previous chunk
+        eclipse_counts = (
+            np.ones(len(eclipse_starts))
+            if self.last_epoch is None
+            else (eclipse_starts > self.last_epoch).astype(float)
+        )
+        if self.last_epoch is not None:
+            new = epochs > self.last_epoch
+            epochs, states, sun_positions = epochs[new], states[new], sun_positions[new]
+        if len(epochs) == 0:
+            return
+        if self.last_epoch is None:
+            self.last_epoch, self.last_z = epochs[0], states[0, 2]
+            self.orbit_start = epochs[0]
+
+        # Ascending nodes, interpolated linearly between the samples
+        z = states[:, 2]
+        previous_z = np.concatenate([[self.last_z], z[:-1]])
+        previous_epochs = np.concatenate([[self.last_epoch], epochs[:-1]])
+        crossings = (previous_z < 0) & (z >= 0)
+        node_epochs = previous_epochs[crossings] - (
+            epochs[crossings] - previous_epochs[crossings]
+        ) * previous_z[crossings] / (z[crossings] - previous_z[crossings])
+        groups = np.cumsum(crossings)
+        number_of_groups = len(node_epochs) + 1
+
+        angular_momentum = np.cross(states[:, :3], states[:, 3:])
+        sin_beta = np.einsum("ij,ij->i", angular_momentum, sun_positions) / (
+            np.linalg.norm(angular_momentum, axis=1) * np.linalg.norm(sun_positions, axis=1)
+        )
+        beta = np.arcsin(np.clip(sin_beta, -1, 1))
+        solar_flux = SOLAR_FLUX * (ASTRONOMICAL_UNIT / np.linalg.norm(sun_positions, axis=1)) ** 2
+
+        eclipse_groups = groups[
+            np.clip(np.searchsorted(epochs, eclipse_starts, side="right") - 1, 0, None)
+        ]
+        sums = _group_sums(
+            groups,
+            number_of_groups,
+            beta,
+            solar_flux,
+            eclipse_groups,
+            eclipses["duration"].to_numpy(dtype=float),
+            eclipse_counts,
+        )
+        sums[0] += self.current_sums
+
+        if len(node_epochs):
+            starts = np.concatenate([[self.orbit_start], node_epochs[:-1]])
+            self.completed.append(
+                np.column_stack(
+                    [
+                        self.orbit_number + np.arange(len(node_epochs)),
+                        starts,
+                        node_epochs,
+                        sums[:-1],
+                    ]
+                )
+            )
+            self.orbit_start = node_epochs[-1]
+        self.orbit_number += len(node_epochs)
+        self.current_sums = sums[-1]
+        self.last_epoch, self.last_z = epochs[-1], z[-1]
+
+    def pop_completed_orbits(self):
+        """
+        Remove the orbits completed since the last call, so that they can be stored apart from the object.
+
+        Returns
+        -------
+        completed_orbits : np.ndarray
+            Accumulated rows of the completed orbits, to be given back to orbit_statistics
+        """
+        completed_orbits = (
+            np.concatenate(self.completed) if self.completed else np.empty((0, 3 + len(_sum_names)))
+        )
+        self.completed = []
+        return completed_orbits
+
+    def orbit_statistics(self, completed_orbits=()):
+        """
+        Statistics of each orbit processed so far. The first orbit and the current one are partial.
+
+        Parameters
+        ----------
+        completed_orbits : list of np.ndarray, optional
+            Outputs of pop_completed_orbits, in chronological order
+
+        Returns
+        -------
+        statistics : pd.DataFrame
+            One row per orbit with the columns orbit_statistics_columns:
+            - 'orbit' : number of the orbit, 0 being the one of the first epoch
+            - 'start_epoch', 'end_epoch' : epochs of the ascending nodes in seconds since J2000
+            - 'duration', 'eclipse_duration' : durations in seconds
+            - 'eclipse_fraction' : fraction of the orbit in eclipse
+            - 'eclipses' : number of eclipses starting in the orbit
+            - 'beta' : mean beta angle in radians
+            - 'sunlight_energy' : solar energy received during the orbit by a surface facing the Sun in J/m^2
+            - 'cumulative_sunlight_energy' : solar energy received since the first epoch in J/m^2
+            - 'partial' : True for the orbits that were not observed from node to node
+        """
+        if self.last_epoch is None:
+            return pd.DataFrame(columns=orbit_statistics_columns)
+        current = np.concatenate(
+            [[self.orbit_number, self.orbit_start, self.last_epoch], self.current_sums]
+        )
+        data = np.concatenate(list(completed_orbits) + self.completed + [current[None]])
+        orbit, start_epoch, end_epoch, samples, beta, solar_flux, eclipse_duration, eclipses = data.T
+
+        duration = end_epoch - start_epoch
+        samples = np.maximum(samples, 1)
+        sunlight_energy = solar_flux / samples * np.maximum(duration - eclipse_duration, 0)
+        partial = np.zeros(len(orbit), dtype=bool)
+        partial[[0, -1]] = True
+        with np.errstate(invalid="ignore", divide="ignore"):
+            eclipse_fraction = eclipse_duration / duration
+        return pd.DataFrame(
+            {
+                "orbit": orbit.astype(int),
+                "start_epoch": start_epoch,
+                "end_epoch": end_epoch,
+                "duration": duration,
+                "eclipse_duration": eclipse_duration,
+                "eclipse_fraction": eclipse_fraction,
+                "eclipses": eclipses.astype(int),
+                "beta": beta / samples,
+                "sunlight_energy": sunlight_energy,
+                "cumulative_sunlight_energy": np.cumsum(sunlight_energy),
+                "partial": partial,
+            },
+            columns=orbit_statistics_columns,
+        )
+
+
+def get_seasons(epochs):
+    """
+    Get the meteorological season of each epoch, December being counted in the winter of the next year.
+
+    Parameters
+    ----------
+    epochs : np.ndarray
+        Epochs in seconds since J2000
+
+    Returns
+    -------
+    years : np.ndarray
+        Year of each season
+    seasons : np.ndarray
+        Index of the season in season_names (DJF, MAM, JJA, SON)
+    """
+    # Vectorized conversion, the offset of about a minute between TDB and UTC does not matter here
+    dates = pd.to_datetime(
+        np.asarray(epochs, dtype=float), unit="s", origin=pd.Timestamp("2000-01-01 12:00:00")
+    )
+    months = dates.month.to_numpy()
+    years = dates.year.to_numpy() + (months == 12)
+    return years, (months % 12) // 3
+
+
+def compute_seasonal_statistics(orbit_statistics):
+    """
+    Get the minimum and maximum eclipse duration, eclipse fraction and beta angle of each season, and the solar energy
+    received during each season, from the complete orbits.
+
+    Parameters
+    ----------
+    orbit_statistics : pd.DataFrame
+        Statistics of each orbit, as returned by EclipseStatistics.orbit_statistics
+
+    Returns
+    -------
+    seasonal_statistics : pd.DataFrame
+        One row per season, indexed by year and season, with the columns orbits, eclipse_duration_min,
+        eclipse_duration_max, eclipse_fraction_min, eclipse_fraction_max, beta_min, beta_max and sunlight_energy
+    """
+    complete = orbit_statistics[~orbit_statistics["partial"]]
+    years, seasons = get_seasons(complete["start_epoch"].to_numpy())
+    grouped = complete.groupby([years, seasons], sort=True)
+    seasonal_statistics = grouped.agg(
+        orbits=("orbit", "size"),
+        eclipse_duration_min=("eclipse_duration", "min"),
+        eclipse_duration_max=("eclipse_duration", "max"),
+        eclipse_fraction_min=("eclipse_fraction", "min"),
+        eclipse_fraction_max=("eclipse_fraction", "max"),
+        beta_min=("beta", "min"),
+        beta_max=("beta", "max"),
+        sunlight_energy=("sunlight_energy", "sum"),
+    )
+    seasonal_statistics.index = pd.MultiIndex.from_arrays(
+        [
+            seasonal_statistics.index.get_level_values(0),
+            season_names[seasonal_statistics.index.get_level_values(1)],
+        ],
+        names=["year", "season"],
+    )
+    return seasonal_statistics
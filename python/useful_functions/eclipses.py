@@ -4,6 +4,8 @@ import pandas as pd
 
 from useful_functions.date_transformations import epoch_to_datetime
 
+__all__ = ["compute_shadow_vector", "compute_eclipses"]
+
 
 def compute_shadow_vector(satellite_position, sun_position, sun_radius, earth_radius):
     """
@@ -47,6 +49,7 @@ def compute_eclipses(
     earth_radius: float,
     epochs: np.ndarray,
     eclipse_type="Umbra",
+    shadow_vector=None,
 ) -> pd.DataFrame:
     """
     Compute the communications of the spacecraft for a given ground station.
@@ -65,6 +68,8 @@ def compute_eclipses(
         Array of epochs in seconds since J2000
     eclipse_type : string
         Type of eclipse to compute. Can be Umbra or Penumbra. Optional, default is Umbra.
+    shadow_vector : ndarray
+        Shadow function at each epoch, as returned by compute_shadow_vector, when it is already computed. Optional.
 
     Returns
     -------
@@ -78,9 +83,10 @@ def compute_eclipses(
          - 'partial' : True if it is a partial communication window, False if not
     """
 
-    shadow_vector = compute_shadow_vector(
-        satellite_position, sun_position, sun_radius, earth_radius
-    )
+    if shadow_vector is None:
+        shadow_vector = compute_shadow_vector(
+            satellite_position, sun_position, sun_radius, earth_radius
+        )
 
     shadow_df = pd.DataFrame({"epochs": epochs, "shadow": shadow_vector})
     if eclipse_type == "Umbra":
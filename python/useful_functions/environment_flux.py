@@ -0,0 +1,227 @@
+import numpy as np
+
+from useful_functions.constants import ASTRONOMICAL_UNIT, EARTH_EQUATORIAL_RADIUS, SOLAR_FLUX
+from useful_functions.read_write import ResultWriter, read_results
+
+__all__ = [
+    "face_names",
+    "flux_sources",
+    "environment_flux_columns",
+    "EARTH_ALBEDO",
+    "EARTH_INFRARED_FLUX",
+    "get_face_normals",
+    "get_earth_view_factor",
+    "compute_environment_flux",
+    "EnvironmentFluxStream",
+    "read_environment_flux",
+]
+
+face_names = ["+X", "-X", "+Y", "-Y", "+Z", "-Z"]
+flux_sources = ["solar", "albedo", "earth_ir"]
+environment_flux_columns = ["days", "seconds"] + [
+    f"{source}_{face}" for source in flux_sources for face in face_names
+]
+EARTH_ALBEDO = 0.3  # mean Bond albedo
+EARTH_INFRARED_FLUX = 237.0  # W/m^2, mean outgoing longwave radiation at the top of the atmosphere
+
+
+def _dot(a, b):
+    return np.einsum("...i,...i->...", a, b)
+
+
+def get_face_normals(matrices):
+    """
+    Get the outward normals of the six faces of a box shaped spacecraft in the inertial frame.
+
+    Parameters
+    ----------
+    matrices : np.ndarray
+        Direction cosine matrices from the body frame to the inertial frame, columns being the body axes, shape (N, 3, 3)
+
+    Returns
+    -------
+    normals : np.ndarray
+        Normals of the faces in the order of face_names, shape (N, 6, 3)
+    """
+    axes = np.swapaxes(matrices, 1, 2)
+    return np.stack([axes[:, 0], -axes[:, 0], axes[:, 1], -axes[:, 1], axes[:, 2], -axes[:, 2]], axis=1)
+
+
+def get_earth_view_factor(radius_ratio, nadir_angle):
+    """
+    Get the view factor from a flat plate to the Earth, seen as a sphere.
+
+    Parameters
+    ----------
+    radius_ratio : np.ndarray
+        Distance of the plate to the center of the Earth divided by the Earth radius (> 1)
+    nadir_angle : np.ndarray
+        Angle between the normal of the plate and the direction of the center of the Earth (in radians)
+
+    Returns
+    -------
+    view_factor : np.ndarray
+        View factor, (cos(nadir_angle) / radius_ratio^2 when the whole Earth is in view of the plate)
+    """
+    radius_ratio, nadir_angle = np.broadcast_arrays(
+        np.asarray(radius_ratio, dtype=float), np.asarray(nadir_angle, dtype=float)
+    )
+    cos_angle, sin_angle = np.cos(nadir_angle), np.sin(nadir_angle)
+    full_view = cos_angle * radius_ratio > 1
+    no_view = cos_angle * radius_ratio <= -1
+    partial = ~full_view & ~no_view
+
+    view_factor = np.where(full_view, cos_angle / radius_ratio**2, 0.0)
+    # Partially visible Earth (Howell, "A catalog of radiation heat transfer configuration factors", C-106)
+    h, cos_p, sin_p = radius_ratio[partial], cos_angle[partial], sin_angle[partial]
+    root = np.sqrt(h**2 - 1)
+    view_factor[partial] = (
+        0.5
+        - np.arcsin(np.clip(root / (h * sin_p), -1, 1)) / np.pi
+        + (
+            cos_p * np.arccos(np.clip(-root * cos_p / sin_p, -1, 1))
+            - root * np.sqrt(np.maximum(1 - h**2 * cos_p**2, 0))
+        )
+        / (np.pi * h**2)
+    )
+    return view_factor
+
+
+def compute_environment_flux(
+    positions,
+    sun_positions,
+    matrices,
+    shadow,
+    albedo=EARTH_ALBEDO,
+    earth_infrared_flux=EARTH_INFRARED_FLUX,
+    earth_radius=EARTH_EQUATORIAL_RADIUS,
+):
+    """
+    Compute the solar, albedo and Earth infrared fluxes received by the six faces of a box shaped spacecraft.
+
+    The solar flux is scaled with the distance to the Sun and the shadow function. The albedo and infrared fluxes
+    are those of a uniform Earth seen with the exact plate to sphere view factor, the albedo being scaled with the
+    cosine of the solar zenith angle at the sub-satellite point.
+
+    Parameters
+    ----------
+    positions : np.ndarray
+        Positions of the spacecraft in an Earth centered inertial frame (in meters), shape (N, 3)
+    sun_positions : np.ndarray
+        Positions of the Sun in the same frame (in meters), shape (N, 3)
+    matrices : np.ndarray
+        Direction cosine matrices from the body frame to the inertial frame, as returned by compute_attitude, shape
+        (N, 3, 3)
+    shadow : np.ndarray
+        Shadow function at each epoch, 0 in umbra and 1 in sunlight, as returned by compute_shadow_vector, shape (N,)
+    albedo : float, optional
+        Bond albedo of the Earth, by default EARTH_ALBEDO
+    earth_infrared_flux : float, optional
+        Infrared flux emitted by the Earth (in W/m^2), by default EARTH_INFRARED_FLUX
+    earth_radius : float, optional
+        Earth radius (in meters), by default the equatorial radius
+
+    Returns
+    -------
+    flux : dict of np.ndarray
+        "solar", "albedo" and "earth_ir" fluxes absorbed by a black face (in W/m^2), shape (N, 6) with the faces in the
+        order of face_names
+    """
+    positions = np.asarray(positions, dtype=float)
+    sun_positions = np.asarray(sun_positions, dtype=float)
+    normals = get_face_normals(np.asarray(matrices, dtype=float))
+
+    sun_vectors = sun_positions - positions
+    sun_distance = np.sqrt(_dot(sun_vectors, sun_vectors))
+    sun_directions = sun_vectors / sun_distance[:, None]
+    solar_flux = SOLAR_FLUX * (ASTRONOMICAL_UNIT / sun_distance) ** 2
+    solar = (solar_flux * np.asarray(shadow, dtype=float))[:, None] * np.maximum(
+        _dot(normals, sun_directions[:, None]), 0
+    )
+
+    radius = np.sqrt(_dot(positions, positions))
+    nadir = -positions / radius[:, None]
+    nadir_angle = np.arccos(np.clip(_dot(normals, nadir[:, None]), -1, 1))
+    view_factor = get_earth_view_factor((radius / earth_radius)[:, None], nadir_angle)
+    cos_zenith = np.maximum(_dot(-nadir, sun_directions), 0)
+    return {
+        "solar": solar,
+        "albedo": (albedo * solar_flux * cos_zenith)[:, None] * view_factor,
+        "earth_ir": earth_infrared_flux * view_factor,
+    }
+
+
+class EnvironmentFluxStream:
+    """
+    Environment fluxes of the faces of a spacecraft, computed chunk by chunk and streamed to a compact binary columnar
+    file (see ResultWriter, columns environment_flux_columns in float32), so that multi-year series can be given to the
+    power and thermal analyses without keeping them in memory nor propagating again. The epochs are stored as days
+    since J2000 and seconds of the day, which float32 keeps to the hundredth of a second. The file is read with
+    read_environment_flux.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the binary columnar file
+    **model_parameters
+        Parameters of compute_environment_flux (albedo, earth_infrared_flux, earth_radius)
+    """
+
+    def __init__(self, file_path, **model_parameters):
+        self.model_parameters = model_parameters
+        self.writer = ResultWriter(file_path, columns=environment_flux_columns, dtype=np.float32)
+
+    def append(self, epochs, positions, sun_positions, matrices, shadow):
+        """
+        Process a chunk of epochs, see compute_environment_flux.
+
+        Returns
+        -------
+        flux : dict of np.ndarray
+            Fluxes of the chunk, as returned by compute_environment_flux
+        """
+        epochs = np.asarray(epochs, dtype=float)
+        flux = compute_environment_flux(
+            positions, sun_positions, matrices, shadow, **self.model_parameters
+        )
+        days = np.floor(epochs / 86400)
+        self.writer.append(
+            np.column_stack(
+                [days, epochs - 86400 * days] + [flux[source] for source in flux_sources]
+            )
+        )
+        return flux
+
+    def close(self):
+        self.writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def read_environment_flux(file_path):
+    """
+    Read a file written by EnvironmentFluxStream.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the binary columnar file
+
+    Returns
+    -------
+    epochs : np.ndarray
+        Epochs in seconds since J2000, shape (N,)
+    flux : dict of np.ndarray
+        "solar", "albedo" and "earth_ir" fluxes (in W/m^2), shape (N, 6) with the faces in the order of face_names
+    """
+    columns = read_results(file_path)
+    epochs = 86400 * columns["days"].astype(float) + columns["seconds"].astype(float)
+    flux = {
+        source: np.column_stack([columns[f"{source}_{face}"] for face in face_names])
+        for source in flux_sources
+    }
+    return epochs, flux
@@ -0,0 +1,237 @@
+import numpy as np
+from scipy.interpolate import CubicSpline
+
+from useful_functions.constants import OBLIQUITY_J2000
+
+__all__ = [
+    "get_sun_position",
+    "get_moon_position",
+    "ephemeris_functions",
+    "InterpolatedEphemeris",
+    "interpolated_ephemerides",
+    "get_body_position",
+    "get_sun_direction",
+]
+
+
+def _ecliptic_to_equatorial(longitude, latitude, distance):
+    """
+    Convert ecliptic spherical coordinates to cartesian coordinates in the EME2000 frame.
+
+    Parameters
+    ----------
+    longitude : np.ndarray
+        Ecliptic longitude (in radians)
+    latitude : np.ndarray
+        Ecliptic latitude (in radians)
+    distance : np.ndarray
+        Distance (in meters)
+
+    Returns
+    -------
+    position : np.ndarray
+        Cartesian position in EME2000, shape (len(longitude), 3)
+    """
+    x = distance * np.cos(latitude) * np.cos(longitude)
+    y = distance * np.cos(latitude) * np.sin(longitude)
+    z = distance * np.sin(latitude)
+    cos_obliquity, sin_obliquity = np.cos(OBLIQUITY_J2000), np.sin(OBLIQUITY_J2000)
+    return np.column_stack(
+        (x, cos_obliquity * y - sin_obliquity * z, sin_obliquity * y + cos_obliquity * z)
+    )
+
+
+def get_sun_position(epochs):
+    """
+    Get the low precision position of the Sun with respect to the Earth, vectorized over epochs.
+    From Montenbruck & Gill, "Satellite Orbits", section 3.3.2 (accuracy of about 0.1-1%).
+
+    Parameters
+    ----------
+    epochs : float or np.ndarray
+        Epochs in seconds since J2000
+
+    Returns
+    -------
+    position : np.ndarray
+        Position of the Sun in EME2000 (in meters), shape (len(epochs), 3)
+    """
+    centuries = np.atleast_1d(np.asarray(epochs, dtype=float)) / 86400 / 36525
+    mean_anomaly = np.radians(357.5256 + 35999.049 * centuries)
+    longitude = np.radians(282.9400) + mean_anomaly
+    longitude += np.radians(6892 / 3600) * np.sin(mean_anomaly)
+    longitude += np.radians(72 / 3600) * np.sin(2 * mean_anomaly)
+    distance = (
+        149.619e9 - 2.499e9 * np.cos(mean_anomaly) - 0.021e9 * np.cos(2 * mean_anomaly)
+    )
+    return _ecliptic_to_equatorial(longitude, np.zeros_like(longitude), distance)
+
+
+def get_moon_position(epochs):
+    """
+    Get the low precision position of the Moon with respect to the Earth, vectorized over epochs.
+    From Montenbruck & Gill, "Satellite Orbits", section 3.3.2 (accuracy of a few arcminutes).
+
+    Parameters
+    ----------
+    epochs : float or np.ndarray
+        Epochs in seconds since J2000
+
+    Returns
+    -------
+    position : np.ndarray
+        Position of the Moon in EME2000 (in meters), shape (len(epochs), 3)
+    """
+    centuries = np.atleast_1d(np.asarray(epochs, dtype=float)) / 86400 / 36525
+    mean_longitude = np.radians(218.31617 + 481267.88088 * centuries - 1.3972 * centuries)
+    moon_anomaly = np.radians(134.96292 + 477198.86753 * centuries)
+    sun_anomaly = np.radians(357.52543 + 35999.04944 * centuries)
+    latitude_argument = np.radians(93.27283 + 483202.01873 * centuries)
+    elongation = np.radians(297.85027 + 445267.11135 * centuries)
+
+    longitude = mean_longitude + np.radians(
+        (
+            22640 * np.sin(moon_anomaly)
+            + 769 * np.sin(2 * moon_anomaly)
+            - 4586 * np.sin(moon_anomaly - 2 * elongation)
+            + 2370 * np.sin(2 * elongation)
+            - 668 * np.sin(sun_anomaly)
+            - 412 * np.sin(2 * latitude_argument)
+            - 212 * np.sin(2 * moon_anomaly - 2 * elongation)
+            - 206 * np.sin(moon_anomaly + sun_anomaly - 2 * elongation)
+            + 192 * np.sin(moon_anomaly + 2 * elongation)
+            - 165 * np.sin(sun_anomaly - 2 * elongation)
+            + 148 * np.sin(moon_anomaly - sun_anomaly)
+            - 125 * np.sin(elongation)
+            - 110 * np.sin(moon_anomaly + sun_anomaly)
+            - 55 * np.sin(2 * latitude_argument - 2 * elongation)
+        )
+        / 3600
+    )
+    latitude = np.radians(
+        (
+            18520
+            * np.sin(
+                latitude_argument
+                + longitude
+                - mean_longitude
+                + np.radians((412 * np.sin(2 * latitude_argument) + 541 * np.sin(sun_anomaly)) / 3600)
+            )
+            - 526 * np.sin(latitude_argument - 2 * elongation)
+        )
+        / 3600
+    )
+    distance = (
+        385000e3
+        - 20905e3 * np.cos(moon_anomaly)
+        - 3699e3 * np.cos(2 * elongation - moon_anomaly)
+        - 2956e3 * np.cos(2 * elongation)
+        - 570e3 * np.cos(2 * moon_anomaly)
+        + 246e3 * np.cos(2 * moon_anomaly - 2 * elongation)
+        - 205e3 * np.cos(sun_anomaly - 2 * elongation)
+        - 171e3 * np.cos(moon_anomaly + 2 * elongation)
+        - 152e3 * np.cos(moon_anomaly + sun_anomaly - 2 * elongation)
+    )
+    return _ecliptic_to_equatorial(longitude, latitude, distance)
+
+
+ephemeris_functions = {"Sun": get_sun_position, "Moon": get_moon_position}
+
+
+class InterpolatedEphemeris:
+    """
+    Analytic ephemeris of a body sampled on a coarse regular grid and interpolated with cubic splines, so that it can be
+    evaluated cheaply at every step of a long propagation. The grid is extended when epochs outside of it are
+    requested.
+
+    With the default hourly grid, the interpolation error is a few centimeters for both the Sun and the Moon, far below
+    the accuracy of the analytic series, and the evaluation is several times faster than the series.
+
+    Parameters
+    ----------
+    body : str, optional
+        Name of the body, a key of ephemeris_functions, by default "Sun"
+    step_size : float, optional
+        Step of the grid in seconds, by default 3600
+    """
+
+    def __init__(self, body="Sun", step_size=3600.0):
+        self.body = body
+        self.step_size = step_size
+        self.first_node = None
+        self.last_node = None
+        self.spline = None
+
+    def _cover(self, start_epoch, end_epoch):
+        # Two nodes of margin on each side so that the ends of the splines are never used
+        first_node = int(np.floor(start_epoch / self.step_size)) - 2
+        last_node = int(np.ceil(end_epoch / self.step_size)) + 2
+        if self.spline is not None:
+            if first_node >= self.first_node and last_node <= self.last_node:
+                return
+            first_node = min(first_node, self.first_node)
+            last_node = max(last_node, self.last_node)
+        nodes = np.arange(first_node, last_node + 1) * self.step_size
+        self.spline = CubicSpline(nodes, ephemeris_functions[self.body](nodes), axis=0)
+        self.first_node, self.last_node = first_node, last_node
+
+    def __call__(self, epochs):
+        """
+        Position of the body with respect to the Earth in EME2000 (in meters), shape (len(epochs), 3).
+        """
+        epochs = np.atleast_1d(np.asarray(epochs, dtype=float))
+        self._cover(epochs.min(), epochs.max())
+        return self.spline(epochs)
+
+
+interpolated_ephemerides = {}
+
+
+def get_body_position(body, epochs, step_size=3600.0):
+    """
+    Get the position of the Sun or the Moon with respect to the Earth from the analytic ephemeris, interpolated on a
+    coarse grid that is cached between calls.
+
+    Parameters
+    ----------
+    body : str
+        "Sun" or "Moon"
+    epochs : float or np.ndarray
+        Epochs in seconds since J2000
+    step_size : float, optional
+        Step of the grid in seconds, by default 3600. If None, the analytic series is evaluated at every epoch.
+
+    Returns
+    -------
+    position : np.ndarray
+        Position of the body in EME2000 (in meters), shape (len(epochs), 3)
+    """
+    if step_size is None:
+        return ephemeris_functions[body](epochs)
+    key = (body, step_size)
+    if key not in interpolated_ephemerides:
+        interpolated_ephemerides[key] = InterpolatedEphemeris(body, step_size)
+    return interpolated_ephemerides[key](epochs)
+
+
+def get_sun_direction(epochs, positions, step_size=3600.0):
+    """
+    Get the direction of the Sun seen from a spacecraft, replacing the relative_position("Sun", spacecraft) dependent
+    variable of a propagation.
+
+    Parameters
+    ----------
+    epochs : np.ndarray
+        Epochs in seconds since J2000
+    positions : np.ndarray
+        Positions of the spacecraft in EME2000 (in meters), shape (len(epochs), 3)
+    step_size : float, optional
+        Step of the grid of the interpolated ephemeris in seconds, by default 3600
+
+    Returns
+    -------
+    sun_direction : np.ndarray
+        Unit vectors from the spacecraft to the Sun in EME2000, shape (len(epochs), 3)
+    """
+    sun_direction = get_body_position("Sun", epochs, step_size) - positions
+    return sun_direction / np.linalg.norm(sun_direction, axis=1, keepdims=True)
@@ -10,6 +10,8 @@ from pyproj import Transformer
 
 from useful_functions.date_transformations import epoch_to_astrotime
 
+__all__ = ["ecf2lla", "teme_to_j2000"]
+
 
 def ecf2lla(pos_ecf):
     """
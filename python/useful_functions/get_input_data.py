@@ -1,67 +1,236 @@
 import csv
+from dataclasses import dataclass, fields
 from datetime import datetime, timezone
 from datetime import timedelta
+from os import listdir, path
 from pathlib import Path
+from typing import Optional
+
+__all__ = [
+    "input_data_path",
+    "input_data_cache",
+    "InputRecord",
+    "Spacecraft",
+    "Orbit",
+    "Station",
+    "Dates",
+    "parse_float_value",
+    "parse_date_value",
+    "input_data_types",
+    "read_input_record",
+    "get_input_record",
+    "load_input_data",
+    "get_spacecraft",
+    "get_station",
+    "get_orbit",
+    "get_dates",
+]
 
 input_data_path = str(Path(__file__).parents[1].joinpath("input_data"))
 
+# Parsed input files, by path: (modification time, record)
+input_data_cache = {}
+
+
+class InputRecord:
+    """
+    Base class of the immutable records of input data. The fields can be read as attributes, or with the dictionary
+    syntax used by the scripts (record["mass"], "mean_local_time" in record). Optional fields that are absent from the
+    file are None and behave as missing keys.
+    """
+
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        value = getattr(self, key, None) if isinstance(key, str) else None
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return isinstance(key, str) and getattr(self, key, None) is not None
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def keys(self):
+        return [field.name for field in fields(self) if getattr(self, field.name) is not None]
+
+    def items(self):
+        return [(key, getattr(self, key)) for key in self.keys()]
+
+    def to_dict(self):
+        return dict(self.items())
+
+
+@dataclass(frozen=True, slots=True)
+class Spacecraft(InputRecord):
+    mass: Optional[float] = None  # kg
+    drag_coefficient: Optional[float] = None
+    reflectivity_coefficient: Optional[float] = None
+    drag_area: Optional[float] = None  # m^2
+    srp_area: Optional[float] = None  # m^2
+    antenna_half_angle: Optional[float] = None  # deg
+    iridium_antenna_half_angle: Optional[float] = None  # deg
+    gps_antenna_half_angle: Optional[float] = None  # deg
+    galileo_antenna_half_angle: Optional[float] = None  # deg
+    glonass_antenna_half_angle: Optional[float] = None  # deg
+    angular_velocity: Optional[float] = None  # deg/s
+
+
+@dataclass(frozen=True, slots=True)
+class Orbit(InputRecord):
+    semi_major_axis: float  # m
+    eccentricity: float
+    inclination: float  # deg
+    argument_of_periapsis: float  # deg
+    true_anomaly: float  # deg
+    mean_local_time: Optional[float] = None  # hours
+    longitude_of_ascending_node: Optional[float] = None  # deg
+
+    def __post_init__(self):
+        if (self.mean_local_time is None) == (self.longitude_of_ascending_node is None):
+            raise ValueError(
+                "An orbit needs either a mean_local_time or a longitude_of_ascending_node"
+            )
+
+
+@dataclass(frozen=True, slots=True)
+class Station(InputRecord):
+    longitude: float  # deg
+    latitude: float  # deg
+    altitude: float  # m
+    minimum_elevation: float  # deg
+
+
+@dataclass(frozen=True, slots=True)
+class Dates(InputRecord):
+    start_date: datetime
+    end_date: datetime
+    step_size: timedelta
+    propagation_days: Optional[timedelta] = None
+
+    def __post_init__(self):
+        if self.end_date <= self.start_date:
+            raise ValueError("end_date must be after start_date")
+
+
+def parse_float_value(key, value):
+    """
+    Convert a value of a spacecraft, orbit or ground station file to a float.
+    """
+    return float(value)
+
+
+def parse_date_value(key, value):
+    """
+    Convert a value of a dates file to the type of its field.
+    """
+    if key == "step_size":
+        return timedelta(seconds=int(value))
+    if key == "propagation_days":
+        return timedelta(days=int(value))
+    info = datetime.strptime(value, "%Y-%m-%d-%H:%M:%S")
+    return info.replace(tzinfo=timezone.utc)
+
+
+input_data_types = {
+    "spacecraft": (Spacecraft, parse_float_value),
+    "orbits": (Orbit, parse_float_value),
+    "groundstations": (Station, parse_float_value),
+    "dates": (Dates, parse_date_value),
+}
+
+
+def read_input_record(file_path, record_type, parse_value):
+    """
+    Parse and validate an input CSV file of "field,value" rows. Empty rows and rows starting with "#" are ignored.
+    """
+    with open(file_path, mode="r", encoding="utf_8_sig") as inp:
+        rows = [
+            row for row in csv.reader(inp) if row and not row[0].strip().startswith("#")
+        ]
+    field_names = {field.name for field in fields(record_type)}
+    values = {}
+    for row in rows:
+        key = row[0].strip()
+        if key not in field_names or len(row) < 2:
+            raise ValueError(f"Invalid row {row} in {file_path}")
+        values[key] = parse_value(key, row[1].strip())
+    try:
+        return record_type(**values)
+    except (TypeError, ValueError) as error:
+        raise ValueError(f"Invalid input file {file_path}: {error}") from error
+
+
+def get_input_record(folder, filename):
+    """
+    Get the record of an input file, parsed once and kept in memory until the file is modified.
+
+    Parameters
+    ----------
+    folder : str
+        Sub-folder of input_data ("spacecraft", "orbits", "groundstations" or "dates")
+    filename : str
+        Name of the file, without extension
+
+    Returns
+    -------
+    record : InputRecord
+        Immutable record of the file
+    """
+    file_path = f"{input_data_path}/{folder}/{filename}.csv"
+    modification_time = path.getmtime(file_path)
+    cached = input_data_cache.get(file_path)
+    if cached is not None and cached[0] == modification_time:
+        return cached[1]
+    record = read_input_record(file_path, *input_data_types[folder])
+    input_data_cache[file_path] = (modification_time, record)
+    return record
+
+
+def load_input_data():
+    """
+    Load and validate every file of input_data, so that invalid files are reported at once.
+
+    Returns
+    -------
+    input_data : dict
+        For each sub-folder, a dictionary of records by file name (without extension)
+    """
+    return {
+        folder: {
+            filename[:-4]: get_input_record(folder, filename[:-4])
+            for filename in sorted(listdir(f"{input_data_path}/{folder}"))
+            if filename.endswith(".csv")
+        }
+        for folder in input_data_types
+    }
+
 
 def get_spacecraft(filename):
     """
-    Import orbit data from a CSV file.
+    Import spacecraft data from a CSV file.
     """
-    with open(
-        input_data_path + "/spacecraft/" + filename + ".csv",
-        mode="r",
-        encoding="utf_8_sig",
-    ) as inp:
-        reader = csv.reader(inp)
-        spacecraft = {rows[0]: float(rows[1]) for rows in reader}
-    return spacecraft
+    return get_input_record("spacecraft", filename)
 
 
 def get_station(filename):
     """
-    Import orbit data from a CSV file.
+    Import ground station data from a CSV file.
     """
-    with open(
-        input_data_path + "/groundstations/" + filename + ".csv",
-        mode="r",
-        encoding="utf_8_sig",
-    ) as inp:
-        reader = csv.reader(inp)
-        station = {rows[0]: float(rows[1]) for rows in reader}
-    return station
+    return get_input_record("groundstations", filename)
 
 
 def get_orbit(filename):
     """
     Import orbit data from a CSV file.
     """
-    with open(
-        input_data_path + "/orbits/" + filename + ".csv", mode="r", encoding="utf_8_sig"
-    ) as inp:
-        reader = csv.reader(inp)
-        orbit = {rows[0]: float(rows[1]) for rows in reader}
-    return orbit
+    return get_input_record("orbits", filename)
 
 
 def get_dates(filename):
     """
     Import dates from a CSV file.
     """
-    with open(
-        input_data_path + "/dates/" + filename + ".csv", mode="r", encoding="utf_8_sig"
-    ) as inp:
-        reader = csv.reader(inp)
-        dates = {}
-        for row in reader:
-            if row[0] == "step_size":
-                info = timedelta(seconds=int(row[1]))
-            elif row[0] == "propagation_days":
-                info = timedelta(days=int(row[1]))
-            else:
-                info = datetime.strptime(row[1], "%Y-%m-%d-%H:%M:%S")
-                info = info.replace(tzinfo=timezone.utc)
-            dates[row[0]] = info
-    return dates
+    return get_input_record("dates", filename)
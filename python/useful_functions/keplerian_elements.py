@@ -0,0 +1,230 @@
+import numpy as np
+
+from useful_functions.constants import EARTH_GRAVITATIONAL_PARAMETER
+
+__all__ = [
+    "keplerian_element_names",
+    "solve_kepler_equation",
+    "true_to_mean_anomaly",
+    "mean_to_true_anomaly",
+    "keplerian_to_cartesian",
+    "cartesian_to_keplerian",
+]
+
+keplerian_element_names = [
+    "semi_major_axis",
+    "eccentricity",
+    "inclination",
+    "argument_of_periapsis",
+    "longitude_of_ascending_node",
+    "true_anomaly",
+]
+
+
+def solve_kepler_equation(mean_anomaly, eccentricity, tolerance=1e-14, max_iterations=10):
+    """
+    Solve Kepler's equation E - e sin(E) = M for elliptic orbits, vectorized.
+
+    Halley iterations start from the guess of Danby (E = M + 0.85 e sign(sin M)) on the mean anomaly reduced to
+    [-pi, pi[, which converges for all eccentricities below 1.
+
+    Parameters
+    ----------
+    mean_anomaly : float or np.ndarray
+        Mean anomaly (in radians)
+    eccentricity : float or np.ndarray
+        Eccentricity, between 0 and 1 (excluded)
+    tolerance : float, optional
+        Tolerance on the eccentric anomaly (in radians), by default 1e-14
+    max_iterations : int, optional
+        Maximum number of iterations, by default 10
+
+    Returns
+    -------
+    eccentric_anomaly : float or np.ndarray
+        Eccentric anomaly (in radians), in the same revolution as the mean anomaly
+    """
+    mean_anomaly, eccentricity = np.broadcast_arrays(
+        np.asarray(mean_anomaly, dtype=float), np.asarray(eccentricity, dtype=float)
+    )
+    # Reduce to [-pi, pi[ so that the starting guess is close enough
+    revolutions = np.floor((mean_anomaly + np.pi) / (2 * np.pi))
+    reduced = mean_anomaly - 2 * np.pi * revolutions
+    eccentric_anomaly = reduced + 0.85 * eccentricity * np.sign(np.sin(reduced))
+    for _ in range(max_iterations):
+        e_sin, e_cos = eccentricity * np.sin(eccentric_anomaly), eccentricity * np.cos(eccentric_anomaly)
+        function = eccentric_anomaly - e_sin - reduced
+        derivative = 1 - e_cos
+        correction = function / (derivative - 0.5 * function * e_sin / derivative)
+        eccentric_anomaly = eccentric_anomaly - correction
+        if np.all(np.abs(correction) < tolerance):
+            break
+    return eccentric_anomaly + 2 * np.pi * revolutions
+
+
+def true_to_mean_anomaly(true_anomaly, eccentricity):
+    """
+    Convert true anomalies to mean anomalies for elliptic orbits, vectorized.
+
+    Parameters
+    ----------
+    true_anomaly : float or np.ndarray
+        True anomaly (in radians)
+    eccentricity : float or np.ndarray
+        Eccentricity, between 0 and 1 (excluded)
+
+    Returns
+    -------
+    mean_anomaly : float or np.ndarray
+        Mean anomaly (in radians), between -pi and pi
+    """
+    eccentric_anomaly = 2 * np.arctan2(
+        np.sqrt(1 - eccentricity) * np.sin(true_anomaly / 2),
+        np.sqrt(1 + eccentricity) * np.cos(true_anomaly / 2),
+    )
+    return eccentric_anomaly - eccentricity * np.sin(eccentric_anomaly)
+
+
+def mean_to_true_anomaly(mean_anomaly, eccentricity):
+    """
+    Convert mean anomalies to true anomalies for elliptic orbits, vectorized (see solve_kepler_equation).
+
+    Parameters
+    ----------
+    mean_anomaly : float or np.ndarray
+        Mean anomaly (in radians)
+    eccentricity : float or np.ndarray
+        Eccentricity, between 0 and 1 (excluded)
+
+    Returns
+    -------
+    true_anomaly : float or np.ndarray
+        True anomaly (in radians), between -pi and pi
+    """
+    eccentric_anomaly = solve_kepler_equation(mean_anomaly, eccentricity)
+    return 2 * np.arctan2(
+        np.sqrt(1 + eccentricity) * np.sin(eccentric_anomaly / 2),
+        np.sqrt(1 - eccentricity) * np.cos(eccentric_anomaly / 2),
+    )
+
+
+def keplerian_to_cartesian(elements, gravitational_parameter=EARTH_GRAVITATIONAL_PARAMETER):
+    """
+    Convert Keplerian elements to cartesian states, vectorized version of tudat's keplerian_to_cartesian_elementwise.
+
+    Parameters
+    ----------
+    elements : np.ndarray
+        Keplerian elements in the order of tudat (keplerian_element_names): semi-major axis (m, negative for hyperbolic
+        orbits), eccentricity, inclination, argument of periapsis, RAAN and true anomaly (rad), shape (..., 6)
+    gravitational_parameter : float, optional
+        Gravitational parameter of the central body (in m^3/s^2), by default the one of the Earth
+
+    Returns
+    -------
+    states : np.ndarray
+        Cartesian states in the inertial frame of the elements, shape (..., 6)
+    """
+    elements = np.asarray(elements, dtype=float)
+    sma, ecc, inc, pom, raan, true_anomaly = np.moveaxis(elements, -1, 0)
+
+    # Position and velocity in the perifocal frame
+    semi_latus_rectum = sma * (1 - ecc**2)
+    cos_nu, sin_nu = np.cos(true_anomaly), np.sin(true_anomaly)
+    radius = semi_latus_rectum / (1 + ecc * cos_nu)
+    speed_factor = np.sqrt(gravitational_parameter / semi_latus_rectum)
+
+    # Rotation to the inertial frame
+    cos_raan, sin_raan = np.cos(raan), np.sin(raan)
+    cos_pom, sin_pom = np.cos(pom), np.sin(pom)
+    cos_inc, sin_inc = np.cos(inc), np.sin(inc)
+    p_axis = np.stack(
+        [
+            cos_raan * cos_pom - sin_raan * sin_pom * cos_inc,
+            sin_raan * cos_pom + cos_raan * sin_pom * cos_inc,
+            sin_pom * sin_inc,
+        ],
+        axis=-1,
+    )
+    q_axis = np.stack(
+        [
+            -cos_raan * sin_pom - sin_raan * cos_pom * cos_inc,
+            -sin_raan * sin_pom + cos_raan * cos_pom * cos_inc,
+            cos_pom * sin_inc,
+        ],
+        axis=-1,
+    )
+    states = np.empty(elements.shape)
+    states[..., :3] = (radius * cos_nu)[..., None] * p_axis + (radius * sin_nu)[..., None] * q_axis
+    states[..., 3:] = (-speed_factor * sin_nu)[..., None] * p_axis + (speed_factor * (ecc + cos_nu))[
+        ..., None
+    ] * q_axis
+    return states
+
+
+def cartesian_to_keplerian(
+    states, gravitational_parameter=EARTH_GRAVITATIONAL_PARAMETER, singularity_tolerance=1e-15
+):
+    """
+    Convert cartesian states to Keplerian elements, vectorized version of tudat's cartesian_to_keplerian, with the
+    same conventions for the singular orbits: the argument of periapsis is zero for circular orbits, so that the true
+    anomaly is the argument of latitude, and the RAAN is zero for equatorial orbits.
+
+    Parameters
+    ----------
+    states : np.ndarray
+        Cartesian states in an inertial frame, shape (..., 6)
+    gravitational_parameter : float, optional
+        Gravitational parameter of the central body (in m^3/s^2), by default the one of the Earth
+    singularity_tolerance : float, optional
+        Eccentricity and sine of the inclination below which the orbit is considered circular or equatorial, by default
+        1e-15
+
+    Returns
+    -------
+    elements : np.ndarray
+        Keplerian elements in the order of tudat (keplerian_element_names), angles in radians between 0 and 2 pi,
+        shape (..., 6)
+    """
+    states = np.asarray(states, dtype=float)
+    positions, velocities = states[..., :3], states[..., 3:6]
+    radius = np.linalg.norm(positions, axis=-1)
+    angular_momentum = np.cross(positions, velocities)
+    momentum_norm = np.linalg.norm(angular_momentum, axis=-1)
+    eccentricity_vector = (
+        np.cross(velocities, angular_momentum) / gravitational_parameter - positions / radius[..., None]
+    )
+    ecc = np.linalg.norm(eccentricity_vector, axis=-1)
+    sma = 1 / (2 / radius - np.sum(velocities**2, axis=-1) / gravitational_parameter)
+    inc = np.arctan2(np.hypot(angular_momentum[..., 0], angular_momentum[..., 1]), angular_momentum[..., 2])
+
+    # Line of nodes, along the X axis for equatorial orbits
+    node = np.stack(
+        [-angular_momentum[..., 1], angular_momentum[..., 0], np.zeros_like(momentum_norm)], axis=-1
+    )
+    node_norm = np.linalg.norm(node, axis=-1)
+    equatorial = node_norm <= singularity_tolerance * momentum_norm
+    node = np.where(
+        equatorial[..., None], [1.0, 0.0, 0.0], node / np.where(equatorial, 1.0, node_norm)[..., None]
+    )
+    raan = np.where(equatorial, 0.0, np.arctan2(node[..., 1], node[..., 0]))
+    in_plane = np.cross(angular_momentum / momentum_norm[..., None], node)
+
+    # Angles measured in the orbital plane from the line of nodes
+    def angle_from_node(vector):
+        return np.arctan2(np.sum(vector * in_plane, axis=-1), np.sum(vector * node, axis=-1))
+
+    circular = ecc <= singularity_tolerance
+    pom = np.where(circular, 0.0, angle_from_node(eccentricity_vector))
+    true_anomaly = angle_from_node(positions) - pom
+    return np.stack(
+        [
+            sma,
+            ecc,
+            inc,
+            np.mod(pom, 2 * np.pi),
+            np.mod(raan, 2 * np.pi),
+            np.mod(true_anomaly, 2 * np.pi),
+        ],
+        axis=-1,
+    )
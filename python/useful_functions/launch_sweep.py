@@ -0,0 +1,143 @@
+from concurrent.futures import ProcessPoolExecutor
+from os import makedirs, path
+
+import numpy as np
+from tqdm import tqdm
+
+from useful_functions.atmosphere import SolarActivity
+from useful_functions.date_transformations import datetime_to_epoch
+from useful_functions.semi_analytical import get_orbit_mean_elements, propagate_mean_elements
+
+__all__ = ["sweep_result_names", "run_launch_date_sweep", "write_launch_date_sweep", "read_launch_date_sweep"]
+
+sweep_result_names = ["cjd", "sma", "ecc", "inc", "pom", "RAAN", "mltan"]
+
+# Environment of a worker process, created once by _initialize_sweep_worker
+worker_solar_activity = None
+
+
+def _initialize_sweep_worker(solar_activity_file):
+    """
+    Create the environment of a worker process, reused by all the launch dates it propagates.
+    """
+    global worker_solar_activity
+    worker_solar_activity = SolarActivity(solar_activity_file)
+
+
+def _propagate_launch_date(initial_elements, start_epoch, duration, ballistic_coefficient):
+    """
+    Propagate the orbit of one launch date in a worker process.
+    """
+    results = propagate_mean_elements(
+        initial_elements,
+        start_epoch,
+        duration,
+        ballistic_coefficient,
+        solar_activity=worker_solar_activity,
+    )
+    return {name: results[name] for name in sweep_result_names + ["lifetime"]}
+
+
+def run_launch_date_sweep(
+    orbit,
+    launch_dates,
+    duration,
+    ballistic_coefficient,
+    output_path=None,
+    max_workers=None,
+    solar_activity_file="acsol2022_2030.txt",
+):
+    """
+    Propagate the same orbit for a list of launch dates with the semi-analytical propagator, one launch date per task
+    of a pool of worker processes. Each worker loads the solar activity once and reuses it for all its launch dates.
+
+    Parameters
+    ----------
+    orbit : dict
+        Orbit as returned by get_orbit, the RAAN being computed at each launch date if it has a mean local time
+    launch_dates : list of datetime.datetime
+        Launch dates
+    duration : float
+        Maximum propagation duration (in seconds)
+    ballistic_coefficient : float
+        Drag coefficient times drag area divided by mass (in m^2/kg)
+    output_path : str, optional
+        Path to the .npz file where the results are written, see write_launch_date_sweep
+    max_workers : int, optional
+        Number of worker processes, by default the number of processors
+    solar_activity_file : str, optional
+        STELA solar activity file, by default "acsol2022_2030.txt"
+
+    Returns
+    -------
+    results : dict of np.ndarray
+        "years" (launch year of each run), "cjd0" (launch CNES julian day), "lifetime" (seconds) of shape
+        (number of launch dates,), and "cjd", "sma", "ecc", "inc", "pom", "RAAN", "mltan" of shape
+        (number of steps, number of launch dates)
+    """
+    start_epochs = [datetime_to_epoch(launch_date) for launch_date in launch_dates]
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_initialize_sweep_worker,
+        initargs=(solar_activity_file,),
+    ) as executor:
+        futures = [
+            executor.submit(
+                _propagate_launch_date,
+                get_orbit_mean_elements(orbit, start_epoch),
+                start_epoch,
+                duration,
+                ballistic_coefficient,
+            )
+            for start_epoch in start_epochs
+        ]
+        runs = [
+            future.result()
+            for future in tqdm(futures, desc="Launch dates", ncols=80)
+        ]
+
+    results = {
+        name: np.concatenate([run[name] for run in runs], axis=1)
+        for name in sweep_result_names
+    }
+    results["lifetime"] = np.concatenate([run["lifetime"] for run in runs])
+    results["cjd0"] = results["cjd"][0]
+    results["years"] = np.array([launch_date.year for launch_date in launch_dates])
+    if output_path is not None:
+        write_launch_date_sweep(results, output_path)
+    return results
+
+
+def write_launch_date_sweep(results, output_path):
+    """
+    Write the results of run_launch_date_sweep in a single compressed .npz file.
+
+    Parameters
+    ----------
+    results : dict of np.ndarray
+        Results of run_launch_date_sweep
+    output_path : str
+        Path to the .npz file
+    """
+    folder = path.dirname(output_path)
+    if folder:
+        makedirs(folder, exist_ok=True)
+    np.savez_compressed(output_path, **results)
+
+
+def read_launch_date_sweep(output_path):
+    """
+    Read the results of run_launch_date_sweep written by write_launch_date_sweep.
+
+    Parameters
+    ----------
+    output_path : str
+        Path to the .npz file
+
+    Returns
+    -------
+    results : dict of np.ndarray
+        Results of run_launch_date_sweep
+    """
+    with np.load(output_path) as data:
+        return {name: data[name] for name in data.files}
@@ -0,0 +1,201 @@
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from useful_functions.constants import BOLTZMANN_CONSTANT, SPEED_OF_LIGHT
+from useful_functions.read_write import ResultWriter
+
+__all__ = [
+    "link_budget_columns",
+    "LinkParameters",
+    "compute_free_space_path_loss",
+    "compute_link_budget",
+    "LinkBudgetStream",
+]
+
+link_budget_columns = ["epochs", "best_satellite", "cn0", "data_rate"]
+
+
+@dataclass(frozen=True)
+class LinkParameters:
+    """
+    Parameters of a radio link, from the transmitter to the receiver.
+    """
+
+    frequency: float  # Hz
+    transmitter_eirp: float  # dBW
+    receiver_gain: float = 0.0  # dBi, used when no gain time series is given
+    system_noise_temperature: float = 500.0  # K
+    required_eb_n0: float = 10.0  # dB, including the implementation margin
+    losses: float = 3.0  # dB, polarization, pointing and atmospheric losses
+    maximum_data_rate: Optional[float] = None  # bit/s
+
+
+def compute_free_space_path_loss(distances, frequency):
+    """
+    Compute the free-space path loss.
+
+    Parameters
+    ----------
+    distances : np.ndarray
+        Distances between the transmitter and the receiver in meters, any shape
+    frequency : float
+        Carrier frequency in Hz
+
+    Returns
+    -------
+    path_loss : np.ndarray
+        Free-space path loss in dB, same shape as distances
+    """
+    return 20 * np.log10(4 * np.pi * frequency / SPEED_OF_LIGHT * distances)
+
+
+def compute_link_budget(distances, parameters, receiver_gains=None):
+    """
+    Compute the link budget of any number of links and epochs at once.
+
+    Parameters
+    ----------
+    distances : np.ndarray
+        Distances between the transmitter and the receiver in meters, typically of shape (number of satellites, N)
+    parameters : LinkParameters
+        Parameters of the link
+    receiver_gains : np.ndarray, optional
+        Gains of the receiving antenna in dBi, same shape as distances, by default parameters.receiver_gain
+
+    Returns
+    -------
+    budget : dict of np.ndarray
+        Same shape as distances:
+        - 'path_loss' : free-space path loss in dB
+        - 'cn0' : received carrier to noise density ratio in dBHz
+        - 'data_rate' : data rate achievable with the required Eb/N0 in bit/s
+    """
+    if receiver_gains is None:
+        receiver_gains = parameters.receiver_gain
+    path_loss = compute_free_space_path_loss(distances, parameters.frequency)
+    cn0 = (
+        parameters.transmitter_eirp
+        + receiver_gains
+        - path_loss
+        - parameters.losses
+        - 10 * np.log10(BOLTZMANN_CONSTANT * parameters.system_noise_temperature)
+    )
+    data_rate = 10 ** ((cn0 - parameters.required_eb_n0) / 10)
+    if parameters.maximum_data_rate is not None:
+        data_rate = np.minimum(data_rate, parameters.maximum_data_rate)
+    return {"path_loss": path_loss, "cn0": cn0, "data_rate": data_rate}
+
+
+class LinkBudgetStream:
+    """
+    Link budget of a spacecraft with a constellation, computed chunk by chunk so that a long period can be processed
+    without keeping the whole time series in memory.
+
+    For each epoch, the best visible link is written to a binary columnar file (see ResultWriter, columns
+    link_budget_columns, best_satellite being the index of the satellite in satellite_names or -1 if none is visible).
+    The statistics of each satellite are accumulated over the chunks and returned by summary.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the binary columnar file
+    satellite_names : list of str
+        Names of the satellites of the constellation, in the order of the rows of the chunks
+    parameters : LinkParameters
+        Parameters of the link
+    """
+
+    def __init__(self, file_path, satellite_names, parameters):
+        self.satellite_names = list(satellite_names)
+        self.parameters = parameters
+        self.writer = ResultWriter(file_path, columns=link_budget_columns)
+        self.link_duration = np.zeros(len(self.satellite_names))
+        self.data_volume = np.zeros(len(self.satellite_names))
+        self.maximum_cn0 = np.full(len(self.satellite_names), -np.inf)
+        self.last_epoch = None
+
+    def append(self, epochs, distances, receiver_gains=None, visible=None):
+        """
+        Process a chunk of epochs. The chunks must be appended in chronological order; the epochs that were already
+        processed (such as the first epoch of a chunk, which is the last epoch of the previous one) are ignored.
+
+        Parameters
+        ----------
+        epochs : np.ndarray
+            Epochs of the chunk in seconds since J2000, shape (N,)
+        distances : np.ndarray
+            Distances to each satellite in meters, shape (number of satellites, N)
+        receiver_gains : np.ndarray, optional
+            Gains of the receiving antenna in dBi, shape (number of satellites, N)
+        visible : np.ndarray, optional
+            Boolean mask of the links that can be established (geometry, Doppler), shape (number of satellites, N).
+            By default all the links are visible.
+        """
+        epochs = np.asarray(epochs, dtype=float)
+        distances = np.asarray(distances, dtype=float)
+        if visible is None:
+            visible = np.ones(distances.shape, dtype=bool)
+        if self.last_epoch is not None:
+            new = epochs > self.last_epoch
+            epochs, distances, visible = epochs[new], distances[:, new], np.asarray(visible)[:, new]
+            if receiver_gains is not None:
+                receiver_gains = np.asarray(receiver_gains, dtype=float)[:, new]
+        if len(epochs) == 0:
+            return
+        self.last_epoch = epochs[-1]
+        budget = compute_link_budget(distances, self.parameters, receiver_gains)
+        cn0 = np.where(visible, budget["cn0"], -np.inf)
+        data_rate = np.where(visible, budget["data_rate"], 0)
+
+        # Each epoch stands for the time until the next one, the last one for the previous step
+        last_step = epochs[-1] - epochs[-2] if len(epochs) > 1 else 0
+        steps = np.diff(epochs, append=epochs[-1] + last_step)
+        self.link_duration += visible @ steps
+        self.data_volume += data_rate @ steps
+        self.maximum_cn0 = np.maximum(self.maximum_cn0, cn0.max(axis=1))
+
+        best = np.argmax(cn0, axis=0)
+        best_cn0 = np.take_along_axis(cn0, best[None], axis=0)[0]
+        best_data_rate = np.take_along_axis(data_rate, best[None], axis=0)[0]
+        any_visible = visible.any(axis=0)
+        self.writer.append(
+            np.column_stack(
+                [
+                    epochs,
+                    np.where(any_visible, best, -1),
+                    np.where(any_visible, best_cn0, np.nan),
+                    best_data_rate,
+                ]
+            )
+        )
+
+    def summary(self):
+        """
+        Statistics of each satellite over the chunks processed so far.
+
+        Returns
+        -------
+        summary : pd.DataFrame
+            One row per satellite with the link duration in seconds, the data volume in bits and the maximum C/N0 in
+            dBHz
+        """
+        return pd.DataFrame(
+            {
+                "link_duration": self.link_duration,
+                "data_volume": self.data_volume,
+                "maximum_cn0": self.maximum_cn0,
+            },
+            index=self.satellite_names,
+        )
+
+    def close(self):
+        self.writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
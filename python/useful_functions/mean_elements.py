@@ -0,0 +1,201 @@
+import numpy as np
+
+from useful_functions.constants import (
+    CNES_JULIAN_DAY_J2000,
+    EARTH_EQUATORIAL_RADIUS,
+    EARTH_GRAVITATIONAL_PARAMETER,
+    EARTH_J2,
+)
+from useful_functions.sun_synchronous import get_mean_local_time
+
+__all__ = [
+    "circular_element_names",
+    "cartesian_to_circular_elements",
+    "get_j2_short_periodic_terms",
+    "osculating_to_mean_elements",
+    "compute_mean_elements",
+]
+
+circular_element_names = ["sma", "ex", "ey", "inc", "RAAN", "alpha"]
+
+
+def cartesian_to_circular_elements(states, gravitational_parameter=EARTH_GRAVITATIONAL_PARAMETER):
+    """
+    Convert cartesian states to the elements adapted to near circular orbits of CelestLab ("cir"), vectorized.
+
+    Parameters
+    ----------
+    states : np.ndarray
+        Cartesian states in an Earth centered inertial frame, shape (N, 6)
+    gravitational_parameter : float, optional
+        Gravitational parameter of the central body (in m^3/s^2), by default the one of the Earth
+
+    Returns
+    -------
+    elements : np.ndarray
+        Semi-major axis (m), eccentricity vector (e cos(pom), e sin(pom)), inclination (rad), RAAN (rad) and mean
+        argument of latitude pom + M (rad), in the order of circular_element_names, shape (N, 6)
+    """
+    states = np.atleast_2d(np.asarray(states, dtype=float))
+    positions, velocities = states[:, :3], states[:, 3:6]
+    radius = np.linalg.norm(positions, axis=1)
+    angular_momentum = np.cross(positions, velocities)
+    normal = angular_momentum / np.linalg.norm(angular_momentum, axis=1)[:, None]
+
+    sma = 1 / (2 / radius - np.sum(velocities**2, axis=1) / gravitational_parameter)
+    inc = np.arccos(np.clip(normal[:, 2], -1, 1))
+    raan = np.mod(np.arctan2(normal[:, 0], -normal[:, 1]), 2 * np.pi)
+
+    # Eccentricity vector and position in the frame of the ascending node
+    node = np.column_stack([np.cos(raan), np.sin(raan), np.zeros_like(raan)])
+    in_plane = np.cross(normal, node)
+    eccentricity = (
+        np.cross(velocities, angular_momentum) / gravitational_parameter - positions / radius[:, None]
+    )
+    ex = np.sum(eccentricity * node, axis=1)
+    ey = np.sum(eccentricity * in_plane, axis=1)
+    x = np.sum(positions * node, axis=1)
+    y = np.sum(positions * in_plane, axis=1)
+
+    # Eccentric argument of latitude, then Kepler's equation in circular elements
+    root = np.sqrt(1 - ex**2 - ey**2)
+    beta = 1 / (1 + root)
+    cos_f = ex + ((1 - beta * ey**2) * x - beta * ex * ey * y) / (sma * root)
+    sin_f = ey + ((1 - beta * ex**2) * y - beta * ex * ey * x) / (sma * root)
+    eccentric_latitude = np.arctan2(sin_f, cos_f)
+    alpha = eccentric_latitude - ex * np.sin(eccentric_latitude) + ey * np.cos(eccentric_latitude)
+    return np.column_stack([sma, ex, ey, inc, raan, np.mod(alpha, 2 * np.pi)])
+
+
+def get_j2_short_periodic_terms(elements):
+    """
+    Get the first order short periodic variations of the circular elements due to J2, for near circular orbits (terms
+    of the order of J2 times the eccentricity are neglected), as in the theory of Eckstein and Ustinov.
+
+    Parameters
+    ----------
+    elements : np.ndarray
+        Mean circular elements, as returned by cartesian_to_circular_elements, shape (N, 6)
+
+    Returns
+    -------
+    short_periodic_terms : np.ndarray
+        Osculating minus mean circular elements, shape (N, 6)
+    """
+    sma, _, _, inc, _, alpha = np.asarray(elements, dtype=float).T
+    factor = EARTH_J2 * (EARTH_EQUATORIAL_RADIUS / sma) ** 2
+    sin_inc_squared = np.sin(inc) ** 2
+    return factor[:, None] * np.column_stack(
+        [
+            1.5 * sma * sin_inc_squared * np.cos(2 * alpha),
+            1.5 * (1 - 1.25 * sin_inc_squared) * np.cos(alpha) + 7 / 8 * sin_inc_squared * np.cos(3 * alpha),
+            1.5 * (1 - 1.75 * sin_inc_squared) * np.sin(alpha) + 7 / 8 * sin_inc_squared * np.sin(3 * alpha),
+            0.375 * np.sin(2 * inc) * np.cos(2 * alpha),
+            0.75 * np.cos(inc) * np.sin(2 * alpha),
+            -0.75 * (1 - 2.5 * sin_inc_squared) * np.sin(2 * alpha),
+        ]
+    )
+
+
+def osculating_to_mean_elements(states, iterations=3):
+    """
+    Convert osculating cartesian states to mean circular elements, removing the first order short periodic effect of
+    J2 (see get_j2_short_periodic_terms) by fixed point iterations. For a low Earth orbit with an eccentricity below
+    1e-3, the remaining oscillations are a few tens of meters on the semi-major axis and 1e-4 degree on the inclination,
+    instead of tens of kilometers and 0.01 degree for the osculating elements.
+
+    Parameters
+    ----------
+    states : np.ndarray
+        Cartesian states in an Earth centered inertial frame, shape (N, 6)
+    iterations : int, optional
+        Number of fixed point iterations, by default 3
+
+    Returns
+    -------
+    elements : np.ndarray
+        Mean circular elements in the order of circular_element_names, shape (N, 6)
+    """
+    osculating = cartesian_to_circular_elements(states)
+    mean = osculating.copy()
+    for _ in range(iterations):
+        mean = osculating - get_j2_short_periodic_terms(mean)
+    mean[:, 4:] = np.mod(mean[:, 4:], 2 * np.pi)
+    return mean
+
+
+def _time_weights(epochs):
+    """
+    Duration represented by each sample, so that the averages do not depend on the step size of the propagation.
+    """
+    if len(epochs) < 2:
+        return np.ones_like(epochs)
+    steps = np.diff(epochs)
+    return 0.5 * (np.concatenate([[0.0], steps]) + np.concatenate([steps, [0.0]]))
+
+
+def compute_mean_elements(epochs, states, orbit_averaging=True):
+    """
+    Compute the mean elements along a stored trajectory, in the layout of propagate_mean_elements so that the long
+    term evolution of a numerical propagation can be plotted without STELA.
+
+    The osculating states are first converted with osculating_to_mean_elements. With orbit averaging, these mean
+    elements are then averaged over each complete orbit, from an ascending node to the next one, which also removes
+    the short periodic effects of the other perturbations.
+
+    Parameters
+    ----------
+    epochs : np.ndarray
+        Epochs in seconds since J2000, shape (N,)
+    states : np.ndarray
+        Cartesian states in EME2000, shape (N, 6)
+    orbit_averaging : bool, optional
+        If True (default), one set of elements per complete orbit, at the middle of the orbit. If False, one set of
+        elements per epoch.
+
+    Returns
+    -------
+    results : dict of np.ndarray
+        "epochs" (seconds since J2000), "cjd" (CNES julian days), "sma", "ecc", "inc", "pom", "RAAN" and "mltan"
+        (hours), shape (number of orbits,) or (N,)
+    """
+    epochs = np.asarray(epochs, dtype=float)
+    states = np.asarray(states, dtype=float)
+    elements = osculating_to_mean_elements(states)
+    elements[:, 4] = np.unwrap(elements[:, 4])
+
+    if orbit_averaging:
+        # Ascending nodes, interpolated linearly between the samples
+        z = states[:, 2]
+        crossings = np.flatnonzero((z[:-1] < 0) & (z[1:] >= 0))
+        node_epochs = epochs[crossings] - (epochs[crossings + 1] - epochs[crossings]) * z[crossings] / (
+            z[crossings + 1] - z[crossings]
+        )
+        # Samples before the first node and after the last one belong to incomplete orbits
+        new_orbit = np.zeros(len(epochs), dtype=int)
+        new_orbit[crossings + 1] = 1
+        orbits = np.cumsum(new_orbit) - 1
+        complete = (orbits >= 0) & (orbits < len(node_epochs) - 1)
+        number_of_orbits = max(len(node_epochs) - 1, 0)
+        weights = _time_weights(epochs)[complete]
+        durations = np.bincount(orbits[complete], weights=weights, minlength=number_of_orbits)
+        elements = np.column_stack(
+            [
+                np.bincount(orbits[complete], weights=weights * column[complete], minlength=number_of_orbits)
+                for column in elements[:, :5].T
+            ]
+        ) / durations[:, None]
+        epochs = (node_epochs[:-1] + node_epochs[1:]) / 2
+
+    sma, ex, ey, inc, raan = elements[:, :5].T
+    results = {
+        "epochs": epochs,
+        "cjd": epochs / 86400 + CNES_JULIAN_DAY_J2000,
+        "sma": sma,
+        "ecc": np.sqrt(ex**2 + ey**2),
+        "inc": inc,
+        "pom": np.mod(np.arctan2(ey, ex), 2 * np.pi),
+        "RAAN": np.mod(raan, 2 * np.pi),
+    }
+    results["mltan"] = get_mean_local_time(results["RAAN"], epochs)
+    return results
@@ -0,0 +1,220 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from os import makedirs, path, remove
+
+import numpy as np
+import pandas as pd
+from tqdm import tqdm
+
+from useful_functions.atmosphere import SolarActivity
+from useful_functions.beta_angle import get_beta_angle, get_eclipse_fraction
+from useful_functions.constants import EARTH_GRAVITATIONAL_PARAMETER
+from useful_functions.ephemeris import get_sun_position
+from useful_functions.semi_analytical import mean_element_names, propagate_mean_elements
+
+__all__ = ["sample_insertion_errors", "compute_lifetime_metrics", "run_insertion_campaign"]
+
+# Environment of a worker process, created once by _initialize_insertion_worker
+worker_solar_activity = None
+
+
+def _initialize_insertion_worker(solar_activity):
+    """
+    Store the solar activity in a worker process, so that it is sent once per worker instead of once per batch.
+    """
+    global worker_solar_activity
+    worker_solar_activity = solar_activity
+
+
+def sample_insertion_errors(number_of_samples, standard_deviations, seed=None):
+    """
+    Draw random insertion errors on the mean elements, with independent normal distributions.
+
+    Parameters
+    ----------
+    number_of_samples : int
+        Number of samples
+    standard_deviations : dict
+        Standard deviation of the error on each mean element ("sma" in m, "ecc", "inc", "pom" and "RAAN" in rad).
+        Missing elements have no error.
+    seed : int, optional
+        Seed of the random generator, for reproducible campaigns
+
+    Returns
+    -------
+    errors : np.ndarray
+        Errors on the mean elements (sma, ecc, inc, pom, RAAN), shape (number_of_samples, 5)
+    """
+    generator = np.random.default_rng(seed)
+    sigma = np.array([standard_deviations.get(name, 0.0) for name in mean_element_names])
+    return generator.normal(size=(number_of_samples, len(sigma))) * sigma
+
+
+def compute_lifetime_metrics(results):
+    """
+    Compute summary metrics of each run of propagate_mean_elements.
+
+    Parameters
+    ----------
+    results : dict of np.ndarray
+        Results of propagate_mean_elements
+
+    Returns
+    -------
+    metrics : pd.DataFrame
+        One row per run with the following columns:
+        - 'lifetime' : lifetime in years
+        - 'mltan_drift_1y' : MLTAN drift after one year in hours (NaN if the run reentered before, or if the
+          propagation is shorter than one year)
+        - 'mltan_drift_max' : maximum absolute MLTAN drift over the lifetime in hours
+        - 'eclipse_duration_max' : maximum eclipse duration per orbit over the lifetime in minutes
+        - 'eclipse_fraction_mean' : mean fraction of the orbit spent in eclipse over the lifetime
+        - 'eclipse_season_fraction' : fraction of the lifetime with at least one eclipse per orbit
+    """
+    epochs = results["epochs"]
+    sun_position = get_sun_position(epochs.ravel()).reshape(epochs.shape + (3,))
+    beta = get_beta_angle(results["inc"], results["RAAN"], sun_position)
+    eclipse_fraction = get_eclipse_fraction(results["sma"], beta)
+    period = 2 * np.pi * np.sqrt(results["sma"] ** 3 / EARTH_GRAVITATIONAL_PARAMETER)
+    alive = ~np.isnan(results["sma"])
+
+    mltan_drift = np.mod(results["mltan"] - results["mltan"][0] + 12, 24) - 12
+    # Closest epoch to one year, NaN if the propagation is more than half a step shorter than one year
+    time_to_one_year = np.abs(epochs[:, 0] - epochs[0, 0] - 365.25 * 86400)
+    one_year = np.argmin(time_to_one_year)
+    step_size = epochs[1, 0] - epochs[0, 0] if len(epochs) > 1 else 0.0
+    mltan_drift_1y = (
+        mltan_drift[one_year]
+        if time_to_one_year[one_year] <= step_size / 2
+        else np.full(mltan_drift.shape[1:], np.nan)
+    )
+    with np.errstate(invalid="ignore"):
+        return pd.DataFrame(
+            {
+                "lifetime": results["lifetime"] / 86400 / 365.25,
+                "mltan_drift_1y": mltan_drift_1y,
+                "mltan_drift_max": np.nanmax(np.abs(mltan_drift), axis=0),
+                "eclipse_duration_max": np.nanmax(eclipse_fraction * period, axis=0) / 60,
+                "eclipse_fraction_mean": np.nanmean(eclipse_fraction, axis=0),
+                "eclipse_season_fraction": np.sum(eclipse_fraction > 0, axis=0)
+                / np.sum(alive, axis=0),
+            }
+        )
+
+
+def _run_insertion_batch(
+    sample_numbers,
+    errors,
+    nominal_elements,
+    start_epoch,
+    duration,
+    ballistic_coefficient,
+):
+    """
+    Propagate a batch of insertion errors in a worker process and return its metrics.
+    """
+    results = propagate_mean_elements(
+        nominal_elements + errors,
+        start_epoch,
+        duration,
+        ballistic_coefficient,
+        solar_activity=worker_solar_activity,
+    )
+    metrics = compute_lifetime_metrics(results)
+    for ii, name in enumerate(mean_element_names):
+        metrics.insert(ii, "delta_" + name, errors[:, ii])
+    metrics.insert(0, "sample", sample_numbers)
+    return metrics
+
+
+def run_insertion_campaign(
+    nominal_elements,
+    start_epoch,
+    duration,
+    ballistic_coefficient,
+    standard_deviations,
+    number_of_samples,
+    output_path,
+    batch_size=100,
+    max_workers=None,
+    seed=None,
+    solar_activity=None,
+):
+    """
+    Run a Monte Carlo campaign of orbit insertion errors with the semi-analytical propagator.
+
+    The samples are split in batches that are propagated in parallel by a pool of worker processes, each batch being
+    vectorized over its samples. The metrics of each batch are appended to the output CSV file as soon as the batch is
+    completed, so that the memory usage does not depend on the number of samples.
+
+    Parameters
+    ----------
+    nominal_elements : np.ndarray
+        Nominal mean elements (sma, ecc, inc, pom, RAAN) as returned by get_orbit_mean_elements
+    start_epoch : float
+        Insertion epoch (in seconds since J2000)
+    duration : float
+        Maximum propagation duration (in seconds)
+    ballistic_coefficient : float
+        Drag coefficient times drag area divided by mass (in m^2/kg)
+    standard_deviations : dict
+        Standard deviation of the insertion error on each mean element, see sample_insertion_errors
+    number_of_samples : int
+        Number of samples of the campaign
+    output_path : str
+        Path to the output CSV file, with one row per sample (insertion errors and metrics of compute_lifetime_metrics)
+    batch_size : int, optional
+        Number of samples propagated together by a worker, by default 100
+    max_workers : int, optional
+        Number of worker processes, by default the number of processors
+    seed : int, optional
+        Seed of the random generator, for reproducible campaigns
+    solar_activity : SolarActivity, optional
+        Solar activity model, by default the one of propagate_mean_elements
+
+    Returns
+    -------
+    metrics : pd.DataFrame
+        Content of the output file, sorted by sample number
+    """
+    errors = sample_insertion_errors(number_of_samples, standard_deviations, seed)
+    solar_activity = SolarActivity() if solar_activity is None else solar_activity
+    sample_numbers = np.arange(number_of_samples)
+    batches = [
+        (sample_numbers[ii : ii + batch_size], errors[ii : ii + batch_size])
+        for ii in range(0, number_of_samples, batch_size)
+    ]
+
+    folder = path.dirname(output_path)
+    if folder:
+        makedirs(folder, exist_ok=True)
+    if path.isfile(output_path):
+        remove(output_path)
+
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_initialize_insertion_worker,
+        initargs=(solar_activity,),
+    ) as executor:
+        futures = [
+            executor.submit(
+                _run_insertion_batch,
+                batch_numbers,
+                batch_errors,
+                np.asarray(nominal_elements, dtype=float),
+                start_epoch,
+                duration,
+                ballistic_coefficient,
+            )
+            for batch_numbers, batch_errors in batches
+        ]
+        for future in tqdm(
+            as_completed(futures), total=len(futures), desc="Monte Carlo", ncols=80
+        ):
+            future.result().to_csv(
+                output_path,
+                mode="a",
+                header=not path.isfile(output_path),
+                index=False,
+            )
+
+    return pd.read_csv(output_path).sort_values("sample").reset_index(drop=True)
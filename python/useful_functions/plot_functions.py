@@ -10,6 +10,23 @@ import plotly.graph_objects as go
 from PIL import Image
 from matplotlib.ticker import MaxNLocator
 
+__all__ = [
+    "assets_path",
+    "get_plot_path",
+    "dark_figure",
+    "light_figure",
+    "finish_dark_figure",
+    "finish_light_figure",
+    "flip_legend",
+    "flatten",
+    "plot_sphere",
+    "plotly_sphere",
+    "plotly_trajectory",
+    "remove_html_margins",
+    "finish_plotly_figure",
+    "plotly_groundtrack",
+]
+
 assets_path = str(Path(__file__).parents[2].joinpath("assets"))
 
 
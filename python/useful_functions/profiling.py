@@ -0,0 +1,181 @@
+"""
+Timing of the stages of a run (SPICE setup, integration, pickle writes, Doppler processing, exports...).
+
+Profiling is off by default, and stage() then costs a single test. It is enabled by setting the environment variable
+MISSION_ANALYSIS_PROFILE to the folder of the reports (or to 1 for the "profiles" folder), or by calling
+enable_profiling. At the end of the run, a timing report (CSV) and a profile in the folded stack format of flamegraph.pl,
+speedscope and inferno are written to that folder. Only the main process is reported.
+"""
+import atexit
+import csv
+import sys
+import time
+from contextlib import ContextDecorator
+from os import environ, getpid, makedirs, path
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+__all__ = [
+    "stage_statistics",
+    "enable_profiling",
+    "disable_profiling",
+    "get_peak_rss",
+    "get_bytes_written",
+    "stage",
+    "write_profile_report",
+]
+
+profiling_folder = None
+stage_statistics = {}
+_stage_stack = []
+
+
+def enable_profiling(folder="profiles"):
+    """
+    Enable the timing of the stages, the reports being written to a folder at the end of the run.
+    """
+    global profiling_folder
+    if profiling_folder is None:
+        atexit.register(write_profile_report)
+    profiling_folder = folder
+
+
+def disable_profiling():
+    global profiling_folder
+    profiling_folder = None
+
+
+def get_peak_rss():
+    """
+    Peak resident memory of the process in bytes, None if it is not available.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def get_bytes_written():
+    """
+    Bytes written by the process so far, None if it is not available (Linux only).
+    """
+    try:
+        with open("/proc/self/io") as file:
+            for line in file:
+                if line.startswith("wchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+class stage(ContextDecorator):
+    """
+    Context manager and decorator timing a stage of the run when profiling is enabled. Stages can be nested, a stage
+    being identified by the names of the stages that contain it.
+
+    Examples
+    --------
+    with stage("integration"):
+        states_array = ...
+
+    @stage("doppler")
+    def compute_doppler_visibility(results_dict):
+        ...
+    """
+
+    def __init__(self, name):
+        self.name = name
+        # Start of each entry in the stage, None when profiling was disabled (a decorated function can be recursive)
+        self.starts = []
+
+    def __enter__(self):
+        if profiling_folder is None:
+            self.starts.append(None)
+            return self
+        _stage_stack.append([self.name, 0.0])
+        self.starts.append((time.perf_counter(), time.process_time(), get_bytes_written()))
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        start = self.starts.pop()
+        if start is None:
+            return False
+        wall_start, cpu_start, bytes_start = start
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+        bytes_end = get_bytes_written()
+        name, children_wall = _stage_stack.pop()
+        stack = ";".join([parent for parent, _ in _stage_stack] + [name])
+        if _stage_stack:
+            _stage_stack[-1][1] += wall
+
+        statistics = stage_statistics.setdefault(
+            stack,
+            {
+                "calls": 0,
+                "wall_time": 0.0,
+                "self_wall_time": 0.0,
+                "cpu_time": 0.0,
+                "bytes_written": 0,
+                "peak_rss": 0,
+            },
+        )
+        statistics["calls"] += 1
+        statistics["wall_time"] += wall
+        statistics["self_wall_time"] += wall - children_wall
+        statistics["cpu_time"] += cpu
+        if bytes_start is not None and bytes_end is not None:
+            statistics["bytes_written"] += bytes_end - bytes_start
+        statistics["peak_rss"] = max(statistics["peak_rss"], get_peak_rss() or 0)
+        return False
+
+
+def write_profile_report(folder=None):
+    """
+    Write the timing report and the folded stack profile of the stages timed so far.
+
+    Parameters
+    ----------
+    folder : str, optional
+        Folder of the reports, by default the one given to enable_profiling
+
+    Returns
+    -------
+    report_path : str or None
+        Path of the CSV timing report, None if no stage was timed
+    """
+    folder = folder or profiling_folder
+    if folder is None or not stage_statistics:
+        return None
+    makedirs(folder, exist_ok=True)
+    script_name = path.splitext(path.basename(sys.argv[0] or "python"))[0] or "python"
+    base_name = f"{script_name}_{time.strftime('%Y%m%d_%H%M%S')}_{getpid()}"
+
+    report_path = path.join(folder, f"{base_name}_timing.csv")
+    with open(report_path, "w", newline="") as file:
+        writer = csv.writer(file, lineterminator="\n")
+        writer.writerow(
+            ["stage", "calls", "wall_time", "self_wall_time", "cpu_time", "bytes_written", "peak_rss"]
+        )
+        for stack, statistics in sorted(
+            stage_statistics.items(), key=lambda item: -item[1]["wall_time"]
+        ):
+            writer.writerow([stack] + list(statistics.values()))
+
+    # Folded stacks: one line per stack with its self time in microseconds
+    with open(path.join(folder, f"{base_name}.folded"), "w") as file:
+        for stack, statistics in stage_statistics.items():
+            file.write(f"{stack} {round(statistics['self_wall_time'] * 1e6)}\n")
+    return report_path
+
+
+if environ.get("MISSION_ANALYSIS_PROFILE"):
+    enable_profiling(
+        "profiles"
+        if environ["MISSION_ANALYSIS_PROFILE"] == "1"
+        else environ["MISSION_ANALYSIS_PROFILE"]
+    )
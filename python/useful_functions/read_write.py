@@ -1,8 +1,12 @@
 import csv
-from os import makedirs
+from os import makedirs, path, replace, stat
 
 import numpy as np
 
+from useful_functions.profiling import stage
+
+__all__ = ["output_columns", "ResultWriter", "read_results", "write_results", "load_array", "open_csv"]
+
 output_columns = [
     "time",
     "eci_x",
@@ -26,33 +30,176 @@ output_columns = [
 ]
 
 
-def write_results(spacecraft_name, orbit_name, dates_name, array):
+class ResultWriter:
+    """
+    Writer of propagation results in a single binary columnar file, to which chunks of rows can be appended.
+
+    The file is a sequence of .npy records: the first one holds the column names, and each following one holds a
+    chunk of rows stored column by column, with shape (number of columns, number of rows). It is read back with
+    read_results. The chunks can optionally be written to a CSV file as well, with a header line.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the binary file, created or overwritten
+    columns : list of str, optional
+        Names of the columns, by default output_columns
+    csv_path : str, optional
+        Path to a CSV copy of the results, for the subsystems that need a text file
+    dtype : data-type, optional
+        Type of the values in the binary file, by default float64. float32 halves the size of the file when the
+        precision of the columns allows it.
+    """
+
+    def __init__(self, file_path, columns=None, csv_path=None, dtype=float):
+        self.columns = list(output_columns if columns is None else columns)
+        self.dtype = dtype
+        folder = path.dirname(file_path)
+        if folder:
+            makedirs(folder, exist_ok=True)
+        self.file = open(file_path, "wb")
+        np.save(self.file, np.array(self.columns))
+        self.csv_file = None
+        if csv_path is not None:
+            self.csv_file = open(csv_path, "w")
+            self.csv_file.write(",".join(self.columns) + "\n")
+
+    def append(self, array):
+        """
+        Append a chunk of rows to the results.
+
+        Parameters
+        ----------
+        array : np.ndarray
+            Rows to append, with one column per name in columns
+        """
+        array = np.atleast_2d(np.asarray(array, dtype=float))
+        if array.shape[1] != len(self.columns):
+            raise ValueError(
+                f"Expected {len(self.columns)} columns, got an array with {array.shape[1]} columns"
+            )
+        np.save(self.file, np.ascontiguousarray(array.T, dtype=self.dtype))
+        self.file.flush()
+        if self.csv_file is not None:
+            np.savetxt(self.csv_file, array, delimiter=",")
+
+    def close(self):
+        self.file.close()
+        if self.csv_file is not None:
+            self.csv_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def read_results(file_path):
+    """
+    Read a binary columnar file written by ResultWriter.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the binary file
+
+    Returns
+    -------
+    results : dict of np.ndarray
+        Full column for each column name, in the order of the file
+    """
+    file_size = path.getsize(file_path)
+    with open(file_path, "rb") as file:
+        columns = np.load(file).tolist()
+        chunks = []
+        while file.tell() < file_size:
+            chunks.append(np.load(file))
+    if chunks:
+        data = np.concatenate(chunks, axis=1)
+    else:
+        data = np.empty((len(columns), 0))
+    return dict(zip(columns, data))
+
+
+def write_results(
+    spacecraft_name, orbit_name, dates_name, array, columns=None, export_csv=False
+):
     """
-    Export propagation results to a CSV file.
+    Export propagation results to a single binary columnar file, see ResultWriter.
+
+    Parameters
+    ----------
+    spacecraft_name : str
+        Name of the spacecraft, used in the file name
+    orbit_name : str
+        Name of the orbit, used in the file name
+    dates_name : str
+        Name of the dates, used in the file name
+    array : np.ndarray
+        Results, one row per epoch
+    columns : list of str, optional
+        Names of the columns of the array, by default the first columns of output_columns
+    export_csv : bool, optional
+        Also export the results to a CSV file with a header line, by default False
+
+    Returns
+    -------
+    file_path : str
+        Path to the binary file, results/<spacecraft>_<orbit>_<dates>.col
     """
-    makedirs("results/", exist_ok=True)
-    for ii in enumerate(output_columns):
-        np.savetxt(
-            f"results/{spacecraft_name}_{orbit_name}_{dates_name}_{ii[1]}.csv",
-            array,
-            delimiter=",",
-        )
+    file_name = f"results/{spacecraft_name}_{orbit_name}_{dates_name}"
+    if columns is None:
+        columns = output_columns[: np.shape(array)[1]]
+    with stage("write_results"), ResultWriter(
+        file_name + ".col", columns, file_name + ".csv" if export_csv else None
+    ) as writer:
+        writer.append(array)
+    return file_name + ".col"
+
+
+def load_array(file_path, delimiter=","):
+    """
+    Load a numeric CSV table as an array. The table is parsed at once and cached in a .npz file next to it, with the
+    modification time (in nanoseconds) and the size of the CSV file. The cache is used as long as they are unchanged.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the CSV file
+    delimiter : str, optional
+        Delimiter of the CSV file, by default ","
+
+    Returns
+    -------
+    data : np.ndarray
+        Content of the file, as a 1D array if it has a single column and a 2D array otherwise
+    """
+    cache_path = file_path + ".npz"
+    file_status = stat(file_path)
+    key = np.array([file_status.st_mtime_ns, file_status.st_size], dtype=np.int64)
+    if path.isfile(cache_path):
+        with np.load(cache_path) as cache:
+            if np.array_equal(cache["key"], key):
+                return cache["data"]
+    data = np.loadtxt(file_path, delimiter=delimiter, ndmin=2)
+    if data.shape[1] == 1:
+        data = data[:, 0]
+    try:
+        # Written to a temporary file first, so that an interrupted write never leaves a corrupted cache
+        with open(cache_path + ".tmp", "wb") as file:
+            np.savez(file, data=data, key=key)
+        replace(cache_path + ".tmp", cache_path)
+    except OSError:
+        # Read-only folder, the file will simply be parsed again next time
+        pass
+    return data
 
 
 # Function to open csv file and convert data to float array
-def open_csv(path, target_file, is_string=False):
-    tmp = []
-    with open(path + "\\" + target_file, "r") as file:
-        reader = csv.reader(file)
-        for row in reader:
-            if is_string:
-                tmp.append(",".join(row))
-            else:
-                if len(row) == 1:
-                    tmp.append(float(row[0]))
-                else:
-                    tmp.append([float(ii) for ii in row])
+def open_csv(folder, target_file, is_string=False):
+    file_path = path.join(folder, target_file)
     if is_string:
-        return tmp
-    else:
-        return np.array(tmp)
+        with open(file_path, "r") as file:
+            return [",".join(row) for row in csv.reader(file)]
+    return load_array(file_path)
@@ -0,0 +1,305 @@
+import csv
+from os import makedirs
+
+import numpy as np
+
+from useful_functions.atmosphere import SolarActivity, get_atmospheric_density
+from useful_functions.constants import (
+    CNES_JULIAN_DAY_J2000,
+    EARTH_EQUATORIAL_RADIUS,
+    EARTH_GRAVITATIONAL_PARAMETER,
+    EARTH_J2,
+    EARTH_J3,
+    EARTH_J4,
+    MOON_GRAVITATIONAL_PARAMETER,
+    SUN_GRAVITATIONAL_PARAMETER,
+)
+from useful_functions.ephemeris import get_moon_position, get_sun_position
+from useful_functions.sun_synchronous import get_mean_local_time, get_sso_raan
+
+__all__ = [
+    "mean_element_names",
+    "third_body_models",
+    "get_orbit_mean_elements",
+    "propagate_mean_elements",
+    "write_stela_csv",
+]
+
+mean_element_names = ["sma", "ecc", "inc", "pom", "RAAN"]
+third_body_models = {
+    "Sun": (SUN_GRAVITATIONAL_PARAMETER, get_sun_position),
+    "Moon": (MOON_GRAVITATIONAL_PARAMETER, get_moon_position),
+}
+
+
+def get_orbit_mean_elements(orbit, epoch):
+    """
+    Get the initial mean elements of an orbit from the input data.
+
+    Parameters
+    ----------
+    orbit : dict
+        Orbit as returned by get_orbit. The right ascension of the ascending node is computed from the mean local time
+        if the orbit has a "mean_local_time" entry.
+    epoch : float
+        Initial epoch (in seconds since J2000)
+
+    Returns
+    -------
+    mean_elements : np.ndarray
+        Semi-major axis (m), eccentricity, inclination (rad), argument of periapsis (rad) and RAAN (rad)
+    """
+    if "mean_local_time" in orbit:
+        raan = get_sso_raan(orbit["mean_local_time"], epoch)
+    else:
+        raan = np.radians(orbit["longitude_of_ascending_node"])
+    return np.array(
+        [
+            orbit["semi_major_axis"],
+            orbit["eccentricity"],
+            np.radians(orbit["inclination"]),
+            np.radians(orbit["argument_of_periapsis"]),
+            raan,
+        ]
+    )
+
+
+def _cross(u, v):
+    """
+    Row-wise cross product of two arrays of shape (n, 3), faster than np.cross for small n.
+    """
+    return np.column_stack(
+        (
+            u[:, 1] * v[:, 2] - u[:, 2] * v[:, 1],
+            u[:, 2] * v[:, 0] - u[:, 0] * v[:, 2],
+            u[:, 0] * v[:, 1] - u[:, 1] * v[:, 0],
+        )
+    )
+
+
+def _third_body_rates(sma, ex, ey, inc, raan, mean_motion, body_position, gravitational_parameter):
+    """
+    Singly averaged quadrupole perturbation of a third body, from the Milankovitch equations on the angular momentum
+    and eccentricity vectors, projected on the equinoctial-like elements (ex, ey, inc, raan).
+    """
+    cos_raan, sin_raan = np.cos(raan), np.sin(raan)
+    cos_inc, sin_inc = np.cos(inc), np.sin(inc)
+    node = np.stack((cos_raan, sin_raan, np.zeros_like(raan)), axis=-1)
+    normal = np.stack((sin_inc * sin_raan, -sin_inc * cos_raan, cos_inc), axis=-1)
+    in_plane = np.stack((-cos_inc * sin_raan, cos_inc * cos_raan, sin_inc), axis=-1)
+
+    eccentricity_vector = ex[:, None] * node + ey[:, None] * in_plane
+    angular_momentum = np.sqrt(1 - ex ** 2 - ey ** 2)
+    momentum_vector = angular_momentum[:, None] * normal
+
+    distance = np.linalg.norm(body_position, axis=1)
+    direction = body_position / distance[:, None]
+    factor = 1.5 * gravitational_parameter / distance ** 3 / mean_motion
+
+    e_dot_u = np.sum(eccentricity_vector * direction, axis=1)[:, None]
+    j_dot_u = np.sum(momentum_vector * direction, axis=1)[:, None]
+    e_cross_u = _cross(eccentricity_vector, direction)
+    j_cross_u = _cross(momentum_vector, direction)
+    momentum_rate = factor[:, None] * (5 * e_dot_u * e_cross_u - j_dot_u * j_cross_u)
+    eccentricity_rate = factor[:, None] * (
+        5 * e_dot_u * j_cross_u
+        - j_dot_u * e_cross_u
+        - 2 * _cross(momentum_vector, eccentricity_vector)
+    )
+
+    normal_rate = (
+        momentum_rate - np.sum(normal * momentum_rate, axis=1)[:, None] * normal
+    ) / angular_momentum[:, None]
+    inc_rate = -normal_rate[:, 2] / sin_inc
+    raan_rate = (normal[:, 0] * normal_rate[:, 1] - normal[:, 1] * normal_rate[:, 0]) / sin_inc ** 2
+    ex_rate = np.sum(node * eccentricity_rate, axis=1) + ey * cos_inc * raan_rate
+    ey_rate = np.sum(in_plane * eccentricity_rate, axis=1) - ex * cos_inc * raan_rate
+    return ex_rate, ey_rate, inc_rate, raan_rate
+
+
+def _mean_element_rates(
+    epochs, elements, ballistic_coefficient, solar_activity, third_bodies
+):
+    """
+    Rates of the mean elements (sma, ex, ey, inc, raan) for all the runs, shape (5, number of runs).
+    """
+    sma, ex, ey, inc, raan = elements
+    ecc_squared = ex ** 2 + ey ** 2
+    sin_inc_squared = np.sin(inc) ** 2
+    cos_inc = np.cos(inc)
+    mean_motion = np.sqrt(EARTH_GRAVITATIONAL_PARAMETER / sma ** 3)
+    radius_ratio = EARTH_EQUATORIAL_RADIUS / (sma * (1 - ecc_squared))
+
+    # Secular zonal rates up to J2^2 and J4 (Vallado, "Fundamentals of Astrodynamics and Applications", eq. 9-41)
+    raan_rate = (
+        -1.5 * mean_motion * EARTH_J2 * radius_ratio ** 2 * cos_inc
+        + 3 / 32 * mean_motion * EARTH_J2 ** 2 * radius_ratio ** 4 * cos_inc
+        * (12 - 4 * ecc_squared - (80 + 5 * ecc_squared) * sin_inc_squared)
+        + 15 / 32 * mean_motion * EARTH_J4 * radius_ratio ** 4 * cos_inc
+        * (8 + 12 * ecc_squared - (14 + 21 * ecc_squared) * sin_inc_squared)
+    )
+    pom_rate = (
+        0.75 * mean_motion * EARTH_J2 * radius_ratio ** 2 * (4 - 5 * sin_inc_squared)
+        + 9 / 384 * mean_motion * EARTH_J2 ** 2 * radius_ratio ** 4
+        * (
+            56 * ecc_squared
+            + (760 - 36 * ecc_squared) * sin_inc_squared
+            - (890 + 45 * ecc_squared) * sin_inc_squared ** 2
+        )
+        - 15 / 128 * mean_motion * EARTH_J4 * radius_ratio ** 4
+        * (
+            64
+            + 72 * ecc_squared
+            - (248 + 252 * ecc_squared) * sin_inc_squared
+            + (196 + 189 * ecc_squared) * sin_inc_squared ** 2
+        )
+    )
+    # Long period J3 term, responsible for the frozen eccentricity
+    j3_rate = (
+        -0.375 * mean_motion * EARTH_J3 * radius_ratio ** 3 * np.sin(inc) * (4 - 5 * sin_inc_squared)
+    )
+    ex_rate = -pom_rate * ey + j3_rate
+    ey_rate = pom_rate * ex
+    inc_rate = np.zeros_like(inc)
+
+    # Orbit averaged drag for near circular orbits
+    solar_flux, geomagnetic_index = solar_activity(epochs)
+    density = get_atmospheric_density(sma - EARTH_EQUATORIAL_RADIUS, solar_flux, geomagnetic_index)
+    sma_rate = -density * ballistic_coefficient * np.sqrt(EARTH_GRAVITATIONAL_PARAMETER * sma)
+
+    for body in third_bodies:
+        gravitational_parameter, get_position = third_body_models[body]
+        rates = _third_body_rates(
+            sma, ex, ey, inc, raan, mean_motion, get_position(epochs), gravitational_parameter
+        )
+        ex_rate = ex_rate + rates[0]
+        ey_rate = ey_rate + rates[1]
+        inc_rate = inc_rate + rates[2]
+        raan_rate = raan_rate + rates[3]
+
+    return np.stack((sma_rate, ex_rate, ey_rate, inc_rate, raan_rate))
+
+
+def propagate_mean_elements(
+    initial_elements,
+    start_epochs,
+    duration,
+    ballistic_coefficient,
+    step_size=86400.0,
+    solar_activity=None,
+    third_bodies=("Sun", "Moon"),
+    reentry_altitude=120e3,
+):
+    """
+    Propagate the mean elements of a batch of orbits with a semi-analytical model, in the spirit of STELA.
+
+    The model includes the secular effects of J2 (up to second order), J4, the long period effect of J3, the orbit
+    averaged atmospheric drag driven by a solar activity model, and the singly averaged quadrupole effect of the Sun
+    and the Moon using low precision analytical ephemerides. All the runs are integrated together with a fixed step
+    RK4, so that a full mission lifetime for many runs takes a few seconds. A run stops when its mean altitude goes
+    below the reentry altitude, and its elements are then set to NaN.
+
+    Parameters
+    ----------
+    initial_elements : np.ndarray
+        Initial mean elements of each run, shape (5,) or (number of runs, 5): semi-major axis (m), eccentricity,
+        inclination (rad), argument of periapsis (rad) and RAAN (rad)
+    start_epochs : float or np.ndarray
+        Initial epoch of each run (in seconds since J2000)
+    duration : float
+        Propagation duration (in seconds)
+    ballistic_coefficient : float or np.ndarray
+        Drag coefficient times drag area divided by mass of each run (in m^2/kg)
+    step_size : float, optional
+        Integration step (in seconds), by default one day
+    solar_activity : SolarActivity, optional
+        Solar activity model, by default the STELA acsol2022_2030 file
+    third_bodies : list of str, optional
+        Perturbing third bodies among "Sun" and "Moon", by default both
+    reentry_altitude : float, optional
+        Mean altitude at which a run stops (in meters), by default 120 km
+
+    Returns
+    -------
+    results : dict of np.ndarray
+        "epochs" (seconds since J2000), "cjd" (CNES julian days), "sma", "ecc", "inc", "pom", "RAAN" and "mltan" (hours)
+        of shape (number of steps, number of runs), and "lifetime" (seconds) of shape (number of runs,), equal to the
+        duration for runs that did not reenter
+    """
+    initial_elements = np.atleast_2d(np.asarray(initial_elements, dtype=float))
+    number_of_runs = initial_elements.shape[0]
+    start_epochs = np.broadcast_to(np.asarray(start_epochs, dtype=float), (number_of_runs,))
+    ballistic_coefficient = np.broadcast_to(
+        np.asarray(ballistic_coefficient, dtype=float), (number_of_runs,)
+    )
+    solar_activity = SolarActivity() if solar_activity is None else solar_activity
+
+    sma, ecc, inc, pom, raan = initial_elements.T
+    state = np.stack((sma, ecc * np.cos(pom), ecc * np.sin(pom), inc, raan))
+
+    number_of_steps = int(np.floor(duration / step_size)) + 1
+    times = step_size * np.arange(number_of_steps)
+    history = np.full((number_of_steps, 5, number_of_runs), np.nan)
+    lifetime = np.full(number_of_runs, float(duration))
+    alive = np.ones(number_of_runs, dtype=bool)
+
+    def rates(time, elements):
+        return _mean_element_rates(
+            start_epochs[alive] + time, elements, ballistic_coefficient[alive], solar_activity, third_bodies
+        )
+
+    history[0] = state
+    # The RK4 stages of the last step before reentry can go far below the atmosphere model validity
+    with np.errstate(over="ignore", invalid="ignore"):
+        for ii in range(1, number_of_steps):
+            time = times[ii - 1]
+            current = state[:, alive]
+            k1 = rates(time, current)
+            k2 = rates(time + step_size / 2, current + step_size / 2 * k1)
+            k3 = rates(time + step_size / 2, current + step_size / 2 * k2)
+            k4 = rates(time + step_size, current + step_size * k3)
+            state[:, alive] = current + step_size / 6 * (k1 + 2 * k2 + 2 * k3 + k4)
+
+            reentered = alive & ~(state[0] - EARTH_EQUATORIAL_RADIUS >= reentry_altitude)
+            lifetime[reentered] = times[ii]
+            alive &= ~reentered
+            history[ii][:, alive] = state[:, alive]
+            if not np.any(alive):
+                break
+
+    epochs = start_epochs + times[:, None]
+    results = {
+        "epochs": epochs,
+        "cjd": epochs / 86400 + CNES_JULIAN_DAY_J2000,
+        "sma": history[:, 0],
+        "ecc": np.sqrt(history[:, 1] ** 2 + history[:, 2] ** 2),
+        "inc": history[:, 3],
+        "pom": np.mod(np.arctan2(history[:, 2], history[:, 1]), 2 * np.pi),
+        "RAAN": np.mod(history[:, 4], 2 * np.pi),
+        "lifetime": lifetime,
+    }
+    results["mltan"] = get_mean_local_time(results["RAAN"], epochs)
+    return results
+
+
+def write_stela_csv(results, folder, suffix=""):
+    """
+    Write the results of propagate_mean_elements in the CSV layout exported by the CelestLab STELA scripts (one row per
+    run), so that they can be read by the plotting scripts of celestlab/PythonPlots.
+
+    Parameters
+    ----------
+    results : dict of np.ndarray
+        Results of propagate_mean_elements
+    folder : str
+        Output folder
+    suffix : str, optional
+        Suffix appended to the element file names (e.g. "_stela"), by default ""
+    """
+    makedirs(folder, exist_ok=True)
+    tables = {"cjd_stela": results["cjd"].T, "cjd0": results["cjd"][:1].T}
+    for name in mean_element_names + ["mltan"]:
+        tables[name + suffix] = results[name].T
+    for name, table in tables.items():
+        with open(f"{folder}/{name}.csv", "w", newline="") as f:
+            csv.writer(f, lineterminator="\n").writerows(table.tolist())
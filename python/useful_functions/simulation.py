@@ -0,0 +1,409 @@
+import numpy as np
+from tudatpy.kernel import numerical_simulation
+from tudatpy.kernel.interface import spice
+from tudatpy.kernel.numerical_simulation import environment_setup, propagation_setup
+from tudatpy.util import result2array
+
+from useful_functions.dense_output import DenseTrajectory
+from useful_functions.keplerian_elements import keplerian_to_cartesian
+from useful_functions.profiling import stage
+from useful_functions.sun_synchronous import get_sso_raan
+
+__all__ = ["load_spice_kernels", "get_spacecraft_acceleration_settings", "MissionSimulation"]
+
+spice_kernels_loaded = False
+
+
+def load_spice_kernels():
+    """
+    Load the standard SPICE kernels, only once per process.
+    """
+    global spice_kernels_loaded
+    if not spice_kernels_loaded:
+        with stage("spice_setup"):
+            spice.load_standard_kernels([])
+        spice_kernels_loaded = True
+
+
+def get_spacecraft_acceleration_settings(
+    gravity_degree=10, gravity_order=10, third_bodies=("Moon",)
+):
+    """
+    Get the acceleration settings of a spacecraft with drag and solar radiation pressure interfaces.
+
+    Parameters
+    ----------
+    gravity_degree : int, optional
+        Degree of the spherical harmonic gravity field of the Earth, by default 10
+    gravity_order : int, optional
+        Order of the spherical harmonic gravity field of the Earth, by default 10
+    third_bodies : tuple of str, optional
+        Bodies other than the Earth and the Sun exerting a point mass gravity, by default ("Moon",)
+
+    Returns
+    -------
+    acceleration_settings : dict
+        Acceleration settings of the spacecraft, by exerting body
+    """
+    acceleration_settings = dict(
+        Sun=[
+            propagation_setup.acceleration.cannonball_radiation_pressure(),
+            propagation_setup.acceleration.point_mass_gravity(),
+        ],
+        Earth=[
+            propagation_setup.acceleration.spherical_harmonic_gravity(
+                gravity_degree, gravity_order
+            ),
+            propagation_setup.acceleration.aerodynamic(),
+        ],
+    )
+    for body in third_bodies:
+        acceleration_settings[body] = [
+            propagation_setup.acceleration.point_mass_gravity()
+        ]
+    return acceleration_settings
+
+
+class MissionSimulation:
+    """
+    Tudat environment and dynamical model of a mission, created once and reused for every propagation.
+
+    The system of bodies, the vehicle interfaces and the acceleration models are only created once, so that the
+    chunks of a long propagation, or the many runs of a batch, only pay for the propagation itself.
+
+    Parameters
+    ----------
+    bodies_to_create : list of str, optional
+        Celestial bodies of the environment, by default ["Earth", "Sun", "Moon", "Jupiter"]
+    fixed_step_size : float, optional
+        Step size of the RK4 integrator in seconds, by default 10. With the variable-step integrator, this is the step
+        of the regular output grid returned by propagate.
+    minimum_altitude : float, optional
+        Altitude in meters below which the propagation is stopped, by default 100 km
+    global_frame_origin : str, optional
+        Origin of the global frame, by default "Earth"
+    global_frame_orientation : str, optional
+        Orientation of the global frame, by default "J2000"
+    integrator : str, optional
+        "rk4" for the fixed-step RK4 integrator, or "variable" for the variable-step RKF7(8) integrator with dense
+        output, by default "rk4"
+    maximum_step_size : float, optional
+        Maximum step size of the variable-step integrator in seconds, by default 120
+    tolerance : float, optional
+        Relative and absolute error tolerance of the variable-step integrator, by default 1e-10
+    gravity_field_variations : dict, optional
+        Gravity field variation settings by body, e.g. the solid tides of the Earth, by default none
+    """
+
+    def __init__(
+        self,
+        bodies_to_create=("Earth", "Sun", "Moon", "Jupiter"),
+        fixed_step_size=10.0,
+        minimum_altitude=100.0e3,
+        global_frame_origin="Earth",
+        global_frame_orientation="J2000",
+        integrator="rk4",
+        maximum_step_size=120.0,
+        tolerance=1e-10,
+        gravity_field_variations=None,
+    ):
+        if integrator not in ["rk4", "variable"]:
+            raise ValueError("integrator must be rk4 or variable")
+        load_spice_kernels()
+        with stage("environment_setup"):
+            body_settings = environment_setup.get_default_body_settings(
+                list(bodies_to_create), global_frame_origin, global_frame_orientation
+            )
+            if gravity_field_variations is not None:
+                for body, variations in gravity_field_variations.items():
+                    body_settings.get(body).gravity_field_variation_settings = list(variations)
+            self.bodies = environment_setup.create_system_of_bodies(body_settings)
+        self.fixed_step_size = fixed_step_size
+        self.minimum_altitude = minimum_altitude
+        self.integrator = integrator
+        self.maximum_step_size = maximum_step_size
+        self.tolerance = tolerance
+        self.bodies_to_propagate = []
+        self.central_bodies = []
+        self.acceleration_settings = {}
+        self.dependent_variables_to_save = []
+        self._acceleration_models = None
+        self._termination_altitude = None
+
+    def add_spacecraft(
+        self, name, acceleration_settings, spacecraft=None, central_body="Earth"
+    ):
+        """
+        Add a propagated spacecraft to the simulation.
+
+        Parameters
+        ----------
+        name : str
+            Name of the spacecraft body
+        acceleration_settings : dict
+            Acceleration settings of the spacecraft, by exerting body
+        spacecraft : dict, optional
+            Spacecraft data as returned by get_spacecraft. If given, the mass, aerodynamic and radiation pressure
+            interfaces of the spacecraft are created.
+        central_body : str, optional
+            Central body of the propagation, by default "Earth"
+
+        Returns
+        -------
+        simulation : MissionSimulation
+            The simulation itself, so that calls can be chained
+        """
+        self.bodies.create_empty_body(name)
+        if spacecraft is not None:
+            self.bodies.get(name).mass = spacecraft["mass"]
+            aero_coefficient_settings = (
+                environment_setup.aerodynamic_coefficients.constant(
+                    spacecraft["drag_area"], [spacecraft["drag_coefficient"], 0, 0]
+                )
+            )
+            environment_setup.add_aerodynamic_coefficient_interface(
+                self.bodies, name, aero_coefficient_settings
+            )
+            radiation_pressure_settings = environment_setup.radiation_pressure.cannonball(
+                "Sun",
+                spacecraft["srp_area"],
+                spacecraft["reflectivity_coefficient"],
+                ["Earth"],
+            )
+            environment_setup.add_radiation_pressure_interface(
+                self.bodies, name, radiation_pressure_settings
+            )
+        self.bodies_to_propagate.append(name)
+        self.central_bodies.append(central_body)
+        self.acceleration_settings[name] = acceleration_settings
+        self._acceleration_models = None
+        self._termination_altitude = None
+        return self
+
+    def add_dependent_variables(self, *dependent_variables):
+        """
+        Add dependent variables to be saved during every propagation.
+
+        Parameters
+        ----------
+        *dependent_variables : tudatpy dependent variable settings
+            Dependent variables to save, in the order of the columns of the dependent variables array
+
+        Returns
+        -------
+        simulation : MissionSimulation
+            The simulation itself, so that calls can be chained
+        """
+        self.dependent_variables_to_save.extend(dependent_variables)
+        return self
+
+    @property
+    def acceleration_models(self):
+        """
+        Acceleration models of all the propagated spacecraft, created on first use.
+        """
+        if self._acceleration_models is None:
+            self._acceleration_models = propagation_setup.create_acceleration_models(
+                self.bodies,
+                self.acceleration_settings,
+                self.bodies_to_propagate,
+                self.central_bodies,
+            )
+        return self._acceleration_models
+
+    @property
+    def termination_altitude(self):
+        """
+        Termination settings stopping the propagation when the first spacecraft reaches the minimum altitude.
+        """
+        if self._termination_altitude is None:
+            self._termination_altitude = propagation_setup.propagator.dependent_variable_termination(
+                dependent_variable_settings=propagation_setup.dependent_variable.altitude(
+                    self.bodies_to_propagate[0], self.central_bodies[0]
+                ),
+                limit_value=self.minimum_altitude,
+                use_as_lower_limit=True,
+                terminate_exactly_on_final_condition=False,
+            )
+        return self._termination_altitude
+
+    def get_initial_state(self, orbit, epoch):
+        """
+        Get the cartesian initial state of a spacecraft from its orbit data.
+
+        Parameters
+        ----------
+        orbit : dict
+            Orbit data as returned by get_orbit. The right ascension of the ascending node is computed from the
+            "mean_local_time" field if present, and read from the "longitude_of_ascending_node" field otherwise.
+        epoch : float
+            Epoch of the initial state in seconds since J2000
+
+        Returns
+        -------
+        initial_state : np.ndarray
+            Cartesian initial state in the global frame
+        """
+        if "mean_local_time" in orbit:
+            raan = get_sso_raan(orbit["mean_local_time"], epoch)
+        else:
+            raan = np.deg2rad(orbit["longitude_of_ascending_node"])
+        return keplerian_to_cartesian(
+            [
+                orbit["semi_major_axis"],
+                orbit["eccentricity"],
+                np.deg2rad(orbit["inclination"]),
+                np.deg2rad(orbit["argument_of_periapsis"]),
+                raan,
+                np.deg2rad(orbit["true_anomaly"]),
+            ],
+            self.bodies.get("Earth").gravitational_parameter,
+        )
+
+    def get_integrator_settings(self, start_epoch):
+        """
+        Get the integrator settings of a propagation starting at the given epoch.
+
+        Parameters
+        ----------
+        start_epoch : float
+            Start epoch in seconds since J2000
+
+        Returns
+        -------
+        integrator_settings : tudatpy integrator settings
+            RK4 settings with the fixed step size, or RKF7(8) settings with the maximum step size and tolerance
+        """
+        if self.integrator == "rk4":
+            return propagation_setup.integrator.runge_kutta_4(
+                start_epoch, self.fixed_step_size
+            )
+        return propagation_setup.integrator.runge_kutta_variable_step_size(
+            start_epoch,
+            self.fixed_step_size,
+            propagation_setup.integrator.RKCoefficientSets.rkf_78,
+            1.0e-3,
+            self.maximum_step_size,
+            self.tolerance,
+            self.tolerance,
+        )
+
+    def propagate_raw(self, start_epoch, end_epoch, initial_state):
+        """
+        Propagate all the spacecraft between two epochs, and return the histories at the integrator steps.
+
+        Parameters
+        ----------
+        start_epoch : float
+            Start epoch in seconds since J2000
+        end_epoch : float
+            End epoch in seconds since J2000
+        initial_state : list or np.ndarray
+            Concatenated cartesian initial states of all the propagated spacecraft
+
+        Returns
+        -------
+        states_array : np.ndarray
+            State history, first column is the epoch in seconds since J2000
+        dependent_variables_array : np.ndarray or None
+            Dependent variables history, first column is the epoch in seconds since J2000. None if no dependent
+            variable is saved.
+        """
+        termination_settings = propagation_setup.propagator.hybrid_termination(
+            [
+                propagation_setup.propagator.time_termination(end_epoch),
+                self.termination_altitude,
+            ],
+            fulfill_single_condition=True,
+        )
+        propagator_settings = propagation_setup.propagator.translational(
+            self.central_bodies,
+            self.acceleration_models,
+            self.bodies_to_propagate,
+            initial_state,
+            termination_settings,
+            output_variables=self.dependent_variables_to_save,
+        )
+        with stage("integration"):
+            dynamics_simulator = numerical_simulation.SingleArcSimulator(
+                self.bodies,
+                self.get_integrator_settings(start_epoch),
+                propagator_settings,
+                print_state_data=False,
+                print_dependent_variable_data=False,
+            )
+        with stage("result2array"):
+            states_array = result2array(dynamics_simulator.state_history)
+            if not self.dependent_variables_to_save:
+                return states_array, None
+            dependent_variables_array = result2array(
+                dynamics_simulator.dependent_variable_history
+            )
+        return states_array, dependent_variables_array
+
+    def propagate_dense(self, start_epoch, end_epoch, initial_state):
+        """
+        Propagate all the spacecraft between two epochs, and return a dense output that can be evaluated at any
+        epoch of the propagated interval.
+
+        Parameters
+        ----------
+        start_epoch : float
+            Start epoch in seconds since J2000
+        end_epoch : float
+            End epoch in seconds since J2000
+        initial_state : list or np.ndarray
+            Concatenated cartesian initial states of all the propagated spacecraft
+
+        Returns
+        -------
+        states : DenseTrajectory
+            Dense output of the states
+        dependent_variables : DenseTrajectory or None
+            Dense output of the dependent variables. None if no dependent variable is saved.
+        """
+        states_array, dependent_variables_array = self.propagate_raw(
+            start_epoch, end_epoch, initial_state
+        )
+        if dependent_variables_array is None:
+            return DenseTrajectory(states_array), None
+        return DenseTrajectory(states_array), DenseTrajectory(dependent_variables_array)
+
+    def propagate(self, start_epoch, end_epoch, initial_state):
+        """
+        Propagate all the spacecraft between two epochs, and return the histories on a regular grid with the fixed
+        step size. With the variable-step integrator, the grid is computed from the dense output between the start and
+        end epochs (the integration stops after the end epoch), so that the last state is at the end epoch, or at the
+        termination epoch if the spacecraft reenters before it.
+
+        Parameters
+        ----------
+        start_epoch : float
+            Start epoch in seconds since J2000
+        end_epoch : float
+            End epoch in seconds since J2000
+        initial_state : list or np.ndarray
+            Concatenated cartesian initial states of all the propagated spacecraft
+
+        Returns
+        -------
+        states_array : np.ndarray
+            State history, first column is the epoch in seconds since J2000
+        dependent_variables_array : np.ndarray or None
+            Dependent variables history, first column is the epoch in seconds since J2000. None if no dependent
+            variable is saved.
+        """
+        if self.integrator == "rk4":
+            return self.propagate_raw(start_epoch, end_epoch, initial_state)
+        states, dependent_variables = self.propagate_dense(
+            start_epoch, end_epoch, initial_state
+        )
+        # The altitude termination may stop the integration before the end epoch
+        end_epoch = min(end_epoch, states.end_epoch)
+        with stage("dense_output_sampling"):
+            states_array = states.sample(self.fixed_step_size, start_epoch, end_epoch)
+            if dependent_variables is None:
+                return states_array, None
+            return states_array, dependent_variables.sample(
+                self.fixed_step_size, start_epoch, end_epoch
+            )
@@ -0,0 +1,191 @@
+import numpy as np
+
+from useful_functions.beta_angle import predict_eclipses
+from useful_functions.constants import (
+    EARTH_EQUATORIAL_RADIUS,
+    EARTH_GRAVITATIONAL_PARAMETER,
+    EARTH_J2,
+)
+from useful_functions.ephemeris import get_body_position
+from useful_functions.sun_synchronous import MEAN_SUN_RATE, get_mean_local_time, get_sso_raan
+from useful_functions.synthetic_trajectory import get_j2_secular_rates
+
+__all__ = [
+    "get_sso_inclination",
+    "get_sso_semi_major_axis",
+    "get_right_ascension",
+    "compute_mltan_drift",
+    "scan_sso_grid",
+]
+
+
+def get_sso_inclination(semi_major_axis, eccentricity=0.0):
+    """
+    Get the inclination of a sun-synchronous orbit, whose RAAN drifts with the mean Sun under the first order secular
+    effect of J2, vectorized.
+
+    Parameters
+    ----------
+    semi_major_axis : float or np.ndarray
+        Mean semi-major axis (in meters)
+    eccentricity : float or np.ndarray, optional
+        Mean eccentricity, by default 0
+
+    Returns
+    -------
+    inclination : float or np.ndarray
+        Inclination (in radians), NaN above about 5970 km of altitude where no orbit is sun-synchronous
+    """
+    semi_major_axis = np.asarray(semi_major_axis, dtype=float)
+    raan_rate_factor = (
+        1.5
+        * np.sqrt(EARTH_GRAVITATIONAL_PARAMETER / semi_major_axis**3)
+        * EARTH_J2
+        * (EARTH_EQUATORIAL_RADIUS / (semi_major_axis * (1 - np.asarray(eccentricity) ** 2))) ** 2
+    )
+    cos_inclination = -MEAN_SUN_RATE / raan_rate_factor
+    with np.errstate(invalid="ignore"):
+        return np.arccos(np.where(np.abs(cos_inclination) <= 1, cos_inclination, np.nan))
+
+
+def get_sso_semi_major_axis(inclination, eccentricity=0.0):
+    """
+    Get the semi-major axis of a sun-synchronous orbit for a given inclination, inverse of get_sso_inclination.
+
+    Parameters
+    ----------
+    inclination : float or np.ndarray
+        Inclination (in radians), retrograde
+    eccentricity : float or np.ndarray, optional
+        Mean eccentricity, by default 0
+
+    Returns
+    -------
+    semi_major_axis : float or np.ndarray
+        Mean semi-major axis (in meters), NaN for prograde inclinations
+    """
+    cos_inclination = np.cos(np.asarray(inclination, dtype=float))
+    with np.errstate(invalid="ignore"):
+        return (
+            -1.5
+            * np.sqrt(EARTH_GRAVITATIONAL_PARAMETER)
+            * EARTH_J2
+            * EARTH_EQUATORIAL_RADIUS**2
+            * cos_inclination
+            / ((1 - np.asarray(eccentricity) ** 2) ** 2 * MEAN_SUN_RATE)
+        ) ** (2 / 7)
+
+
+def get_right_ascension(states):
+    """
+    Get the osculating right ascension of the ascending node of a trajectory, vectorized over epochs.
+
+    Parameters
+    ----------
+    states : np.ndarray
+        Cartesian states in an Earth centered inertial frame, shape (N, 6)
+
+    Returns
+    -------
+    right_ascension : np.ndarray
+        Right ascension of the ascending node (in radians), shape (N,)
+    """
+    states = np.asarray(states, dtype=float)
+    angular_momentum = np.cross(states[:, :3], states[:, 3:6])
+    return np.mod(np.arctan2(angular_momentum[:, 0], -angular_momentum[:, 1]), 2 * np.pi)
+
+
+def compute_mltan_drift(epochs, states=None, right_ascension=None):
+    """
+    Get the mean local time of the ascending node along a trajectory and its drift from the first epoch.
+
+    Parameters
+    ----------
+    epochs : np.ndarray
+        Epochs in seconds since J2000, shape (N,)
+    states : np.ndarray, optional
+        Cartesian states in EME2000, shape (N, 6), used if right_ascension is not given
+    right_ascension : np.ndarray, optional
+        Right ascension of the ascending node (in radians), for instance the mean RAAN of propagate_mean_elements
+
+    Returns
+    -------
+    drift : dict
+        - 'mltan' : mean local time of the ascending node in hours, shape (N,)
+        - 'mltan_drift' : MLTAN minus the initial MLTAN in hours, between -12 and 12, shape (N,)
+        - 'drift_rate' : linear drift rate in hours per year. With osculating states, the short period oscillations
+          of the RAAN average out over the trajectory.
+    """
+    epochs = np.asarray(epochs, dtype=float)
+    if right_ascension is None:
+        right_ascension = get_right_ascension(states)
+    mltan = get_mean_local_time(right_ascension, epochs)
+    mltan_drift = np.mod(mltan - mltan[0] + 12, 24) - 12
+    drift_rate = (
+        np.polyfit((epochs - epochs[0]) / 86400 / 365.25, np.unwrap(mltan_drift, period=24), 1)[0]
+        if len(epochs) > 1
+        else 0.0
+    )
+    return {"mltan": mltan, "mltan_drift": mltan_drift, "drift_rate": drift_rate}
+
+
+def scan_sso_grid(
+    altitudes,
+    mean_local_times,
+    launch_epochs,
+    duration=365.25 * 86400,
+    eccentricity=0.0,
+    inclination_error=0.0,
+):
+    """
+    Evaluate a grid of sun-synchronous orbits (altitude x mean local time of the ascending node x launch date) at once.
+
+    The orbits are designed with get_sso_inclination, and the MLTAN drift comes from an inclination error, with the
+    first order J2 RAAN rate. A grid of tens of millions of orbits takes a couple of seconds.
+
+    Parameters
+    ----------
+    altitudes : np.ndarray
+        Mean altitudes above the equatorial radius (in meters), shape (A,)
+    mean_local_times : np.ndarray
+        Mean local times of the ascending node (in hours), shape (L,)
+    launch_epochs : np.ndarray
+        Launch epochs (in seconds since J2000), shape (D,)
+    duration : float, optional
+        Duration after which the MLTAN drift is evaluated (in seconds), by default one year
+    eccentricity : float, optional
+        Mean eccentricity, by default 0
+    inclination_error : float, optional
+        Error on the injected inclination (in radians), by default 0
+
+    Returns
+    -------
+    grid : dict of np.ndarray
+        Arrays of shape (A, L, D):
+        - 'semi_major_axis' : mean semi-major axis in meters
+        - 'inclination' : inclination of the sun-synchronous orbit in radians, NaN if there is none
+        - 'RAAN' : RAAN at launch in radians
+        - 'mltan_drift' : MLTAN drift after the duration in hours, due to the inclination error
+        - 'beta' : beta angle at launch in radians
+        - 'eclipse_duration' : eclipse duration of a revolution at launch in seconds
+    """
+    semi_major_axis = EARTH_EQUATORIAL_RADIUS + np.asarray(altitudes, dtype=float)[:, None, None]
+    mean_local_times = np.asarray(mean_local_times, dtype=float)[None, :, None]
+    launch_epochs = np.asarray(launch_epochs, dtype=float)[None, None, :]
+    shape = np.broadcast_shapes(semi_major_axis.shape, mean_local_times.shape, launch_epochs.shape)
+
+    inclination = get_sso_inclination(semi_major_axis, eccentricity)
+    raan_rate, _, _ = get_j2_secular_rates(semi_major_axis, eccentricity, inclination + inclination_error)
+    mltan_drift = (raan_rate - MEAN_SUN_RATE) * duration * 12 / np.pi
+    raan = get_sso_raan(mean_local_times, launch_epochs)
+
+    sun_position = get_body_position("Sun", launch_epochs.ravel())[None, None]
+    eclipses = predict_eclipses(semi_major_axis, inclination, raan, launch_epochs, sun_position)
+    return {
+        "semi_major_axis": np.broadcast_to(semi_major_axis, shape),
+        "inclination": np.broadcast_to(inclination, shape),
+        "RAAN": np.broadcast_to(raan, shape),
+        "mltan_drift": np.broadcast_to(mltan_drift, shape),
+        "beta": eclipses["beta"],
+        "eclipse_duration": eclipses["eclipse_duration"],
+    }
@@ -1,33 +1,71 @@
-from useful_functions.date_transformations import epoch_to_astrotime
 import numpy as np
 
+__all__ = ["MEAN_SUN_RATE", "get_sso_raan", "get_mean_sun_right_ascension", "get_mean_local_time"]
+
+# Rate of the right ascension of the mean Sun of get_mean_sun_right_ascension, i.e. the RAAN rate of a sun-synchronous
+# orbit (in rad/s)
+MEAN_SUN_RATE = 2 * np.pi * 0.00273781191135448 / 86400
+
 
 def get_sso_raan(mean_local_time, epoch):
     """
-    Get the right ascension of the ascending node of a sun-synchronous orbit for a given mean local time and epoch.
-    Inspired by the "CL_op_locTime" function of the CelestLab toolbox.
+    Get the right ascension of the ascending node of a sun-synchronous orbit for a given mean local time and epoch,
+    vectorized over both. Inspired by the "CL_op_locTime" function of the CelestLab toolbox.
 
     Parameters
     ----------
-    mean_local_time : float
+    mean_local_time : float or np.ndarray
         Mean local time of the ascending node of the orbit (in hours)
-    epoch : float
+    epoch : float or np.ndarray
         Epoch of the orbit (in seconds since J2000)
 
     Returns
     -------
-    right_ascension : float
+    right_ascension : float or np.ndarray
         Right ascension of the ascending node of the orbit (in radians)
 
     """
-    astrotime = epoch_to_astrotime(epoch)
-    julian_day = [
-        np.floor(astrotime.jd),
-        astrotime.jd - np.floor(astrotime.jd),
-    ]
-    sidereal_time = np.mod(
-        2 * np.pi * (julian_day[1] + 0.7790572732640 + 0.00273781191135448 * epoch / 86400), 2 * np.pi
+    # The sidereal time and the hour angle of the mean Sun both depend on the fraction of the julian day, which
+    # cancels out: the RAAN is the right ascension of the mean Sun shifted by the local time
+    return np.mod(
+        get_mean_sun_right_ascension(epoch) + (np.asarray(mean_local_time) - 12) * np.pi / 12,
+        2 * np.pi,
     )
-    mean_right_ascension = sidereal_time + np.pi - (julian_day[1] - 0.5) * 2 * np.pi
-    right_ascension = np.mod(mean_right_ascension + (mean_local_time - 12) * np.pi / 12, 2 * np.pi)
-    return right_ascension
+
+
+def get_mean_sun_right_ascension(epochs):
+    """
+    Get the right ascension of the mean Sun, vectorized over epochs. Same model as the one used in get_sso_raan.
+
+    Parameters
+    ----------
+    epochs : float or np.ndarray
+        Epochs in seconds since J2000
+
+    Returns
+    -------
+    right_ascension : float or np.ndarray
+        Right ascension of the mean Sun (in radians)
+    """
+    days = np.asarray(epochs) / 86400
+    return np.mod(2 * np.pi * (0.7790572732640 + 0.00273781191135448 * days), 2 * np.pi)
+
+
+def get_mean_local_time(right_ascension, epochs):
+    """
+    Get the mean local time of the ascending node of an orbit, vectorized over epochs. Inverse of get_sso_raan.
+
+    Parameters
+    ----------
+    right_ascension : float or np.ndarray
+        Right ascension of the ascending node of the orbit (in radians)
+    epochs : float or np.ndarray
+        Epochs in seconds since J2000
+
+    Returns
+    -------
+    mean_local_time : float or np.ndarray
+        Mean local time of the ascending node (in hours)
+    """
+    hour_angle = np.asarray(right_ascension) - get_mean_sun_right_ascension(epochs)
+    return np.mod(12 + hour_angle * 12 / np.pi, 24)
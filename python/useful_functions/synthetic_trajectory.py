@@ -0,0 +1,204 @@
+import numpy as np
+
+from useful_functions.constants import (
+    EARTH_EQUATORIAL_RADIUS,
+    EARTH_GRAVITATIONAL_PARAMETER,
+    EARTH_J2,
+)
+from useful_functions.ephemeris import get_sun_position
+from useful_functions.keplerian_elements import (
+    keplerian_to_cartesian,
+    mean_to_true_anomaly,
+    true_to_mean_anomaly,
+)
+from useful_functions.semi_analytical import get_orbit_mean_elements
+
+__all__ = [
+    "get_orbit_elements",
+    "get_walker_elements",
+    "get_j2_secular_rates",
+    "propagate_keplerian_j2",
+    "generate_synthetic_results",
+]
+
+
+def get_orbit_elements(orbit, epoch):
+    """
+    Get the initial Keplerian elements of an orbit from the input data.
+
+    Parameters
+    ----------
+    orbit : dict
+        Orbit as returned by get_orbit, the RAAN being computed from the mean local time if the orbit has one
+    epoch : float
+        Initial epoch (in seconds since J2000)
+
+    Returns
+    -------
+    elements : np.ndarray
+        Semi-major axis (m), eccentricity, inclination, argument of periapsis, RAAN and true anomaly (rad), in the
+        order of tudat
+    """
+    return np.append(
+        get_orbit_mean_elements(orbit, epoch), np.radians(orbit["true_anomaly"])
+    )
+
+
+def get_walker_elements(
+    semi_major_axis,
+    inclination,
+    number_of_planes,
+    satellites_per_plane,
+    phasing=1,
+    raan_spread=2 * np.pi,
+    first_raan=0.0,
+):
+    """
+    Get the Keplerian elements of the circular orbits of a Walker constellation.
+
+    Parameters
+    ----------
+    semi_major_axis : float
+        Semi-major axis (m)
+    inclination : float
+        Inclination (rad)
+    number_of_planes : int
+        Number of orbital planes
+    satellites_per_plane : int
+        Number of satellites per plane
+    phasing : int, optional
+        Phasing parameter: the satellites of adjacent planes are shifted by phasing * 2 pi / total satellites
+    raan_spread : float, optional
+        Spread of the RAAN of the planes, 2 pi for a Walker delta (Galileo, GPS) and pi for a Walker star (Iridium)
+    first_raan : float, optional
+        RAAN of the first plane (rad)
+
+    Returns
+    -------
+    elements : np.ndarray
+        Keplerian elements of each satellite, plane by plane, shape (number_of_planes * satellites_per_plane, 6)
+    """
+    plane, slot = np.divmod(np.arange(number_of_planes * satellites_per_plane), satellites_per_plane)
+    elements = np.zeros((len(plane), 6))
+    elements[:, 0] = semi_major_axis
+    elements[:, 2] = inclination
+    elements[:, 4] = first_raan + raan_spread * plane / number_of_planes
+    elements[:, 5] = (
+        2 * np.pi * slot / satellites_per_plane
+        + 2 * np.pi * phasing * plane / len(plane)
+    )
+    return elements
+
+
+def get_j2_secular_rates(semi_major_axis, eccentricity, inclination):
+    """
+    Get the first order secular rates of the RAAN, argument of periapsis and mean anomaly due to J2, vectorized.
+
+    Parameters
+    ----------
+    semi_major_axis : float or np.ndarray
+        Semi-major axis (m)
+    eccentricity : float or np.ndarray
+        Eccentricity
+    inclination : float or np.ndarray
+        Inclination (rad)
+
+    Returns
+    -------
+    raan_rate, pom_rate, mean_anomaly_rate : float or np.ndarray
+        Rates of the RAAN, argument of periapsis and mean anomaly (rad/s), the last one including the mean motion
+    """
+    mean_motion = np.sqrt(EARTH_GRAVITATIONAL_PARAMETER / semi_major_axis**3)
+    factor = (
+        0.75 * EARTH_J2 * (EARTH_EQUATORIAL_RADIUS / (semi_major_axis * (1 - eccentricity**2))) ** 2
+    )
+    cos_inc = np.cos(inclination)
+    raan_rate = -2 * factor * mean_motion * cos_inc
+    pom_rate = factor * mean_motion * (5 * cos_inc**2 - 1)
+    mean_anomaly_rate = mean_motion * (
+        1 + factor * np.sqrt(1 - eccentricity**2) * (3 * cos_inc**2 - 1)
+    )
+    return raan_rate, pom_rate, mean_anomaly_rate
+
+
+def propagate_keplerian_j2(elements, durations, j2=True):
+    """
+    Propagate Keplerian orbits analytically, with the secular drift of the RAAN, argument of periapsis and mean anomaly
+    due to J2.
+
+    Parameters
+    ----------
+    elements : np.ndarray
+        Initial Keplerian elements (a, e, i, argument of periapsis, RAAN, true anomaly), shape (6,) or (K, 6)
+    durations : np.ndarray
+        Times since the initial epoch in seconds, shape (N,)
+    j2 : bool, optional
+        If False, the orbits are purely Keplerian, by default True
+
+    Returns
+    -------
+    states : np.ndarray
+        Cartesian states in the inertial frame of the elements, in meters and meters per second, shape (K, N, 6)
+    """
+    elements = np.atleast_2d(np.asarray(elements, dtype=float))
+    durations = np.asarray(durations, dtype=float)[None, :]
+    sma, ecc, inc, pom, raan, true_anomaly = (column[:, None] for column in elements.T)
+
+    if j2:
+        raan_rate, pom_rate, mean_anomaly_rate = get_j2_secular_rates(sma, ecc, inc)
+    else:
+        raan_rate = pom_rate = 0.0
+        mean_anomaly_rate = np.sqrt(EARTH_GRAVITATIONAL_PARAMETER / sma**3)
+
+    mean_anomaly = true_to_mean_anomaly(true_anomaly, ecc) + mean_anomaly_rate * durations
+    propagated = np.stack(
+        np.broadcast_arrays(
+            sma,
+            ecc,
+            inc,
+            pom + pom_rate * durations,
+            raan + raan_rate * durations,
+            mean_to_true_anomaly(mean_anomaly, ecc),
+        ),
+        axis=-1,
+    )
+    return keplerian_to_cartesian(propagated)
+
+
+def generate_synthetic_results(elements, start_epoch, end_epoch, step_size, j2=True):
+    """
+    Generate the results of a propagation analytically, in the layout of MissionSimulation.propagate (result2array),
+    so that the analysis code can be run and benchmarked without tudat nor SPICE kernels.
+
+    Parameters
+    ----------
+    elements : np.ndarray
+        Initial Keplerian elements of the spacecraft (a, e, i, argument of periapsis, RAAN, true anomaly), shape
+        (K, 6), for instance get_orbit_elements for the first one and get_walker_elements for a constellation
+    start_epoch : float
+        Start epoch in seconds since J2000
+    end_epoch : float
+        End epoch in seconds since J2000, included if it is on the grid
+    step_size : float
+        Step size in seconds
+    j2 : bool, optional
+        If False, the orbits are purely Keplerian, by default True
+
+    Returns
+    -------
+    states_array : np.ndarray
+        Epochs in the first column, followed by the cartesian states of each spacecraft in the EME2000 frame, shape
+        (N, 1 + 6 K)
+    dependent_variables_array : np.ndarray
+        Epochs in the first column, followed by the position of the Sun relative to the first spacecraft (the
+        relative_position("Sun", spacecraft) dependent variable), shape (N, 4)
+    """
+    epochs = np.arange(start_epoch, end_epoch + step_size / 2, step_size)
+    states = propagate_keplerian_j2(elements, epochs - start_epoch, j2)
+    states_array = np.empty((len(epochs), 1 + 6 * len(states)))
+    states_array[:, 0] = epochs
+    states_array[:, 1:] = states.transpose(1, 0, 2).reshape(len(epochs), -1)
+    dependent_variables_array = np.empty((len(epochs), 4))
+    dependent_variables_array[:, 0] = epochs
+    dependent_variables_array[:, 1:] = get_sun_position(epochs) - states[0, :, :3]
+    return states_array, dependent_variables_array
@@ -1,7 +1,8 @@
 from useful_functions.date_transformations import epoch_to_astrotime, astrotime_to_epoch
 from astropy.time import Time
 import pandas as pd
-from attitude import nadir_pointing, sun_pointing_rotation
+from useful_functions.profiling import stage
+from attitude.attitude_laws import compute_attitude_quaternions
 
 cic_reference_jd = 2400000.5
 cic_reference_time = Time(cic_reference_jd, format="jd", scale="tai")
@@ -111,6 +112,7 @@ def CIC_days_secs_to_epochs(days, seconds):
     return epochs
 
 
+@stage("cic_export")
 def generate_cic_files(
     epochs,
     satellite_states,
@@ -118,6 +120,8 @@ def generate_cic_files(
     spacecraft_name="TOLOSAT",
     path="",
     mute=False,
+    attitude_law=None,
+    target_positions=None,
 ):
     """
     Generate CIC files (OEM and AEM) from epochs, satellite states and sun directions
@@ -136,6 +140,10 @@ def generate_cic_files(
         Path to the folder where the files will be saved, by default ""
     mute : bool, optional
         If True, the function will not print anything, by default False
+    attitude_law : str, optional
+        Name of the attitude law of attitude.attitude_laws, by default "sun_pointing" for TOLOSAT and "nadir" otherwise
+    target_positions : np.ndarray, optional
+        Target positions in the EME2000/J2000 frame for the "target_tracking" attitude law
     """
     days, seconds = epochs_to_CIC_days_secs(epochs)
     oem_dataframe = generate_oem_dataframe(days, seconds, satellite_states)
@@ -147,14 +155,15 @@ def generate_cic_files(
         spacecraft_name=spacecraft_name,
         mute=mute,
     )
-    if spacecraft_name == "TOLOSAT":
-        quaternions = sun_pointing_rotation.compute_attitude_quaternions(
-            epochs, sun_directions
-        )
-    else:
-        quaternions = nadir_pointing.compute_attitude_quaternions(
-            satellite_states[:, :3]
-        )
+    if attitude_law is None:
+        attitude_law = "sun_pointing" if spacecraft_name == "TOLOSAT" else "nadir"
+    quaternions = compute_attitude_quaternions(
+        attitude_law,
+        epochs,
+        satellite_states,
+        sun_directions,
+        target_positions,
+    )
     aem_dataframe = generate_aem_dataframe(days, seconds, quaternions)
     export_AEM_file(
         aem_dataframe,